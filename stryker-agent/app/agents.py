@@ -1,156 +1,345 @@
 import os
-import json
 import re
-import textwrap
-import subprocess
 import traceback
 import time # NEW: For timing the run
 from collections import Counter
-from jinja2 import Environment, FileSystemLoader
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers.json import JsonOutputParser # NEW: For structured output
-from state import AgentState, SurvivedMutation, GeneratedTest, UnfixedMutation
+from concurrent.futures import ThreadPoolExecutor
+from state import AgentState, SurvivedMutation, GeneratedTest, StrykerProfile
 from tools import read_file, find_test_file, write_file, GitTool, GitHubApiTool
-
-# --- Initialize Gemini Model ---
-llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro-latest", temperature=0.2)
+from config import REPO_ROOT, env_flag, env_int
+from clustering import cluster_survivors
+from csharp import estimate_tokens
+from generation import GenerationEngine, BudgetExhausted
+from prioritization import prioritize
+from report_reader import StreamingReportReader, mutation_score
+from analysis import analyze_report, analysis_workers
+from source_store import SourceStore, store_for
+from integration import insert_tests, group_by_file
+from verification import verify_tests
+from repo_index import get_repo_index
+from instrumentation import llm_usage_callback, tracer, redact_credentials
+import incremental
+import checkpointing
+import sharding
+import stryker_profile
+import stryker_runner
+from mutant_cache import open_mutant_cache, production_files, plan_cached_run, assemble_report
+from llm_cache import open_llm_cache, prompt_key, to_cached, from_cached
+from prompt_context import ContextBuilder, context_budget
+from rendering import render_to_file, chart_data, mutant_table, script_json
+from history import HistoryStore, trend_summary
+from history_branch import update_shared_history
+
+DASHBOARD_PATH = os.path.join(REPO_ROOT, "mutation-dashboard.html")
+
+# --- Gemini Model, created on first use: most runs finish before test generation ---
+_llm = None
+
+def get_llm():
+    """Returns the shared chat model, importing the Google SDK on the first call."""
+    global _llm
+    if _llm is None:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        _llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro-latest", temperature=0.2)
+    return _llm
 
 # --- Helper function to clean LLM output (NO LONGER NEEDED FOR TEST GEN) ---
 # We will use JSON output parser instead for more robust extraction.
 
+def _plan_incremental_run(state: AgentState) -> dict | None:
+    """
+    Works out which files an incremental run must mutate: those changed since the commit
+    the baseline report was produced from. Returns None when a full run is needed
+    (incremental mode off, no baseline report yet, or its commit is unknown or unreachable).
+    """
+    if not env_flag("STRYKER_INCREMENTAL"):
+        return None
+    baseline = incremental.load_report(incremental.BASELINE_REPORT_PATH)
+    if baseline is None:
+        print("INFO: No baseline report found. Running a full mutation run to create one.")
+        return None
+    commit = incremental.baseline_commit()
+    if commit is None:
+        print("INFO: The baseline report does not record its commit. Running a full mutation run.")
+        return None
+    diff = incremental.changed_cs_files(commit)
+    if diff is None:
+        print("INFO: Falling back to a full mutation run.")
+        return None
+    changed, deleted = diff
+    mutated = set().union(*(incremental.source_files_to_mutate(changed, project) for project in _project_paths(state)))
+    print(f"Incremental run against the baseline at {commit[:12]}: {len(mutated)} file(s) to mutate, {len(deleted)} deleted.")
+    return { "baseline": baseline, "mutated": mutated, "deleted": deleted }
+
+def _project_paths(state: AgentState) -> list[str]:
+    """The production projects of the run (several when the solution has more than one)."""
+    return state.get("project_paths") or [state["project_path"]]
+
+def _stryker_command(project_path: str, mutate_patterns: list[str] | None, profile: StrykerProfile, config_path: str,
+                     concurrency: int | None = None, output_dir: str | None = None) -> list[str]:
+    """
+    The Stryker command line, optionally restricted to the given '--mutate' globs. Projects
+    mutated side by side each get their share of the test runners and their own output directory.
+    """
+    command = [
+        "dotnet", "stryker",
+        "--project", project_path,
+        "--config-file", config_path
+    ]
+    if concurrency is not None:
+        command.extend(["--concurrency", str(concurrency)])
+    if output_dir is not None:
+        command.extend(["--output", output_dir])
+    if mutate_patterns:
+        # Command-line globs replace the config's, so the policy's exclusions must come along
+        mutate_patterns = mutate_patterns + stryker_profile.exclusion_patterns(profile)
+    for pattern in mutate_patterns or []:
+        command.extend(["--mutate", pattern])
+    return command
+
+def _stryker_batches(project_path: str, mutate_patterns: list[str] | None, timeout_minutes: int) -> list[dict | None]:
+    """
+    Splits the Stryker run into STRYKER_BATCHES runs over disjoint files (4 when a timeout is set,
+    else 1). Each finished batch leaves a report, so a timeout keeps the finished batches' results
+    and test generation can start on them while the rest still runs.
+    """
+    count = env_int("STRYKER_BATCHES", 4 if timeout_minutes else 1)
+    if count <= 1 and mutate_patterns is None:
+        return [None]
+    if mutate_patterns is None:
+        mutate_patterns = incremental.mutate_patterns(production_files(project_path), project_path)
+    return stryker_runner.plan_batches(mutate_patterns, project_path, count)
+
+def _merge_cache_plans(merged: dict | None, plan: dict) -> dict:
+    """Folds one project's mutant cache plan into the run's (the projects' files are disjoint)."""
+    if merged is None:
+        return plan
+    for key in ("fingerprints", "cached", "partial"):
+        merged[key].update(plan[key])
+    merged["patterns"] = merged["patterns"] + plan["patterns"]
+    merged["hits"] += plan["hits"]
+    return merged
+
+def _tested_mutants(report_path: str) -> int:
+    """Mutants Stryker actually ran in a report (ignored ones are skipped without a test run)."""
+    return sum(
+        1 for _, file_report in StreamingReportReader(report_path)
+        for mutant in file_report.get("mutants", []) if mutant["status"] != "Ignored"
+    )
+
 def mutation_runner_agent(state: AgentState) -> AgentState:
     print("--- AGENT: Running Mutation Tests ---")
     state['run_stats'] = { "analysis_time_seconds": 0 } # Initialize
     start_time = time.time()
     try:
-        command = [
-            "dotnet", "stryker",
-            "--project", state["project_path"],
-            "--config-file", "stryker-config.json"
-        ]
-        print(f"Executing command: {' '.join(command)}")
-
-        result = subprocess.run(
-            command,
-            cwd="/repo", capture_output=True, text=True
-        )
-
-        print("--- Stryker STDOUT ---")
-        print(result.stdout)
-        print("--- Stryker STDERR ---")
-        if result.stderr:
-            print(result.stderr)
-        print("----------------------")
-
-        report_file_name = "stryker-report.json"
-        stryker_output_dir = "/repo/StrykerOutput"
-        found_report_path = None
-
-        print(f"Searching for '{report_file_name}' in '{stryker_output_dir}'...")
-        if os.path.exists(stryker_output_dir):
-            for root, _, files in os.walk(stryker_output_dir):
-                if report_file_name in files:
-                    full_path = os.path.join(root, report_file_name)
-                    found_report_path = os.path.relpath(full_path, "/repo")
-                    break
-        
-        if found_report_path:
-            print(f"✅ Stryker report found at: {found_report_path}")
-            state["stryker_report_path"] = found_report_path
+        shard = sharding.parse_shard(state["shard"]) if state.get("shard") else None
+        plan = _plan_incremental_run(state)
+        cache_plan = None
+        fresh_report = None
+        report_path = state.get("stryker_report_path")
+        # Files Stryker did not get to before the timeout (or whose batch failed)
+        unfinished: set[str] = set()
+
+        if report_path:
+            # Merge mode: the shards already ran Stryker and their combined report stands in for a fresh run
+            if not os.path.exists(os.path.join(REPO_ROOT, report_path)):
+                state["error_message"] = f"The precomputed Stryker report '{report_path}' does not exist."
+                return state
+            print(f"INFO: Using the precomputed Stryker report {report_path}. Skipping the Stryker run.")
         else:
-            state["error_message"] = (
-                "Stryker run did not produce a 'stryker-report.json' file. "
-                f"Stryker exited with code {result.returncode}. "
-                "Please check the STDOUT and STDERR logs above for details."
-            )
+            # Work out what Stryker still has to mutate: None means the whole of every project
+            projects = _project_paths(state)
+            candidates = plan["mutated"] if plan is not None else None
+            if shard is not None:
+                candidates = sharding.shard_files(
+                    candidates if candidates is not None else set().union(*map(production_files, projects)), *shard
+                )
+                print(f"Shard {shard[0]}/{shard[1]}: {len(candidates)} file(s) to mutate.")
+
+            cache = open_mutant_cache() if env_flag("STRYKER_MUTANT_CACHE") else None
+            # '--mutate' globs per project (relative to its directory): None means the whole project
+            patterns_by_project: dict[str, list[str] | None] = {}
+            # Source bytes to mutate per project, to share the cores out between projects run side by side
+            weights: dict[str, int] = {}
+            for project in projects:
+                files = production_files(project)
+                if candidates is not None:
+                    files &= candidates
+                weights[project] = sum(sharding.file_size(REPO_ROOT, path) for path in files)
+                if cache is not None:
+                    project_plan = plan_cached_run(cache, files, project)
+                    cache_plan = _merge_cache_plans(cache_plan, project_plan)
+                    patterns_by_project[project] = project_plan["patterns"]
+                elif candidates is not None:
+                    patterns_by_project[project] = incremental.mutate_patterns(files, project)
+                else:
+                    patterns_by_project[project] = None
+            if cache_plan is not None:
+                print(f"Mutant cache: {cache_plan['hits']} cached verdict(s), {len(cache_plan['patterns'])} mutate pattern(s) to run.")
+            to_run = [project for project in projects if patterns_by_project[project] is None or patterns_by_project[project]]
+
+            if to_run:
+                profile = stryker_profile.build_profile(stryker_profile.load_policy())
+                state['run_stats']['stryker_profile'] = profile
+                print(f"Stryker profile '{profile['name']}': concurrency {profile['concurrency']} "
+                      f"({profile['cores']} core(s), {profile['memory_mb']} MB available), coverage analysis {profile['coverage_analysis']}.")
+                config_path = stryker_profile.write_effective_config(profile)
+                timeout_minutes = env_int("STRYKER_TIMEOUT_MINUTES", 0)
+                deadline = time.monotonic() + timeout_minutes * 60 if timeout_minutes else None
+                batches = {project: _stryker_batches(project, patterns_by_project[project], timeout_minutes) for project in to_run}
+                batch_count = sum(len(project_batches) for project_batches in batches.values())
+                on_report = _start_prefetch(state) if batch_count > 1 else None
+                stryker_start = time.time()
+                if len(to_run) == 1:
+                    project = to_run[0]
+                    if batch_count > 1:
+                        print(f"Running Stryker in {batch_count} batch(es) of files.")
+                    outcome = stryker_runner.run_batches(
+                        batches[project], lambda patterns, _: _stryker_command(project, patterns, profile, config_path),
+                        deadline, on_report
+                    )
+                else:
+                    print(f"Running Stryker on {len(to_run)} projects in parallel ({batch_count} batch(es) in all).")
+                    outcome = stryker_runner.run_projects(
+                        [{
+                            "project": project, "batches": batches[project], "weight": weights[project],
+                            "build_command": lambda patterns, concurrency, output, project=project: _stryker_command(
+                                project, patterns, profile, config_path, concurrency, output
+                            ),
+                        } for project in to_run],
+                        profile["concurrency"], deadline, on_report, env_int("STRYKER_PARALLEL_PROJECTS", 0)
+                    )
+                    state['run_stats']['project_stryker_seconds'] = outcome["project_seconds"]
+                state['run_stats']['stryker_seconds'] = round(time.time() - stryker_start, 1)
+                if not outcome["reports"]:
+                    if outcome["timed_out"]:
+                        reason = f"Stryker did not finish any batch within STRYKER_TIMEOUT_MINUTES={timeout_minutes}."
+                    else:
+                        reason = (
+                            "Stryker run did not produce a 'stryker-report.json' file. "
+                            f"Stryker exited with code {outcome['returncode']}."
+                        )
+                    state["error_message"] = reason + " Last output:\n" + "\n".join(outcome["tail"][-40:])
+                    return state
+                unfinished = outcome["unfinished_files"]
+                if unfinished:
+                    cause = f"timed out after {timeout_minutes} minute(s)" if outcome["timed_out"] else "failed for some batches"
+                    print(f"WARNING: Stryker {cause}. Keeping the results of {len(outcome['reports'])} finished batch(es); "
+                          f"{len(unfinished)} file(s) were not mutated.")
+                    state['run_stats']['stryker_timed_out'] = outcome["timed_out"]
+                    state['run_stats']['unfinished_files'] = len(unfinished)
+                if len(outcome["reports"]) == 1:
+                    report_path = outcome["reports"][0]
+                else:
+                    report_path = incremental.write_merged_report(sharding.merge_shard_reports(
+                        [os.path.join(REPO_ROOT, path) for path in outcome["reports"]]
+                    ))
+                print(f"✅ Stryker report found at: {report_path}")
+                if state['run_stats']['stryker_seconds'] > 0:
+                    tested = sum(_tested_mutants(os.path.join(REPO_ROOT, path)) for path in outcome["reports"])
+                    state['run_stats']['mutants_per_minute'] = round(60 * tested / state['run_stats']['stryker_seconds'], 1)
+            else:
+                print("INFO: Nothing left to mutate. Skipping the Stryker run.")
+
+            if cache_plan is not None:
+                # Files of unfinished batches have no fresh verdicts, which must not be cached as "no mutants"
+                for path in unfinished:
+                    for key in ("fingerprints", "cached", "partial"):
+                        cache_plan[key].pop(path, None)
+                if report_path:
+                    fresh_report = incremental.load_report(os.path.join(REPO_ROOT, report_path))
+                fresh_report, misses = assemble_report(cache, cache_plan, fresh_report)
+                state['run_stats']['mutant_cache_hits'] = cache_plan["hits"]
+                state['run_stats']['mutant_cache_misses'] = misses
+
+        # A shard's report only covers its own files, so it is neither merged onto nor saved as the baseline;
+        # neither is a report cut short by the timeout
+        merge_baseline = plan is not None and shard is None
+        if cache_plan is None and not merge_baseline and report_path:
+            state["stryker_report_path"] = report_path
+            if shard is None and not unfinished:
+                incremental.save_baseline(os.path.join(REPO_ROOT, report_path), state.get("head_sha"))
+            return state
+
+        if fresh_report is None and report_path:
+            fresh_report = incremental.load_report(os.path.join(REPO_ROOT, report_path))
+        if merge_baseline:
+            # Unfinished files keep their baseline results
+            merged = incremental.merge_reports(plan["baseline"], fresh_report, plan["mutated"] - unfinished, plan["deleted"])
+            state["stryker_report_path"] = incremental.write_merged_report(merged)
+            print(f"Merged incremental results into the baseline report: {state['stryker_report_path']}")
+            # The merged report describes HEAD, so the next run only re-mutates what changes after it
+            if not unfinished:
+                incremental.save_baseline(state["stryker_report_path"], state.get("head_sha"))
+        else:
+            merged = incremental.merge_reports({}, fresh_report, set(), set())
+            state["stryker_report_path"] = incremental.write_merged_report(merged)
+            if shard is None and not unfinished:
+                incremental.save_baseline(state["stryker_report_path"], state.get("head_sha"))
 
     except Exception as e:
-        state["error_message"] = f"An unexpected error occurred in the mutation runner: {str(e)}"
+        state["error_message"] = f"An unexpected error occurred in the mutation runner: {redact_credentials(str(e))}"
     finally:
         end_time = time.time()
         state['run_stats']['analysis_time_seconds'] = int(end_time - start_time)
+        # Keep the report with the checkpoints so a resumed run does not need Stryker again
+        if state.get("stryker_report_path") and not state.get("error_message") and not state.get("shard") \
+                and checkpointing.checkpoints_enabled():
+            try:
+                state["stryker_report_path"] = checkpointing.store_report_artifact(state, state["stryker_report_path"])
+            except OSError as e:
+                print(f"WARNING: Could not store the Stryker report artifact: {e}")
     
     return state
 
-def _assess_risk(mutator_name: str) -> tuple[str, str]:
-    """Assigns a risk level based on the mutator type."""
-    high_risk = ["Block", "Statement", "Linq", "Equality", "Arithmetic"]
-    if any(term in mutator_name for term in high_risk):
-        return ('HIGH', '🔥')
-    
-    medium_risk = ["Method", "Update", "Boolean"]
-    if any(term in mutator_name for term in medium_risk):
-        return ('MEDIUM', '⚠️')
-        
-    return ('LOW', '⚪')
-
-def report_analyst_agent(state: AgentState) -> AgentState:
-    print("--- AGENT: Analyzing Report ---")
-    if state.get("error_message"): return state
-    
-    report_content = json.loads(read_file.invoke(state["stryker_report_path"]))
-    state["mutation_score"] = report_content.get("mutationScore", 0.0)
-    
-    all_mutants = []
-    for file_report in report_content.get("files", {}).values():
-        all_mutants.extend(file_report.get("mutants", []))
-
-    status_counts = Counter(m["status"] for m in all_mutants)
-    
-    state["mutation_stats"] = {
-        "total_mutants": len(all_mutants),
+def _status_stats(status_counts) -> dict:
+    return {
+        "total_mutants": sum(status_counts.values()),
         "killed": status_counts.get("Killed", 0),
         "survived": status_counts.get("Survived", 0),
         "no_coverage": status_counts.get("NoCoverage", 0),
         "compile_error": status_counts.get("CompileError", 0)
     }
 
-    survived_mutations: list[SurvivedMutation] = []
-    unfixed_mutants: list[UnfixedMutation] = []
-    survived_mutator_names = []
-    survived_file_paths = []
-
-    for file_path, file_report in report_content.get("files", {}).items():
-        relative_path = os.path.relpath(file_path, "/repo")
-        source_context = read_file.invoke(relative_path)
-        source_lines = source_context.splitlines()
-        
-        for mutant in file_report.get("mutants", []):
-            start_line = mutant["location"]["start"]["line"]
-            end_line = mutant["location"]["end"]["line"]
-            original_code_lines = source_lines[start_line - 1 : end_line]
-            original_code = "\n".join(original_code_lines)
-
-            if mutant["status"] in ["Survived", "NoCoverage"]:
-                risk_level, risk_icon = _assess_risk(mutant["mutatorName"])
-                unfixed_mutants.append({
-                    "file_path": relative_path,
-                    "mutator_name": mutant["mutatorName"],
-                    "status": mutant["status"],
-                    "line": start_line,
-                    "original_code": original_code,
-                    "mutated_code": mutant["replacement"],
-                    "risk_level": risk_level,
-                    "risk_icon": risk_icon
-                })
-
-            if mutant["status"] == "Survived":
-                survived_mutations.append({
-                    "file_path": relative_path,
-                    "mutator_name": mutant["mutatorName"],
-                    "original_code": original_code,
-                    "mutated_code": mutant["replacement"],
-                    "location": mutant["location"],
-                    "source_code_context": source_context
-                })
-                survived_mutator_names.append(mutant["mutatorName"])
-                survived_file_paths.append(relative_path)
+def _stats_by_project(status_by_file: dict) -> dict:
+    """Mutation counts and score per project owning the report's files."""
+    index = get_repo_index()
+    counts: dict[str, Counter] = {}
+    for file_path, file_counts in status_by_file.items():
+        counts.setdefault(index.project_of(file_path) or "(no project)", Counter()).update(file_counts)
+    return {
+        project: dict(_status_stats(project_counts), mutation_score=mutation_score(project_counts))
+        for project, project_counts in sorted(counts.items())
+    }
 
+def report_analyst_agent(state: AgentState) -> AgentState:
+    print("--- AGENT: Analyzing Report ---")
+    if state.get("error_message"): return state
+    
+    # Stream the report one file entry at a time; reports can run to hundreds of MB
+    report_path = os.path.join(REPO_ROOT, state["stryker_report_path"])
+    reader = StreamingReportReader(report_path)
+    # Per-file analysis fans out to worker processes for large reports; results match the serial pass
+    workers = analysis_workers(report_path)
+    with tracer.span("analyze_report", "analysis", workers=workers):
+        totals = analyze_report(reader, workers)
+    status_counts = totals.status_counts
+    survived_mutations = totals.survived_mutations
+    unfixed_mutants = totals.unfixed_mutants
+    # Mutations reference their source file by id; the text itself is never copied into state
+    sources = SourceStore()
+    for mutation in survived_mutations:
+        mutation["file_id"] = sources.file_id(mutation["file_path"])
+
+    # Stryker's JSON schema has no score field, so compute it when the report does not carry one
+    state["mutation_score"] = reader.header.get("mutationScore", mutation_score(status_counts))
+    state["mutation_stats"] = dict(_status_stats(status_counts), by_project=_stats_by_project(totals.status_by_file))
+
+    state["source_files"] = sources.paths
     state["survived_mutations"] = survived_mutations
     state["unfixed_mutants"] = unfixed_mutants
-    state["survived_by_mutator"] = Counter(survived_mutator_names)
-    state["survived_by_file"] = Counter(survived_file_paths)
+    state["survived_by_mutator"] = totals.survived_by_mutator
+    state["survived_by_file"] = totals.survived_by_file
     
     # --- NEW: Calculate Projected Score ---
     stats = state["mutation_stats"]
@@ -165,38 +354,12 @@ def report_analyst_agent(state: AgentState) -> AgentState:
     print(f"Analysis complete. Survived: {len(survived_mutations)}. Unfixed: {len(unfixed_mutants)}")
     return state
 
-def test_generator_agent(state: AgentState) -> AgentState:
-    print("--- AGENT: Generating Unit Tests ---")
-    if state.get("error_message"): return state
-
-    generated_tests: list[GeneratedTest] = []
-    for mutation in state["survived_mutations"]:
-        target_test_file = find_test_file.invoke(mutation["file_path"])
-        
-        if target_test_file is None:
-            print(f"INFO: No corresponding test file found for {mutation['file_path']}. Skipping.")
-            continue
-        
-        try:
-            existing_tests = read_file.invoke(target_test_file)
-            
-            print(f"--- Preparing to generate test for {mutation['file_path']} ---")
-            prompt_data = {
-                "file_path": mutation["file_path"],
-                "existing_tests": existing_tests,
-                "original_code": mutation["original_code"],
-                "mutated_code": mutation["mutated_code"],
-                "mutator_name": mutation["mutator_name"],
-                "line": mutation["location"]["start"]["line"]
-            }
-            
-            if not all(prompt_data.values()):
-                print("ERROR: One of the prompt variables is empty. Skipping this mutation.")
-                continue
-
-            # NEW: Updated prompt for JSON output
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", """You are a C# expert specializing in writing concise, effective unit tests using xUnit.
+def _build_test_generation_chain():
+    """Builds the prompt -> LLM -> JSON parser chain used for single-mutant test generation."""
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers.json import JsonOutputParser
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", """You are a C# expert specializing in writing concise, effective unit tests using xUnit.
 Your goal is to write a single, complete C# xUnit test method to kill a specific mutation.
 
 **Instructions:**
@@ -212,9 +375,13 @@ Example Response:
   "code": "[Fact]\\npublic void Calculate_WhenCustomerNameIsNull_ThrowsArgumentNullException()\\n{{\\n    // ... test code ...\\n}}"
 }}
 ```"""),
-                ("user", """
+        ("user", """
                 **Source File:** `{file_path}`
-                **Existing Test File Content (to ensure name is unique):**
+                **Code Under Test:**
+                ```csharp
+                {member_source}
+                ```
+                **Existing Test File Content (to ensure name is unique; long files are summarized, with test bodies omitted):**
                 ```csharp
                 {existing_tests}
                 ```
@@ -227,25 +394,314 @@ Example Response:
                 ---
                 Please provide the JSON object containing the explanation and the new xUnit test method.
                 """)]
+    )
+    return prompt | get_llm() | JsonOutputParser()
+
+def _build_batched_test_generation_chain():
+    """Builds the chain that writes tests for a whole cluster of mutations in one call."""
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers.json import JsonOutputParser
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", """You are a C# expert specializing in writing concise, effective unit tests using xUnit.
+Your goal is to write complete C# xUnit test methods that kill a set of mutations in the same method.
+
+**Instructions:**
+1.  **Analyze:** Understand why each mutated code was not caught by existing tests.
+2.  **Group:** One test may kill several of the listed mutations; write as few tests as needed to kill all of them.
+3.  **Explain:** For each test, write a brief, one-sentence explanation for *why* it is necessary.
+4.  **Code:** Each test must be a single, complete C# xUnit test method with a unique and descriptive name.
+5.  **Format:** Respond with a single JSON object with a "tests" array. Each entry has the keys "mutant_ids" (the ids of the mutations it kills), "explanation" and "code". Do NOT output any other text or markdown.
+
+Example Response:
+```json
+{{
+  "tests": [
+    {{
+      "mutant_ids": ["12", "13"],
+      "explanation": "This test validates that the method correctly handles null input for the customer name, which was not previously covered.",
+      "code": "[Fact]\\npublic void Calculate_WhenCustomerNameIsNull_ThrowsArgumentNullException()\\n{{\\n    // ... test code ...\\n}}"
+    }}
+  ]
+}}
+```"""),
+        ("user", """
+                **Source File:** `{file_path}`
+                **Code Under Test:**
+                ```csharp
+                {member_source}
+                ```
+                **Existing Test File Content (to ensure names are unique; long files are summarized, with test bodies omitted):**
+                ```csharp
+                {existing_tests}
+                ```
+                ---
+                **Mutations to Kill**
+                {mutations}
+                ---
+                Please provide the JSON object containing the new xUnit test methods.
+                """)]
+    )
+    return prompt | get_llm() | JsonOutputParser()
+
+def _format_cluster_mutations(mutations: list[SurvivedMutation]) -> str:
+    return "\n".join(
+        f"- **Id {m['mutant_id']}** (Line {m['location']['start']['line']}, `{m['mutator_name']}`): "
+        f"`{m['original_code'].strip()}` was mutated to `{m['mutated_code']}`"
+        for m in mutations
+    )
+
+def _generation_jobs(ranked: list[SurvivedMutation], sources: SourceStore) -> tuple[list, ContextBuilder, object, str]:
+    """
+    Builds the generation prompts for the ranked survivors. Returns (jobs, context builder,
+    chain, grouping), where each job is (mutations it targets, target test file, prompt variables)
+    and the builder holds the context tokens of each job.
+    """
+    # Resolve the target test file of every survivor up front so the LLM calls can run concurrently
+    candidates = []
+    test_file_contents: dict[str, str] = {}
+    for mutation in ranked:
+        target_test_file = find_test_file.invoke(mutation["file_path"])
+        
+        if target_test_file is None:
+            print(f"INFO: No corresponding test file found for {mutation['file_path']}. Skipping.")
+            continue
+        
+        if target_test_file not in test_file_contents:
+            try:
+                test_file_contents[target_test_file] = read_file.invoke(target_test_file)
+            except Exception as e:
+                print(f"ERROR: Failed to read {target_test_file} due to: {e}")
+                continue
+        candidates.append((mutation, target_test_file))
+
+    # Each prompt carries the code around its mutants and as much of the test file as the budget allows
+    budget = context_budget()
+    context = ContextBuilder(budget)
+    jobs = []
+    grouping = os.environ.get("TEST_GEN_GROUPING", "mutant").lower()
+    if grouping == "method":
+        target_by_file = {mutation["file_path"]: target for mutation, target in candidates}
+        # Clusters are sized with the test context as trimmed to the budget
+        test_file_tokens = {}
+        for file_path, target in target_by_file.items():
+            tokens = estimate_tokens(test_file_contents[target])
+            test_file_tokens[file_path] = min(tokens, budget) if budget else tokens
+        clusters = cluster_survivors(
+            [mutation for mutation, _ in candidates], sources, test_file_tokens,
+            env_int("TEST_GEN_CLUSTER_TOKEN_BUDGET", 12000)
+        )
+        for cluster in clusters:
+            target_test_file = target_by_file[cluster["file_path"]]
+            first = cluster["mutations"][0]
+            member_source, existing_tests = context.build(
+                cluster["file_path"], sources.text(first["file_id"]),
+                [m["location"]["start"]["line"] for m in cluster["mutations"]],
+                target_test_file, test_file_contents[target_test_file], cluster["member_source"]
+            )
+            jobs.append((cluster["mutations"], target_test_file, {
+                "file_path": cluster["file_path"],
+                "member_source": member_source,
+                "existing_tests": existing_tests,
+                "mutations": _format_cluster_mutations(cluster["mutations"])
+            }))
+        chain = _build_batched_test_generation_chain()
+        print(f"Grouped {len(candidates)} survivor(s) into {len(clusters)} cluster prompt(s).")
+    else:
+        for mutation, target_test_file in candidates:
+            if not all((mutation["original_code"], mutation["mutated_code"], mutation["mutator_name"],
+                        test_file_contents[target_test_file])):
+                print("ERROR: One of the prompt variables is empty. Skipping this mutation.")
+                continue
+            line = mutation["location"]["start"]["line"]
+            member_source, existing_tests = context.build(
+                mutation["file_path"], sources.text(mutation["file_id"]), [line],
+                target_test_file, test_file_contents[target_test_file]
             )
-            
-            # NEW: Using JSON output parser
-            parser = JsonOutputParser()
-            chain = prompt | llm | parser
-            response_json = chain.invoke(prompt_data)
-
-            if not response_json.get("code") or not response_json.get("explanation"):
-                print(f"ERROR: LLM returned incomplete JSON for mutation in {mutation['file_path']}. Skipping.")
+            jobs.append(([mutation], target_test_file, {
+                "file_path": mutation["file_path"],
+                "member_source": member_source,
+                "existing_tests": existing_tests,
+                "original_code": mutation["original_code"],
+                "mutated_code": mutation["mutated_code"],
+                "mutator_name": mutation["mutator_name"],
+                "line": line
+            }))
+        chain = _build_test_generation_chain()
+    return jobs, context, chain, grouping
+
+def _cached_responses(cache, chain, jobs: list) -> tuple[list, list]:
+    """Looks every job up in the LLM response cache. Returns (responses, None for misses; cache keys)."""
+    responses: list = [None] * len(jobs)
+    keys: list[str | None] = [None] * len(jobs)
+    if cache is not None:
+        prompt_template = repr(chain.first)
+        for index, (mutations, _, prompt_data) in enumerate(jobs):
+            # Keyed on the context actually sent, so a different budget asks again
+            keys[index] = prompt_key(prompt_template, mutations, prompt_data["existing_tests"],
+                                     prompt_data["member_source"])
+            cached = cache.get(keys[index])
+            if cached is not None:
+                responses[index] = from_cached(cached, mutations)
+    return responses, keys
+
+def _context_tokens(context: ContextBuilder, indexes: list[int]) -> tuple[int, int]:
+    """
+    Context tokens the given prompts sent, and the tokens they saved against sending whole test
+    files (and whole clustered methods).
+    """
+    sent = sum(context.usage[index][1] for index in indexes)
+    return sent, sum(context.usage[index][0] for index in indexes) - sent
+
+def _send_prompts(engine: GenerationEngine, cache, jobs: list, responses: list, keys: list):
+    """Sends the prompts without a response through the engine and caches the answers."""
+    pending = [index for index, response in enumerate(responses) if response is None]
+    print(f"--- Generating tests for {len(pending)} prompt(s), up to {engine.max_in_flight} in flight ---")
+    for index, response in zip(pending, engine.run([jobs[index][2] for index in pending])):
+        responses[index] = response
+        if cache is not None and not isinstance(response, Exception):
+            cache.put(keys[index], to_cached(response, jobs[index][0]))
+
+# --- Test generation started on finished Stryker batches while the later batches still run ---
+_prefetch_executor: ThreadPoolExecutor | None = None
+_prefetch_futures: list = []
+# Handed on to the final pass, so prefetched and final prompts share one token and time budget
+_prefetch_engine: GenerationEngine | None = None
+
+def _start_prefetch(state: AgentState):
+    """
+    Returns a callback that queues a finished batch report for test generation in the background,
+    or None when there is nothing to overlap. The answers land in the LLM response cache, where
+    the test generator finds them once the whole run has been analysed.
+    """
+    global _prefetch_executor, _prefetch_engine
+    _prefetch_engine = None
+    if state.get("shard") or not env_flag("STRYKER_PREFETCH_TESTS", True) or not env_flag("LLM_CACHE", True):
+        return None
+    _prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+    context = {
+        "changed_lines": incremental.changed_lines(os.environ.get("BASE_BRANCH", "master")),
+    }
+
+    def on_report(report_path: str):
+        _prefetch_futures.append(_prefetch_executor.submit(_prefetch_batch, os.path.join(REPO_ROOT, report_path), context))
+    return on_report
+
+def _prefetch_batch(report_path: str, context: dict) -> tuple[int, int, int]:
+    """Generates tests for one batch report. Returns (prompts answered, context tokens sent, context tokens saved)."""
+    global _prefetch_engine
+    with tracer.span("prefetch_tests", "llm", report=report_path):
+        totals = analyze_report(StreamingReportReader(report_path))
+        sources = SourceStore()
+        for mutation in totals.survived_mutations:
+            mutation["file_id"] = sources.file_id(mutation["file_path"])
+        # Ranking within a file matches the final run, so method clusters (and cache keys) come out the same
+        ranked, _ = prioritize(totals.survived_mutations, totals.survived_by_file, context["changed_lines"])
+        jobs, prompt_context, chain, _ = _generation_jobs(ranked, sources)
+        cache = open_llm_cache()
+        try:
+            responses, keys = _cached_responses(cache, chain, jobs)
+            pending = [index for index, response in enumerate(responses) if response is None]
+            if _prefetch_engine is None:
+                # One engine for every batch, so the budgets bound the prefetch as a whole
+                _prefetch_engine = GenerationEngine.from_env(chain.with_config(callbacks=[llm_usage_callback()]))
+            _send_prompts(_prefetch_engine, cache, jobs, responses, keys)
+        finally:
+            cache.close()
+    sent = [index for index in pending if not isinstance(responses[index], BudgetExhausted)]
+    return (sum(1 for index in pending if not isinstance(responses[index], Exception)),
+            *_context_tokens(prompt_context, sent))
+
+def _wait_for_prefetch() -> tuple[int, int, int]:
+    """
+    Waits for the background generation of this run to finish. Returns the prompts it answered
+    and the context tokens it sent and saved.
+    """
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        return 0, 0, 0
+    prompts = context_tokens = tokens_saved = 0
+    for future in _prefetch_futures:
+        try:
+            answered, sent, saved = future.result()
+            prompts += answered
+            context_tokens += sent
+            tokens_saved += saved
+        except Exception as e:
+            print(f"WARNING: Early test generation for a Stryker batch failed: {e}")
+    _prefetch_futures.clear()
+    _prefetch_executor.shutdown()
+    _prefetch_executor = None
+    return prompts, context_tokens, tokens_saved
+
+def test_generator_agent(state: AgentState) -> AgentState:
+    print("--- AGENT: Generating Unit Tests ---")
+    global _prefetch_engine
+    prefetched, context_tokens, tokens_saved = _wait_for_prefetch()
+    engine, _prefetch_engine = _prefetch_engine, None
+    if state.get("error_message"): return state
+    if prefetched:
+        print(f"INFO: {prefetched} prompt(s) were answered while Stryker was still running.")
+
+    # Most valuable survivors first: the generation budget may not cover the long tail
+    changed_lines = incremental.changed_lines(os.environ.get("BASE_BRANCH", "master"))
+    ranked, duplicates = prioritize(state["survived_mutations"], state.get("survived_by_file") or {}, changed_lines)
+    if duplicates:
+        print(f"INFO: Skipping {duplicates} survivor(s) equivalent to another on the same line.")
+
+    jobs, prompt_context, chain, grouping = _generation_jobs(ranked, store_for(state))
+
+    # Re-pushed PRs mostly ask the same questions again: answer those from the response cache
+    cache = open_llm_cache() if env_flag("LLM_CACHE", True) else None
+    responses, keys = _cached_responses(cache, chain, jobs)
+    if cache is not None:
+        print(f"LLM cache: {cache.hits} cached response(s), {cache.misses} prompt(s) to send.")
+
+    if engine is None:
+        engine = GenerationEngine.from_env(chain.with_config(callbacks=[llm_usage_callback()]))
+    pending = [index for index, response in enumerate(responses) if response is None]
+    _send_prompts(engine, cache, jobs, responses, keys)
+    if engine.skipped:
+        print(f"WARNING: Generation budget exhausted; {engine.skipped} lower-priority prompt(s) were not sent.")
+    # Prompts the budget cut were never sent, so they neither cost nor saved anything
+    sent, saved = _context_tokens(prompt_context, [index for index in pending if not isinstance(responses[index], BudgetExhausted)])
+    context_tokens += sent
+    tokens_saved += saved
+    if context_tokens:
+        print(f"INFO: Prompt context: {context_tokens} token(s) sent, {tokens_saved} saved against whole test files "
+              f"(budget {prompt_context.budget or 'unlimited'} per prompt).")
+    if cache is not None:
+        cache.evict()
+        cache.close()
+
+    generated_tests: list[GeneratedTest] = []
+    for (mutations, target_test_file, _), response_json in zip(jobs, responses):
+        file_path = mutations[0]["file_path"]
+        if isinstance(response_json, BudgetExhausted):
+            continue
+        if isinstance(response_json, Exception):
+            print(f"ERROR: Failed to generate test for {file_path} due to: {response_json}")
+            continue
+
+        if grouping == "method":
+            known_ids = {m["mutant_id"] for m in mutations}
+            tests = response_json.get("tests") or []
+        else:
+            known_ids = {mutations[0]["mutant_id"]}
+            tests = [dict(response_json, mutant_ids=list(known_ids))]
+
+        for test in tests:
+            if not test.get("code") or not test.get("explanation"):
+                print(f"ERROR: LLM returned incomplete JSON for mutation in {file_path}. Skipping.")
                 continue
 
+            mutant_ids = [str(mid) for mid in test.get("mutant_ids") or [] if str(mid) in known_ids]
             generated_tests.append({
                 "target_test_file": target_test_file,
-                "generated_test_code": response_json["code"],
-                "explanation": response_json["explanation"]
+                "generated_test_code": test["code"],
+                "explanation": test["explanation"],
+                "mutant_ids": mutant_ids or sorted(known_ids)
             })
-            print(f"✅ Successfully generated test for mutation in {mutation['file_path']}")
-        except Exception as e:
-            print(f"ERROR: Failed to generate test for {mutation['file_path']} due to: {e}")
+            print(f"✅ Successfully generated test for mutation in {file_path}")
 
     state["generated_tests"] = generated_tests
     # NEW: Populate final run stat
@@ -253,7 +709,56 @@ Example Response:
         state['run_stats']['tests_generated'] = len(generated_tests)
         state['run_stats']['mutants_generated'] = state['mutation_stats']['total_mutants']
         state['run_stats']['survivors_found'] = state['mutation_stats']['survived']
+        state['run_stats']['llm_calls'] = engine.calls
+        state['run_stats']['llm_retries'] = engine.retries
+        state['run_stats']['duplicate_survivors'] = duplicates
+        state['run_stats']['budget_skipped_prompts'] = engine.skipped
+        state['run_stats']['prefetched_prompts'] = prefetched
+        state['run_stats']['prompt_context_tokens'] = context_tokens
+        state['run_stats']['prompt_tokens_saved'] = tokens_saved
+        if cache is not None:
+            state['run_stats']['llm_cache_hits'] = cache.hits
+            state['run_stats']['llm_cache_misses'] = cache.misses
+
+    if checkpointing.checkpoints_enabled():
+        checkpointing.store_tests_artifact(state)
+    return state
+
+def test_verification_agent(state: AgentState) -> AgentState:
+    print("--- AGENT: Verifying Generated Tests ---")
+    if state.get("error_message") or not state.get("generated_tests"):
+        return state
+    if not env_flag("VERIFY_GENERATED_TESTS", default=True):
+        print("INFO: Test verification is disabled. Keeping all generated tests.")
+        return state
+
+    failure = None
+    try:
+        index = get_repo_index()
+        mutations_by_id = {m["mutant_id"]: m for m in state["survived_mutations"]}
+        verified = verify_tests(state["generated_tests"], mutations_by_id, index.project_of)
+        if verified is None:
+            failure = "the verification workspace could not be built"
+    except Exception as e:
+        verified, failure = None, f"verification failed to run ({e})"
 
+    if verified is None:
+        # Unverified tests may not even compile, so none of them is pushed
+        print(f"ERROR: Could not verify the generated tests: {failure}. "
+              f"Dropping all {len(state['generated_tests'])} generated test(s).")
+        state["generated_tests"] = []
+    else:
+        print(f"✅ {len(verified)}/{len(state['generated_tests'])} generated test(s) kill their mutant.")
+        state["generated_tests"] = verified
+
+    if state.get('run_stats'):
+        if verified is None:
+            state['run_stats']['verification_error'] = failure
+        else:
+            state['run_stats']['verified_tests'] = len(verified)
+        state['run_stats']['tests_generated'] = len(state["generated_tests"])
+    if checkpointing.checkpoints_enabled():
+        checkpointing.store_tests_artifact(state)
     return state
 
 def code_integration_agent(state: AgentState) -> AgentState:
@@ -267,35 +772,22 @@ def code_integration_agent(state: AgentState) -> AgentState:
     state["new_branch_name"] = branch_name
     
     try:
-        print("--- Configuring Git user and safe directory ---")
-        subprocess.run(["git", "config", "--global", "user.email", "stryker.agent@example.com"], cwd="/repo", check=True)
-        subprocess.run(["git", "config", "--global", "user.name", "Stryker AI Agent"], cwd="/repo", check=True)
-        subprocess.run(["git", "config", "--global", "--add", "safe.directory", "/repo"], cwd="/repo", check=True)
-        print("--- Git configuration complete. ---")
-
         GitTool.create_and_checkout_branch.invoke(branch_name)
 
-        for test in state["generated_tests"]:
-            file_path = test["target_test_file"]
+        # One read, one insertion pass and one write per test file
+        tests = state["generated_tests"]
+        touched_files = []
+        for file_path, indexes in group_by_file(tests).items():
             content = read_file.invoke(file_path)
-            last_brace_index = content.rfind("}")
-
-            if last_brace_index != -1:
-                indentation = "    "
-                indented_test_code = textwrap.indent(test["generated_test_code"], indentation)
-                new_content = (
-                    content[:last_brace_index].rstrip() +
-                    f"\n\n{indented_test_code}\n" +
-                    content[last_brace_index:]
-                )
-                write_file.invoke({ "file_path": file_path, "content": new_content })
-            else:
-                raise ValueError(f"Could not find closing brace in {file_path}")
+            new_content, _ = insert_tests(content, [tests[i]["generated_test_code"] for i in indexes], file_path)
+            write_file.invoke({ "file_path": file_path, "content": new_content })
+            touched_files.append(file_path)
 
         commit_message = f"feat: Add unit tests to kill {len(state['generated_tests'])} survived mutations"
         
-        GitTool.add_commit_and_push.invoke({
+        GitTool.commit_files_and_push.invoke({
             "branch_name": branch_name,
+            "file_paths": touched_files,
             "commit_message": commit_message
         })
 
@@ -322,20 +814,76 @@ def code_integration_agent(state: AgentState) -> AgentState:
         print(f"✅ Successfully created PR: {pr_url}")
 
     except Exception as e:
-        state["error_message"] = f"Code integration failed: {str(e)}\n{traceback.format_exc()}"
+        state["error_message"] = redact_credentials(f"Code integration failed: {str(e)}\n{traceback.format_exc()}")
     
     return state
 
 def dashboard_generator_agent(state: AgentState) -> AgentState:
     print("--- AGENT: Generating Dashboard ---")
-    env = Environment(loader=FileSystemLoader('/app/templates'))
-    env.globals['zip'] = zip
-    
-    template = env.get_template('report_template.html')
-    
-    html_output = template.render(state=state)
-    
-    with open("/repo/mutation-dashboard.html", "w") as f:
-        f.write(html_output)
+    mutations_by_id = {m["mutant_id"]: m for m in state.get("survived_mutations") or []}
+    trends = _record_history(state)
+    # Written as it renders; the workbench rows go in as one compact JSON payload, not one <tr> each
+    with tracer.span("render_dashboard", "render") as span_args:
+        span_args["bytes"] = render_to_file(
+            'report_template.html', DASHBOARD_PATH,
+            state=state, mutations_by_id=mutations_by_id, trends=trends,
+            chart_data=chart_data(state), mutant_json=script_json(mutant_table(state.get("unfixed_mutants") or [])),
+        )
     print("Dashboard 'mutation-dashboard.html' created successfully.")
+
+    if env_flag("PR_SCORE_COMMENT", True) and os.environ.get("GITHUB_TOKEN"):
+        try:
+            github_tool = GitHubApiTool(state["repo_slug"], os.environ["GITHUB_TOKEN"])
+            comment_url = github_tool.upsert_comment.func(
+                github_tool, issue_number=state["pr_number"], body=_score_summary(state), marker=SCORE_COMMENT_MARKER
+            )
+            print(f"✅ Score summary posted: {comment_url}")
+        except Exception as e:
+            print(f"WARNING: Could not post the score summary comment: {e}")
     return state
+
+def _record_history(state: AgentState) -> dict | None:
+    """Adds a successful run to the history store and returns the trend data for the dashboard."""
+    if not env_flag("MUTATION_HISTORY", True):
+        return None
+    def update() -> dict:
+        store = HistoryStore()
+        try:
+            if not state.get("error_message") and state.get("mutation_stats"):
+                store.record_run(state)
+            return trend_summary(store, state["repo_slug"])
+        finally:
+            store.close()
+
+    try:
+        with tracer.span("record_history", "history"):
+            # Shared with other PRs through MUTATION_HISTORY_BRANCH when it is set
+            return update_shared_history(update)
+    except Exception as e:
+        print(f"WARNING: Could not update the mutation score history: {e}")
+        return None
+
+SCORE_COMMENT_MARKER = "<!-- stryker-agent:score-summary -->"
+
+def _score_summary(state: AgentState) -> str:
+    """Markdown summary of the run for the PR comment (kept up to date on every push)."""
+    if state.get("error_message"):
+        return f"{SCORE_COMMENT_MARKER}\n### 🧬 Mutation Testing\n\n❌ The run failed; see the workflow logs and dashboard artifact."
+    stats = state.get("mutation_stats") or {}
+    lines = [
+        SCORE_COMMENT_MARKER,
+        "### 🧬 Mutation Testing",
+        "",
+        "| Metric | Value |",
+        "| --- | --- |",
+        f"| Mutation score | {state.get('mutation_score', 0.0):.1f}% |",
+    ]
+    if state.get("projected_score") is not None:
+        lines.append(f"| Projected score with generated tests | {state['projected_score']:.1f}% |")
+    lines.append(
+        f"| Killed / Survived / No coverage | {stats.get('killed', 0)} / {stats.get('survived', 0)} / {stats.get('no_coverage', 0)} |"
+    )
+    lines.append(f"| Tests generated | {len(state.get('generated_tests') or [])} |")
+    if state.get("new_pr_url"):
+        lines.extend(["", f"Generated tests: {state['new_pr_url']}"])
+    return "\n".join(lines)
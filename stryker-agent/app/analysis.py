@@ -0,0 +1,154 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from config import REPO_ROOT, env_int
+from prioritization import assess_risk
+from state import SurvivedMutation, UnfixedMutation
+
+# Files handed to a worker at once, and the most mutants per hand-off
+CHUNK_FILES = 64
+CHUNK_MUTANTS = 20000
+# Smaller reports are analysed in-process: the pool would cost more than it saves
+PARALLEL_MIN_REPORT_BYTES = 8 * 1024 * 1024
+
+
+def analyze_file(file_path: str, file_report: dict) -> dict:
+    """
+    Analyzes the mutants of a single report file entry. Returns the file's path and status
+    counts plus its survived and unfixed mutants, ready to be merged into the run totals.
+    """
+    relative_path = os.path.relpath(file_path, REPO_ROOT)
+    mutants = file_report.get("mutants", [])
+    status_counts = Counter(m["status"] for m in mutants)
+    survived_mutations: list[SurvivedMutation] = []
+    unfixed_mutants: list[UnfixedMutation] = []
+
+    # Only files with unfixed mutants need their source read
+    if status_counts.get("Survived", 0) or status_counts.get("NoCoverage", 0):
+        with open(os.path.join(REPO_ROOT, relative_path), "r", encoding="utf-8-sig") as f:
+            source_lines = f.read().splitlines()
+
+        for mutant in mutants:
+            if mutant["status"] not in ["Survived", "NoCoverage"]:
+                continue
+            start_line = mutant["location"]["start"]["line"]
+            end_line = mutant["location"]["end"]["line"]
+            original_code_lines = source_lines[start_line - 1 : end_line]
+            original_code = "\n".join(original_code_lines)
+
+            risk_level, risk_icon = assess_risk(mutant["mutatorName"])
+            unfixed_mutants.append({
+                "file_path": relative_path,
+                "mutator_name": mutant["mutatorName"],
+                "status": mutant["status"],
+                "line": start_line,
+                "original_code": original_code,
+                "mutated_code": mutant["replacement"],
+                "risk_level": risk_level,
+                "risk_icon": risk_icon
+            })
+
+            if mutant["status"] == "Survived":
+                survived_mutations.append({
+                    "mutant_id": str(mutant["id"]),
+                    "file_path": relative_path,
+                    "mutator_name": mutant["mutatorName"],
+                    "original_code": original_code,
+                    "mutated_code": mutant["replacement"],
+                    "location": mutant["location"]
+                })
+
+    return {
+        "file_path": relative_path,
+        "status_counts": status_counts,
+        "survived_mutations": survived_mutations,
+        "unfixed_mutants": unfixed_mutants,
+    }
+
+
+class ReportTotals:
+    """
+    Run-wide aggregates of the per-file analyses. Totals built from disjoint slices of the
+    report can be merged; merging in report order gives the same result as one serial pass.
+    """
+
+    def __init__(self):
+        self.status_counts = Counter()
+        self.survived_mutations: list[SurvivedMutation] = []
+        self.unfixed_mutants: list[UnfixedMutation] = []
+        self.survived_by_mutator = Counter()
+        self.survived_by_file = Counter()
+        # Status counts of each file, for breakdowns by project
+        self.status_by_file: dict[str, Counter] = {}
+
+    def add_file(self, partial: dict):
+        self.status_counts.update(partial["status_counts"])
+        self.status_by_file.setdefault(partial["file_path"], Counter()).update(partial["status_counts"])
+        self.survived_mutations.extend(partial["survived_mutations"])
+        self.unfixed_mutants.extend(partial["unfixed_mutants"])
+        for mutation in partial["survived_mutations"]:
+            self.survived_by_mutator[mutation["mutator_name"]] += 1
+            self.survived_by_file[mutation["file_path"]] += 1
+
+    def merge(self, other: "ReportTotals"):
+        self.status_counts.update(other.status_counts)
+        self.survived_mutations.extend(other.survived_mutations)
+        self.unfixed_mutants.extend(other.unfixed_mutants)
+        self.survived_by_mutator.update(other.survived_by_mutator)
+        self.survived_by_file.update(other.survived_by_file)
+        for file_path, counts in other.status_by_file.items():
+            self.status_by_file.setdefault(file_path, Counter()).update(counts)
+
+
+def _analyze_chunk(entries: list[tuple[str, dict]]) -> ReportTotals:
+    totals = ReportTotals()
+    for file_path, file_report in entries:
+        totals.add_file(analyze_file(file_path, file_report))
+    return totals
+
+
+def _chunks(entries):
+    chunk, mutants = [], 0
+    for file_path, file_report in entries:
+        chunk.append((file_path, file_report))
+        mutants += len(file_report.get("mutants", []))
+        if len(chunk) >= CHUNK_FILES or mutants >= CHUNK_MUTANTS:
+            yield chunk
+            chunk, mutants = [], 0
+    if chunk:
+        yield chunk
+
+
+def analysis_workers(report_path: str) -> int:
+    """REPORT_ANALYSIS_WORKERS, defaulting to up to 4 cores for large reports and 1 otherwise."""
+    configured = env_int("REPORT_ANALYSIS_WORKERS", 0)
+    if configured > 0:
+        return configured
+    try:
+        large = os.path.getsize(report_path) >= PARALLEL_MIN_REPORT_BYTES
+    except OSError:
+        large = False
+    return min(4, os.cpu_count() or 1) if large else 1
+
+
+def analyze_report(entries, workers: int = 1) -> ReportTotals:
+    """
+    Analyzes a stream of (file_path, file_report) entries, in chunks across `workers`
+    processes. At most two chunks per worker are in flight, so a streamed report is
+    never held in memory as a whole, and chunks are merged back in report order.
+    """
+    totals = ReportTotals()
+    if workers <= 1:
+        for file_path, file_report in entries:
+            totals.add_file(analyze_file(file_path, file_report))
+        return totals
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in _chunks(entries):
+            pending.append(pool.submit(_analyze_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                totals.merge(pending.pop(0).result())
+        for future in pending:
+            totals.merge(future.result())
+    return totals
@@ -0,0 +1,81 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+
+
+class SqliteCache:
+    """
+    A small persistent key/value cache backed by SQLite.
+    Values are JSON-serialisable objects stored zlib-compressed. The cache is bounded by
+    the total size of the stored values and evicts least-recently-used entries first;
+    entries older than `ttl_seconds` (if set) are treated as misses and purged.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: int | None = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)")
+        self._conn.commit()
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def get(self, key: str):
+        row = self._conn.execute(
+            "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or self._expired(row[1]):
+            if row is not None:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+            self.misses += 1
+            return None
+        self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, value):
+        blob = zlib.compress(json.dumps(value).encode("utf-8"))
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries (key, value, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, blob, len(blob), now, now)
+        )
+        self._conn.commit()
+
+    def evict(self) -> int:
+        """Drops expired entries, then LRU entries until the cache fits in `max_bytes`. Returns the number removed."""
+        removed = 0
+        if self.ttl_seconds is not None:
+            removed += self._conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            doomed = []
+            for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used ASC"):
+                if total <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+            removed += len(doomed)
+        self._conn.commit()
+        return removed
+
+    def close(self):
+        self._conn.close()
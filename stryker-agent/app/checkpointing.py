@@ -0,0 +1,85 @@
+import os
+import json
+import shutil
+import sqlite3
+from config import REPO_ROOT, AGENT_DATA_DIR, env_flag
+from instrumentation import run_subprocess
+
+CHECKPOINT_DB_PATH = os.path.join(AGENT_DATA_DIR, "checkpoints.sqlite")
+ARTIFACTS_DIR = os.path.join(AGENT_DATA_DIR, "runs")
+
+
+def checkpoints_enabled() -> bool:
+    return env_flag("AGENT_CHECKPOINTS", True)
+
+
+def thread_id(repo_slug: str, pr_number: int) -> str:
+    """Checkpoints of every run for the same PR share one thread."""
+    return f"{repo_slug}#{pr_number}"
+
+
+def head_sha() -> str | None:
+    result = run_subprocess(["git", "-c", f"safe.directory={REPO_ROOT}", "rev-parse", "HEAD"],
+                            cwd=REPO_ROOT, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def open_checkpointer():
+    """The LangGraph SQLite checkpointer stored with the other agent caches."""
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    os.makedirs(os.path.dirname(CHECKPOINT_DB_PATH), exist_ok=True)
+    return SqliteSaver(sqlite3.connect(CHECKPOINT_DB_PATH, check_same_thread=False))
+
+
+def _artifact_dir(state: dict) -> str:
+    name = thread_id(state["repo_slug"], state["pr_number"]).replace("/", "_").replace("#", "-pr-")
+    return os.path.join(ARTIFACTS_DIR, name)
+
+
+def store_report_artifact(state: dict, report_path: str) -> str:
+    """
+    Copies the run's Stryker report next to the checkpoints and returns the copy's absolute
+    path, so a resumed run finds it even though /repo/StrykerOutput belongs to another container.
+    """
+    source = os.path.join(REPO_ROOT, report_path)
+    target = os.path.join(_artifact_dir(state), "stryker-report.json")
+    if os.path.abspath(source) != target:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+    return target
+
+
+def store_tests_artifact(state: dict):
+    """Writes the generated tests as JSON for inspection; the checkpoint holds the copy used on resume."""
+    target = os.path.join(_artifact_dir(state), "generated-tests.json")
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w") as f:
+            json.dump(state.get("generated_tests") or [], f, indent=2)
+    except OSError as e:
+        print(f"WARNING: Could not store the generated tests artifact: {e}")
+
+
+def find_resume_point(app, config: dict, current_sha: str | None) -> dict | None:
+    """
+    Returns the checkpoint config to resume this PR's last run from, or None to start over.
+    A run is resumed only if it did not finish cleanly and was for the same commit; it restarts
+    at the node after the newest error-free checkpoint whose Stryker report still exists.
+    """
+    history = list(app.get_state_history(config))
+    if not history:
+        return None
+    latest = history[0]
+    if current_sha is None or latest.values.get("head_sha") != current_sha:
+        return None
+    if not latest.next and not latest.values.get("error_message"):
+        return None
+    for snapshot in history:
+        values = snapshot.values
+        if not snapshot.next or not values or values.get("error_message"):
+            continue
+        report_path = values.get("stryker_report_path")
+        if report_path and not os.path.exists(os.path.join(REPO_ROOT, report_path)):
+            continue
+        return snapshot.config
+    return None
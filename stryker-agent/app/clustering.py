@@ -0,0 +1,57 @@
+from state import SurvivedMutation
+from source_store import SourceStore
+from csharp import parse_members, enclosing_member, member_source, estimate_tokens
+
+# Rough size of the fixed instructions in the batched prompt
+PROMPT_OVERHEAD_TOKENS = 600
+
+
+def _mutation_tokens(mutation: SurvivedMutation) -> int:
+    return estimate_tokens(mutation["original_code"] + mutation["mutated_code"] + mutation["mutator_name"]) + 20
+
+
+def cluster_survivors(mutations: list[SurvivedMutation], sources: SourceStore,
+                      test_file_tokens: dict[str, int], token_budget: int) -> list[dict]:
+    """
+    Groups survived mutations by source file and enclosing method so each group can be
+    sent to the LLM as one prompt. A group whose prompt would exceed `token_budget`
+    (test file + method source + one entry per mutant) is split into several clusters.
+    Clusters keep the order in which their first mutant appears in `mutations`.
+    """
+    groups: dict[tuple[str, str], dict] = {}
+    members_by_file: dict[str, list] = {}
+    text_by_file: dict[str, str] = {}
+    for mutation in mutations:
+        file_path = mutation["file_path"]
+        if file_path not in text_by_file:
+            text_by_file[file_path] = sources.text(mutation["file_id"])
+            members_by_file[file_path] = parse_members(text_by_file[file_path])
+        source = text_by_file[file_path]
+        line = mutation["location"]["start"]["line"]
+        member = enclosing_member(members_by_file[file_path], line, "method") \
+            or enclosing_member(members_by_file[file_path], line, "type")
+        key = (file_path, f"{member.kind}:{member.name}:{member.start_line}" if member else "file")
+        if key not in groups:
+            groups[key] = {
+                "file_path": file_path,
+                "member_name": member.name if member else None,
+                "member_source": member_source(source, member) if member else source,
+                "mutations": [],
+            }
+        groups[key]["mutations"].append(mutation)
+
+    clusters = []
+    for group in groups.values():
+        fixed = PROMPT_OVERHEAD_TOKENS + test_file_tokens.get(group["file_path"], 0) \
+            + estimate_tokens(group["member_source"])
+        current, used = [], fixed
+        for mutation in group["mutations"]:
+            cost = _mutation_tokens(mutation)
+            if current and used + cost > token_budget:
+                clusters.append(dict(group, mutations=current))
+                current, used = [], fixed
+            current.append(mutation)
+            used += cost
+        if current:
+            clusters.append(dict(group, mutations=current))
+    return clusters
@@ -0,0 +1,32 @@
+import os
+
+# Root of the C# repository mounted into the container (overridable for benchmarks and local runs)
+REPO_ROOT = os.environ.get("STRYKER_AGENT_REPO_ROOT", "/repo")
+
+# Where the agent keeps data that should outlive a single run (baselines, caches).
+# Mount this path as a volume in CI to share it between PR runs.
+AGENT_DATA_DIR = os.environ.get("STRYKER_AGENT_DATA_DIR", "/var/cache/stryker-agent")
+
+# Where the mutation score history lives. Separate from AGENT_DATA_DIR so CI can cache it
+# under a repository-wide key while the rest of the data stays per PR.
+HISTORY_DIR = os.environ.get("STRYKER_AGENT_HISTORY_DIR", AGENT_DATA_DIR)
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Reads a boolean feature flag from the environment ("1", "true", "yes", "on")."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    """Reads an integer setting from the environment, falling back to the default on bad input."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"WARNING: Ignoring non-integer value '{value}' for {name}.")
+        return default
@@ -0,0 +1,177 @@
+import re
+from typing import NamedTuple
+
+TYPE_KEYWORDS = ("class", "struct", "record", "interface")
+# Block-introducing statements whose parenthesised header looks like a method signature
+STATEMENT_KEYWORDS = {"if", "for", "foreach", "while", "switch", "catch", "using", "lock", "fixed", "else", "do", "try", "finally", "when"}
+
+_METHOD_HEADER = re.compile(r"(?:[\w\]>?,\s]+\s)?(?P<name>[A-Za-z_]\w*)\s*(?:<[^<>()]*>)?\s*\((?P<params>[^()]*(?:\([^()]*\)[^()]*)*)\)\s*(?::\s*(?:base|this)\s*\([^()]*\))?\s*(?:where\s[^{]*)?$", re.S)
+_NAMESPACE = re.compile(r"\bnamespace\s+(?P<name>[A-Za-z_][\w.]*)\s*(?P<end>[;{])")
+_TYPE_HEADER = re.compile(r"\b(?:class|struct|record|interface)\s+(?P<name>[A-Za-z_]\w*)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class Member(NamedTuple):
+    kind: str        # 'type' or 'method'
+    name: str
+    start_line: int  # 1-based line of the declaration header
+    body_start: int  # character offset of the opening brace
+    body_end: int    # character offset of the closing brace
+    end_line: int    # 1-based line of the closing brace
+
+
+def mask_source(source: str) -> str:
+    """
+    Blanks out comments, string and char literals (keeping newlines and offsets intact)
+    so braces and keywords can be scanned without a full C# parser.
+    """
+    out = list(source)
+    i, n = 0, len(source)
+
+    def blank(start: int, end: int):
+        for k in range(start, min(end, n)):
+            if out[k] != "\n":
+                out[k] = " "
+
+    while i < n:
+        c = source[i]
+        nxt = source[i + 1] if i + 1 < n else ""
+        if c == "/" and nxt == "/":
+            end = source.find("\n", i)
+            end = n if end == -1 else end
+            blank(i, end)
+            i = end
+        elif c == "/" and nxt == "*":
+            end = source.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            blank(i, end)
+            i = end
+        elif c == '"' or (c in "@$" and nxt == '"') or (c in "@$" and nxt in "@$" and source[i + 2:i + 3] == '"'):
+            quote = source.index('"', i)
+            verbatim = "@" in source[i:quote]
+            if not verbatim and source.startswith('"""', quote):
+                end = source.find('"""', quote + 3)
+                end = n if end == -1 else end + 3
+            else:
+                j = quote + 1
+                while j < n:
+                    if verbatim and source[j] == '"' and source[j + 1:j + 2] == '"':
+                        j += 2
+                        continue
+                    if not verbatim and source[j] == "\\":
+                        j += 2
+                        continue
+                    if source[j] == '"' or (not verbatim and source[j] == "\n"):
+                        break
+                    j += 1
+                end = j + 1
+            blank(quote + 1, end - 1)
+            i = end
+        elif c == "'":
+            j = i + 1
+            while j < n and source[j] != "'" and source[j] != "\n":
+                j += 2 if source[j] == "\\" else 1
+            blank(i + 1, j)
+            i = j + 1
+        else:
+            i += 1
+    return "".join(out)
+
+
+def _line_of(starts: list[int], offset: int) -> int:
+    lo, hi = 0, len(starts) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if starts[mid] <= offset:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo + 1
+
+
+def parse_members(source: str) -> list[Member]:
+    """Finds type and method declarations (with block bodies) in a C# source file."""
+    masked = mask_source(source)
+    starts = line_starts(source)
+    members, stack = [], []
+    for index, char in enumerate(masked):
+        if char == "{":
+            header_start = max(masked.rfind(";", 0, index), masked.rfind("{", 0, index), masked.rfind("}", 0, index)) + 1
+            header = masked[header_start:index].strip()
+            # Drop attributes such as [Fact] or [InlineData(1, 2)] in front of the declaration
+            header = re.sub(r"^(?:\[[^\]]*\]\s*)+", "", header)
+            entry = None
+            type_match = _TYPE_HEADER.search(header)
+            method_match = _METHOD_HEADER.search(header) if "=>" not in header and "=" not in header.split("(")[0] else None
+            if type_match and "(" not in header.split(type_match.group("name"))[0]:
+                entry = ("type", type_match.group("name"))
+            elif method_match and method_match.group("name") not in STATEMENT_KEYWORDS and not re.search(r"\bnew\b", header.split("(")[0]):
+                entry = ("method", method_match.group("name"))
+            offset = header_start + (len(masked[header_start:index]) - len(masked[header_start:index].lstrip()))
+            stack.append((entry, index, offset))
+        elif char == "}" and stack:
+            entry, open_index, header_offset = stack.pop()
+            if entry is not None:
+                members.append(Member(entry[0], entry[1], _line_of(starts, header_offset),
+                                      open_index, index, _line_of(starts, index)))
+    members.sort(key=lambda m: m.body_start)
+    return members
+
+
+def namespace_at(source: str, offset: int) -> str:
+    """The namespace a character offset lies in ('' for the global namespace); nested blocks are joined with '.'."""
+    masked = mask_source(source)
+    parts = []
+    for match in _NAMESPACE.finditer(masked):
+        if match.start() > offset:
+            break
+        if match.group("end") == ";":
+            # File-scoped: covers the rest of the file
+            parts.append(match.group("name"))
+            continue
+        depth = 0
+        for index in range(match.end() - 1, len(masked)):
+            depth += {"{": 1, "}": -1}.get(masked[index], 0)
+            if depth == 0:
+                break
+        if index >= offset:
+            parts.append(match.group("name"))
+    return ".".join(parts)
+
+
+def enclosing_member(members: list[Member], line: int, kind: str | None = None) -> Member | None:
+    """Returns the innermost member (optionally of the given kind) spanning the 1-based line."""
+    best = None
+    for member in members:
+        if member.start_line <= line <= member.end_line and (kind is None or member.kind == kind):
+            if best is None or member.start_line >= best.start_line:
+                best = member
+    return best
+
+
+def member_source(source: str, member: Member) -> str:
+    """Slices the full text of a member, from its declaration line to its closing brace."""
+    lines = source.splitlines()
+    return "\n".join(lines[member.start_line - 1:member.end_line])
+
+
+def line_starts(source: str) -> list[int]:
+    """Character offsets at which each line of `source` starts."""
+    return [0] + [m.end() for m in re.finditer("\n", source)]
+
+
+def location_span(source: str, starts: list[int], location: dict) -> tuple[int, int]:
+    """Converts a Stryker line/column location (1-based) to a character span in `source`."""
+    start = starts[location["start"]["line"] - 1] + location["start"]["column"] - 1
+    end = starts[location["end"]["line"] - 1] + location["end"]["column"] - 1
+    return start, min(end, len(source))
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for prompt budgeting."""
+    return len(text) // 4 + 1
+
+
+def normalize_code(code: str) -> str:
+    """Collapses whitespace so formatting-only differences compare equal."""
+    return _WHITESPACE.sub(" ", code).strip()
@@ -0,0 +1,179 @@
+import re
+import time
+import random
+import asyncio
+from config import env_int
+from csharp import estimate_tokens
+
+# Errors worth retrying: rate limiting and transient server-side failures
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+RETRYABLE_MESSAGES = ("rate limit", "too many requests", "resource has been exhausted", "resourceexhausted",
+                      "unavailable", "deadline exceeded", "internal error", "bad gateway", "gateway timeout")
+# A retryable status code quoted in a message: only next to a status phrase, never any run of digits
+_CODES = "|".join(map(str, RETRYABLE_STATUS_CODES))
+_STATUS_IN_MESSAGE = re.compile(
+    rf"\b(?:status(?:[ _]code)?|error code|http)\W{{0,3}}(?:{_CODES})\b"
+    rf"|\b(?:{_CODES})\s+(?:too many requests|internal server error|bad gateway|service unavailable|gateway timeout)\b",
+    re.IGNORECASE
+)
+
+
+class BudgetExhausted(Exception):
+    """Raised (and returned in place of a result) for inputs the run's budget no longer covers."""
+
+
+def estimate_payload_tokens(payload) -> int:
+    values = payload.values() if isinstance(payload, dict) else [payload]
+    return sum(estimate_tokens(str(value)) for value in values)
+
+
+class TokenBucket:
+    """Async token bucket: allows `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Recognises 429/5xx failures across the HTTP and gRPC clients LangChain models may raise."""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int) and value in RETRYABLE_STATUS_CODES:
+            return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) in RETRYABLE_STATUS_CODES:
+        return True
+    message = str(error).lower()
+    return bool(_STATUS_IN_MESSAGE.search(message)) or any(term in message for term in RETRYABLE_MESSAGES)
+
+
+def _retry_after_seconds(error: Exception) -> float | None:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if value is None:
+        match = re.search(r"retry[ _-]?after[^0-9]*([0-9.]+)", str(error), re.IGNORECASE)
+        value = match.group(1) if match else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class GenerationEngine:
+    """
+    Runs a LangChain runnable over many inputs with bounded concurrency.
+    At most `max_in_flight` calls run at once, calls are spaced by a token bucket of
+    `requests_per_minute`, and retryable failures are retried with exponential backoff
+    and jitter. Results come back in input order; failed inputs yield their exception.
+
+    Optional budgets bound the run: once `time_budget_seconds` have passed (in-flight calls
+    are cut off at the deadline) or the estimated prompt tokens sent would exceed
+    `token_budget`, the remaining inputs yield BudgetExhausted. The budgets span every run of
+    the engine: the clock starts with the first run. Inputs are started in order, so callers
+    should pass the most valuable ones first.
+    """
+
+    def __init__(self, runnable, max_in_flight: int = 8, requests_per_minute: int = 60,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0,
+                 time_budget_seconds: float | None = None, token_budget: int | None = None):
+        self.runnable = runnable
+        self.max_in_flight = max(1, max_in_flight)
+        self.requests_per_minute = max(1, requests_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.time_budget_seconds = time_budget_seconds
+        self.token_budget = token_budget
+        self.calls = 0
+        self.retries = 0
+        self.tokens_sent = 0
+        # Distinct inputs the budgets refused over every run (a refused input offered again counts once)
+        self.skipped = 0
+        self._refused: set[str] = set()
+        self._deadline: float | None = None
+
+    @classmethod
+    def from_env(cls, runnable) -> "GenerationEngine":
+        return cls(
+            runnable,
+            max_in_flight=env_int("TEST_GEN_MAX_IN_FLIGHT", 8),
+            requests_per_minute=env_int("TEST_GEN_REQUESTS_PER_MINUTE", 60),
+            max_retries=env_int("TEST_GEN_MAX_RETRIES", 5),
+            time_budget_seconds=env_int("TEST_GEN_TIME_BUDGET_SECONDS", 0) or None,
+            token_budget=env_int("TEST_GEN_TOKEN_BUDGET", 0) or None,
+        )
+
+    def _reserve(self, cost: int):
+        """Claims budget for one call, or raises BudgetExhausted."""
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            raise BudgetExhausted(f"wall-clock budget of {self.time_budget_seconds}s spent")
+        if self.token_budget is not None and self.tokens_sent + cost > self.token_budget:
+            raise BudgetExhausted(f"token budget of {self.token_budget} spent")
+        self.tokens_sent += cost
+
+    async def _call(self, payload):
+        if self._deadline is None:
+            return await self.runnable.ainvoke(payload)
+        try:
+            return await asyncio.wait_for(self.runnable.ainvoke(payload), self._deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            raise BudgetExhausted(f"wall-clock budget of {self.time_budget_seconds}s spent") from None
+
+    async def _invoke(self, payload, semaphore: asyncio.Semaphore, bucket: TokenBucket):
+        attempt = 0
+        cost = estimate_payload_tokens(payload)
+        while True:
+            async with semaphore:
+                await bucket.acquire()
+                self._reserve(cost)
+                self.calls += 1
+                try:
+                    return await self._call(payload)
+                except BudgetExhausted:
+                    raise
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        raise
+                    error = e
+            delay = _retry_after_seconds(error)
+            if delay is None:
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            attempt += 1
+            self.retries += 1
+            print(f"WARNING: Retryable LLM error ({error}). Retrying in {delay:.1f}s (attempt {attempt}/{self.max_retries}).")
+            await asyncio.sleep(delay)
+
+    async def arun(self, payloads: list) -> list:
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        burst = min(self.max_in_flight, self.requests_per_minute)
+        bucket = TokenBucket(self.requests_per_minute / 60.0, burst)
+        if self.time_budget_seconds is not None and self._deadline is None:
+            self._deadline = time.monotonic() + self.time_budget_seconds
+        results = await asyncio.gather(
+            *(self._invoke(payload, semaphore, bucket) for payload in payloads),
+            return_exceptions=True
+        )
+        self._refused.update(repr(payload) for payload, result in zip(payloads, results) if isinstance(result, BudgetExhausted))
+        self.skipped = len(self._refused)
+        return results
+
+    def run(self, payloads: list) -> list:
+        """Synchronous entry point for the (synchronous) LangGraph nodes."""
+        if not payloads:
+            return []
+        return asyncio.run(self.arun(payloads))
@@ -0,0 +1,196 @@
+import os
+import time
+import random
+import requests
+from requests.adapters import HTTPAdapter
+from instrumentation import tracer
+
+DEFAULT_API_URL = "https://api.github.com"
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+# Methods safe to resend when a request may have gone through (the agent's PATCHes set fields outright)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE")
+
+
+def _rate_limit_wait(response: requests.Response) -> float | None:
+    """Seconds GitHub asks us to wait (Retry-After, or X-RateLimit-Reset once the quota is used up)."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            return None
+    if response.headers.get("X-RateLimit-Remaining") == "0" and response.headers.get("X-RateLimit-Reset"):
+        try:
+            return max(0.0, float(response.headers["X-RateLimit-Reset"]) - time.time())
+        except ValueError:
+            return None
+    return None
+
+
+def _is_rate_limited(response: requests.Response) -> bool:
+    # Primary and secondary rate limits come back as 403 as well as 429
+    return response.status_code == 429 or (
+        response.status_code == 403 and (
+            response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers
+        )
+    )
+
+
+class GitHubClient:
+    """
+    Minimal GitHub REST client for the agent: one pooled session, connect/read timeouts,
+    and retries with exponential backoff that wait as long as the rate-limit headers ask
+    (up to `max_wait` seconds). Only idempotent requests are resent after a 5xx or a lost
+    response; creations first look for what they may already have created. The API root
+    comes from GITHUB_API_URL, so GitHub Enterprise or a local stand-in server can be targeted.
+    """
+
+    def __init__(self, repo_slug: str, token: str, base_url: str | None = None,
+                 timeout: tuple[float, float] = (5.0, 30.0), max_retries: int = 5,
+                 base_delay: float = 1.0, max_wait: float = 120.0):
+        self.repo_slug = repo_slug
+        self.base_url = (base_url or os.environ.get("GITHUB_API_URL") or DEFAULT_API_URL).rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_wait = max_wait
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        self.session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        self.session.headers.update({
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json",
+            "User-Agent": "stryker-agent",
+        })
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Sends a request to the API, retrying rate limits and, for idempotent methods, 5xx responses
+        and connection failures (a POST that failed that way may still have been applied).
+        """
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            with tracer.span(f"{method} {path.split('?')[0]}", "http") as span_args:
+                try:
+                    response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+                    span_args["status"] = response.status_code
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    response, error = None, e
+            if response is not None:
+                retryable = _is_rate_limited(response) or (idempotent and response.status_code in RETRYABLE_STATUS_CODES)
+                if not retryable or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response
+                wait = _rate_limit_wait(response)
+                reason = f"HTTP {response.status_code}"
+            else:
+                if not idempotent or attempt >= self.max_retries:
+                    raise error
+                wait, reason = None, str(error)
+
+            if wait is None:
+                wait = self._backoff(attempt)
+            if wait > self.max_wait:
+                raise RuntimeError(f"GitHub asked to wait {wait:.0f}s ({reason}), more than the {self.max_wait:.0f}s allowed.")
+            attempt += 1
+            print(f"WARNING: GitHub API {method} {path} failed ({reason}). Retrying in {wait:.1f}s (attempt {attempt}/{self.max_retries}).")
+            time.sleep(wait)
+
+    def _backoff(self, attempt: int) -> float:
+        return self.base_delay * (2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def _create(self, path: str, data: dict, find) -> dict:
+        """
+        POSTs a new resource. A 5xx or lost response may hide a POST that went through, so
+        before posting again `find()` is asked for the resource and its answer wins if it has one.
+        """
+        attempt = 0
+        while True:
+            try:
+                return self.request("POST", path, json=data).json()
+            except (requests.HTTPError, requests.ConnectionError, requests.Timeout) as e:
+                status = e.response.status_code if isinstance(e, requests.HTTPError) and e.response is not None else None
+                if (isinstance(e, requests.HTTPError) and status not in RETRYABLE_STATUS_CODES) or attempt >= self.max_retries:
+                    raise
+                reason = f"HTTP {status}" if status is not None else str(e)
+            wait = self._backoff(attempt)
+            attempt += 1
+            print(f"WARNING: GitHub API POST {path} failed ({reason}). Checking whether it went through "
+                  f"before retrying in {wait:.1f}s (attempt {attempt}/{self.max_retries}).")
+            time.sleep(wait)
+            existing = find()
+            if existing is not None:
+                return existing
+
+    def _paginate(self, path: str, params: dict | None = None) -> list:
+        items = []
+        response = self.request("GET", path, params=dict(params or {}, per_page=100))
+        while True:
+            items.extend(response.json())
+            next_url = response.links.get("next", {}).get("url")
+            if not next_url:
+                return items
+            response = self.request("GET", next_url)
+
+    def find_open_pull_request(self, head_branch: str, base_branch: str | None = None) -> dict | None:
+        owner = self.repo_slug.split("/")[0]
+        params = {"head": f"{owner}:{head_branch}", "state": "open"}
+        if base_branch:
+            params["base"] = base_branch
+        pulls = self.request("GET", f"/repos/{self.repo_slug}/pulls", params=params).json()
+        return pulls[0] if pulls else None
+
+    def upsert_pull_request(self, head_branch: str, base_branch: str, title: str, body: str) -> tuple[dict, bool]:
+        """
+        Creates the PR for head -> base, or updates the title and body of the one already open.
+        Returns (pull request, created).
+        """
+        existing = self.find_open_pull_request(head_branch, base_branch)
+        if existing is None:
+            data = {"title": title, "head": head_branch, "base": base_branch, "body": body}
+            try:
+                created = self._create(
+                    f"/repos/{self.repo_slug}/pulls", data, lambda: self.find_open_pull_request(head_branch, base_branch)
+                )
+                return created, True
+            except requests.HTTPError as e:
+                # 422 means the PR appeared in the meantime (e.g. opened by a concurrent run)
+                if e.response is None or e.response.status_code != 422:
+                    raise
+                existing = self.find_open_pull_request(head_branch, base_branch)
+                if existing is None:
+                    raise
+        updated = self.request(
+            "PATCH", f"/repos/{self.repo_slug}/pulls/{existing['number']}", json={"title": title, "body": body}
+        ).json()
+        return updated, False
+
+    def upsert_comment(self, issue_number: int, body: str, marker: str) -> tuple[dict, bool]:
+        """
+        Posts a comment on a PR or issue, or edits the agent's earlier comment carrying `marker`
+        (an HTML comment embedded in the body). Returns (comment, created).
+        """
+        if marker not in body:
+            body = f"{marker}\n{body}"
+        existing = self._find_comment(issue_number, marker)
+        if existing is not None:
+            response = self.request(
+                "PATCH", f"/repos/{self.repo_slug}/issues/comments/{existing['id']}", json={"body": body}
+            )
+            return response.json(), False
+        created = self._create(
+            f"/repos/{self.repo_slug}/issues/{issue_number}/comments", {"body": body},
+            lambda: self._find_comment(issue_number, marker)
+        )
+        return created, True
+
+    def _find_comment(self, issue_number: int, marker: str) -> dict | None:
+        for comment in self._paginate(f"/repos/{self.repo_slug}/issues/{issue_number}/comments"):
+            if marker in (comment.get("body") or ""):
+                return comment
+        return None
+
+    def close(self):
+        self.session.close()
@@ -1,9 +1,11 @@
 from langgraph.graph import StateGraph, END
 from state import AgentState
+from instrumentation import instrument_node
 from agents import (
     mutation_runner_agent,
     report_analyst_agent,
     test_generator_agent,
+    test_verification_agent,
     code_integration_agent,
     dashboard_generator_agent
 )
@@ -17,13 +19,14 @@ def should_generate_tests(state: AgentState) -> str:
         return "generate_dashboard"
     return "generate_tests"
 
-def create_graph():
+def create_graph(checkpointer=None):
     workflow = StateGraph(AgentState)
-    workflow.add_node("run_mutation_test", mutation_runner_agent)
-    workflow.add_node("analyze_report", report_analyst_agent)
-    workflow.add_node("generate_tests", test_generator_agent)
-    workflow.add_node("integrate_code_and_create_pr", code_integration_agent)
-    workflow.add_node("generate_dashboard", dashboard_generator_agent)
+    workflow.add_node("run_mutation_test", instrument_node("run_mutation_test", mutation_runner_agent))
+    workflow.add_node("analyze_report", instrument_node("analyze_report", report_analyst_agent))
+    workflow.add_node("generate_tests", instrument_node("generate_tests", test_generator_agent))
+    workflow.add_node("verify_tests", instrument_node("verify_tests", test_verification_agent))
+    workflow.add_node("integrate_code_and_create_pr", instrument_node("integrate_code_and_create_pr", code_integration_agent))
+    workflow.add_node("generate_dashboard", instrument_node("generate_dashboard", dashboard_generator_agent))
     workflow.set_entry_point("run_mutation_test")
     workflow.add_edge("run_mutation_test", "analyze_report")
     workflow.add_conditional_edges(
@@ -34,7 +37,8 @@ def create_graph():
             "generate_dashboard": "generate_dashboard"
         }
     )
-    workflow.add_edge("generate_tests", "integrate_code_and_create_pr")
+    workflow.add_edge("generate_tests", "verify_tests")
+    workflow.add_edge("verify_tests", "integrate_code_and_create_pr")
     workflow.add_edge("integrate_code_and_create_pr", "generate_dashboard")
     workflow.add_edge("generate_dashboard", END)
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import sqlite3
+from config import HISTORY_DIR, env_int
+
+HISTORY_DB_PATH = os.path.join(HISTORY_DIR, "history.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    repo_slug TEXT NOT NULL,
+    pr_number INTEGER,
+    head_sha TEXT,
+    branch TEXT,
+    recorded_at REAL NOT NULL,
+    mutation_score REAL,
+    projected_score REAL,
+    total_mutants INTEGER,
+    killed INTEGER,
+    survived INTEGER,
+    no_coverage INTEGER,
+    compile_error INTEGER,
+    run_stats TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_repo_time ON runs(repo_slug, recorded_at);
+CREATE INDEX IF NOT EXISTS runs_commit ON runs(repo_slug, pr_number, head_sha);
+-- File paths and mutator names are stored once and referenced by id
+CREATE TABLE IF NOT EXISTS paths (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS mutators (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS file_survivors (
+    path_id INTEGER NOT NULL, run_id INTEGER NOT NULL, survived INTEGER NOT NULL,
+    PRIMARY KEY (path_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS file_survivors_run ON file_survivors(run_id);
+CREATE TABLE IF NOT EXISTS mutator_survivors (
+    mutator_id INTEGER NOT NULL, run_id INTEGER NOT NULL, survived INTEGER NOT NULL,
+    PRIMARY KEY (mutator_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS mutator_survivors_run ON mutator_survivors(run_id);
+"""
+
+
+class HistoryStore:
+    """
+    Append-only record of every finished run: the MutationStats and RunStats of the run plus
+    its survivors per file and per mutator. Queries by repository and date use the
+    (repo_slug, recorded_at) index and per-file queries the (path_id, run_id) key, so they
+    only touch the rows they return however many runs are stored.
+    """
+
+    def __init__(self, path: str = HISTORY_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _intern(self, table: str, column: str, values) -> dict[str, int]:
+        values = list(values)
+        self._conn.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", [(v,) for v in values])
+        ids = {}
+        # Look the ids up in slices to stay under SQLite's bound-parameter limit
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT {column}, id FROM {table} WHERE {column} IN ({','.join('?' * len(chunk))})", chunk
+            )
+            ids.update(rows)
+        return ids
+
+    def record_run(self, state: dict, recorded_at: float | None = None) -> int:
+        """
+        Stores the run described by `state` and returns its id. A run for a commit that is already
+        recorded (a re-run or a resumed run of the same PR head) replaces the earlier record.
+        """
+        stats = state.get("mutation_stats") or {}
+        survived_by_file = state.get("survived_by_file") or {}
+        survived_by_mutator = state.get("survived_by_mutator") or {}
+        with self._conn:
+            if state.get("head_sha"):
+                stale = [row[0] for row in self._conn.execute(
+                    "SELECT id FROM runs WHERE repo_slug = ? AND pr_number = ? AND head_sha = ?",
+                    (state["repo_slug"], state.get("pr_number"), state["head_sha"])
+                )]
+                for run_id in stale:
+                    self._delete_run(run_id)
+            run_id = self._conn.execute(
+                "INSERT INTO runs (repo_slug, pr_number, head_sha, branch, recorded_at, mutation_score,"
+                " projected_score, total_mutants, killed, survived, no_coverage, compile_error, run_stats)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    state["repo_slug"], state.get("pr_number"), state.get("head_sha"), state.get("source_branch"),
+                    recorded_at if recorded_at is not None else time.time(),
+                    state.get("mutation_score"), state.get("projected_score"),
+                    stats.get("total_mutants"), stats.get("killed"), stats.get("survived"),
+                    stats.get("no_coverage"), stats.get("compile_error"),
+                    json.dumps(state.get("run_stats") or {}),
+                )
+            ).lastrowid
+            path_ids = self._intern("paths", "path", survived_by_file)
+            self._conn.executemany(
+                "INSERT INTO file_survivors (path_id, run_id, survived) VALUES (?, ?, ?)",
+                [(path_ids[path], run_id, count) for path, count in survived_by_file.items() if count]
+            )
+            mutator_ids = self._intern("mutators", "name", survived_by_mutator)
+            self._conn.executemany(
+                "INSERT INTO mutator_survivors (mutator_id, run_id, survived) VALUES (?, ?, ?)",
+                [(mutator_ids[name], run_id, count) for name, count in survived_by_mutator.items() if count]
+            )
+        return run_id
+
+    def _delete_run(self, run_id: int):
+        self._conn.execute("DELETE FROM file_survivors WHERE run_id = ?", (run_id,))
+        self._conn.execute("DELETE FROM mutator_survivors WHERE run_id = ?", (run_id,))
+        self._conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    def runs(self, repo_slug: str, since: float | None = None, limit: int = 50) -> list[dict]:
+        """The newest `limit` runs of the repository recorded after `since`, oldest first."""
+        rows = self._conn.execute(
+            "SELECT id, pr_number, head_sha, branch, recorded_at, mutation_score, projected_score,"
+            " total_mutants, killed, survived, no_coverage, compile_error, run_stats"
+            " FROM runs WHERE repo_slug = ? AND recorded_at >= ? ORDER BY recorded_at DESC LIMIT ?",
+            (repo_slug, since or 0, limit)
+        ).fetchall()
+        keys = ("id", "pr_number", "head_sha", "branch", "recorded_at", "mutation_score", "projected_score",
+                "total_mutants", "killed", "survived", "no_coverage", "compile_error", "run_stats")
+        runs = [dict(zip(keys, row)) for row in reversed(rows)]
+        for run in runs:
+            run["run_stats"] = json.loads(run["run_stats"] or "{}")
+        return runs
+
+    def file_trend(self, repo_slug: str, file_path: str, since: float | None = None, limit: int = 50) -> list[tuple[float, int]]:
+        """(recorded_at, survivors) of the file in the newest `limit` runs after `since` that had survivors in it, oldest first."""
+        rows = self._conn.execute(
+            "SELECT r.recorded_at, fs.survived FROM paths p"
+            " JOIN file_survivors fs ON fs.path_id = p.id"
+            " JOIN runs r ON r.id = fs.run_id"
+            " WHERE p.path = ? AND r.repo_slug = ? AND r.recorded_at >= ?"
+            " ORDER BY r.recorded_at DESC LIMIT ?",
+            (file_path, repo_slug, since or 0, limit)
+        ).fetchall()
+        return list(reversed(rows))
+
+    def leaking_files(self, repo_slug: str, since: float | None = None, limit: int = 10) -> list[tuple[str, int, int]]:
+        """Files with the most survivors across the runs after `since`: (path, survivors, runs with survivors)."""
+        return self._conn.execute(
+            "SELECT p.path, SUM(fs.survived), COUNT(*) FROM runs r"
+            " JOIN file_survivors fs ON fs.run_id = r.id"
+            " JOIN paths p ON p.id = fs.path_id"
+            " WHERE r.repo_slug = ? AND r.recorded_at >= ?"
+            " GROUP BY fs.path_id ORDER BY SUM(fs.survived) DESC, p.path LIMIT ?",
+            (repo_slug, since or 0, limit)
+        ).fetchall()
+
+    def mutator_totals(self, repo_slug: str, since: float | None = None) -> dict[str, int]:
+        """Survivors per mutator across the runs after `since`."""
+        rows = self._conn.execute(
+            "SELECT m.name, SUM(ms.survived) FROM runs r"
+            " JOIN mutator_survivors ms ON ms.run_id = r.id"
+            " JOIN mutators m ON m.id = ms.mutator_id"
+            " WHERE r.repo_slug = ? AND r.recorded_at >= ?"
+            " GROUP BY ms.mutator_id ORDER BY SUM(ms.survived) DESC",
+            (repo_slug, since or 0)
+        )
+        return dict(rows)
+
+    def close(self):
+        self._conn.close()
+
+
+def trend_summary(store: HistoryStore, repo_slug: str) -> dict:
+    """
+    The data behind the dashboard's trend charts: the last HISTORY_TREND_RUNS runs of the
+    repository, and the files that leaked the most survivors over the last HISTORY_TREND_DAYS
+    days with their survivor counts per run.
+    """
+    since = time.time() - env_int("HISTORY_TREND_DAYS", 90) * 24 * 3600
+    runs = store.runs(repo_slug, since=since, limit=env_int("HISTORY_TREND_RUNS", 50))
+    leaking = store.leaking_files(repo_slug, since=since, limit=5)
+    return {
+        "runs": [
+            {
+                "recorded_at": run["recorded_at"],
+                "pr_number": run["pr_number"],
+                "head_sha": (run["head_sha"] or "")[:7],
+                "mutation_score": run["mutation_score"],
+                "projected_score": run["projected_score"],
+                "survived": run["survived"],
+                "no_coverage": run["no_coverage"],
+            }
+            for run in runs
+        ],
+        "leaking_files": [
+            {"path": path, "survived": survived, "runs": run_count,
+             "trend": store.file_trend(repo_slug, path, since=since, limit=len(runs) or 1)}
+            for path, survived, run_count in leaking
+        ],
+    }
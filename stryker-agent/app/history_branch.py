@@ -0,0 +1,74 @@
+import os
+import subprocess
+from history import HISTORY_DB_PATH
+from tools import git, git_remote
+
+# File holding the history database on the shared branch
+HISTORY_FILE = "history.sqlite"
+# Pushes raced by another PR's run before giving up on sharing this one
+MAX_PUBLISH_ATTEMPTS = 3
+
+
+def history_branch() -> str | None:
+    """
+    MUTATION_HISTORY_BRANCH: opt-in branch of the repository under test that carries the history
+    database between PRs. Unset (the default), the history stays in HISTORY_DIR and nothing is pushed.
+    """
+    return os.environ.get("MUTATION_HISTORY_BRANCH") or None
+
+
+def fetch_history(branch: str, path: str = HISTORY_DB_PATH) -> str | None:
+    """
+    Replaces the local history database with the shared one. Returns the branch tip it came
+    from ('' when the branch does not exist yet), or None when the branch cannot be read.
+    """
+    push_url, env = git_remote()
+    try:
+        listing = git("ls-remote", push_url, f"refs/heads/{branch}", env=env, capture_output=True, text=True)
+        if not listing.stdout.strip():
+            return ""
+        tip = listing.stdout.split()[0]
+        git("fetch", "--no-tags", push_url, f"refs/heads/{branch}", env=env, capture_output=True)
+        content = git("show", f"{tip}:{HISTORY_FILE}", capture_output=True).stdout
+    except subprocess.CalledProcessError as e:
+        detail = e.stderr.decode(errors="replace") if isinstance(e.stderr, bytes) else e.stderr
+        print(f"WARNING: Could not read the shared history from '{branch}': {(detail or '').strip()}")
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(content)
+    os.replace(path + ".tmp", path)
+    return tip
+
+
+def publish_history(branch: str, lease: str, path: str = HISTORY_DB_PATH) -> bool:
+    """
+    Pushes the history database as a single parentless commit, so superseded copies can be
+    garbage collected. Returns False when another run moved the branch since `lease`.
+    """
+    push_url, env = git_remote()
+    blob = git("hash-object", "-w", path, capture_output=True, text=True).stdout.strip()
+    tree = git("mktree", input=f"100644 blob {blob}\t{HISTORY_FILE}\n", capture_output=True, text=True).stdout.strip()
+    commit = git("commit-tree", tree, "-m", "Update the mutation score history",
+                 capture_output=True, text=True).stdout.strip()
+    result = git("push", f"--force-with-lease=refs/heads/{branch}:{lease}", push_url,
+                 f"{commit}:refs/heads/{branch}", env=env, check=False, capture_output=True, text=True)
+    return result.returncode == 0
+
+
+def update_shared_history(update):
+    """
+    Runs `update()` against the shared history database and publishes the result, starting
+    over from the newer copy when another run published first. Returns update()'s result.
+    """
+    branch = history_branch()
+    if branch is None:
+        return update()
+    for _ in range(MAX_PUBLISH_ATTEMPTS):
+        lease = fetch_history(branch)
+        result = update()
+        if lease is None or publish_history(branch, lease):
+            return result
+        print(f"INFO: Another run updated '{branch}' meanwhile. Retrying on its history.")
+    print(f"WARNING: Could not publish the mutation score history to '{branch}'.")
+    return result
@@ -0,0 +1,186 @@
+import os
+import re
+import json
+import shutil
+from collections import Counter
+from config import REPO_ROOT, AGENT_DATA_DIR
+from report_reader import mutation_score
+from repo_index import get_repo_index
+from instrumentation import run_subprocess
+
+BASELINE_REPORT_PATH = os.path.join(AGENT_DATA_DIR, "baseline", "stryker-report.json")
+# The commit the baseline report's verdicts were produced from
+BASELINE_COMMIT_PATH = os.path.join(AGENT_DATA_DIR, "baseline", "commit")
+MERGED_REPORT_PATH = os.path.join(AGENT_DATA_DIR, "merged", "stryker-report.json")
+_HUNK = re.compile(r"^@@ -\S+ \+(\d+)(?:,(\d+))? @@")
+
+
+def _in_dir(path: str, directory: str) -> bool:
+    return directory == "" or path.startswith(directory.rstrip("/") + "/")
+
+
+def changed_cs_files(commit: str) -> tuple[set[str], set[str]] | None:
+    """
+    Lists the C# files whose content differs between `commit` and HEAD, relative to the repo
+    root. The trees are compared directly, so this holds whatever history lies between them
+    (reverted changes, base branch merges, force pushes). Returns (added_or_modified, deleted),
+    or None if the diff cannot be computed (e.g. the commit is not in the checkout).
+    """
+    result = run_subprocess(
+        ["git", "diff", "--name-status", "--no-renames", commit, "HEAD", "--", "*.cs"],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(f"WARNING: Could not diff against the baseline commit {commit[:12]}: {result.stderr.strip()}")
+        return None
+
+    changed, deleted = set(), set()
+    for line in result.stdout.splitlines():
+        status, _, path = line.partition("\t")
+        if not path:
+            continue
+        if status.startswith("D"):
+            deleted.add(path)
+        else:
+            changed.add(path)
+    return changed, deleted
+
+
+def changed_lines(base_branch: str) -> dict[str, set[int]] | None:
+    """
+    Lists the lines added or modified by the PR in each C# file (new-side line numbers,
+    relative to the repo root). Returns None if the diff cannot be computed.
+    """
+    for base_ref in (f"origin/{base_branch}", base_branch):
+        result = run_subprocess(
+            ["git", "diff", "--unified=0", "--no-renames", f"{base_ref}...HEAD", "--", "*.cs"],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        if result.returncode == 0:
+            break
+    else:
+        print(f"WARNING: Could not diff against '{base_branch}': {result.stderr.strip()}")
+        return None
+
+    lines: dict[str, set[int]] = {}
+    current = None
+    for line in result.stdout.splitlines():
+        if line.startswith("+++ "):
+            current = line[6:] if line.startswith("+++ b/") else None
+        elif line.startswith("@@") and current:
+            hunk = _HUNK.match(line)
+            if hunk:
+                start, count = int(hunk.group(1)), int(hunk.group(2) or 1)
+                lines.setdefault(current, set()).update(range(start, start + count))
+    return lines
+
+
+def source_files_to_mutate(changed: set[str], project_path: str) -> set[str]:
+    """
+    Maps a set of changed files to the production files of the project under test that
+    must be re-mutated. A changed test file (e.g. FooTests.cs) re-mutates its subject (Foo.cs),
+    because the verdicts of that subject's mutants may have changed.
+    """
+    project_dir = os.path.dirname(project_path)
+    index = get_repo_index()
+    targets = {p for p in changed if not index.is_test_file(p) and _in_dir(p, project_dir)}
+
+    tested_subjects = set()
+    for path in changed:
+        if not index.is_test_file(path):
+            continue
+        name = os.path.basename(path)[:-len(".cs")]
+        for suffix in ("Tests", "Test"):
+            if name.endswith(suffix):
+                tested_subjects.add(name[:-len(suffix)] + ".cs")
+                break
+
+    if tested_subjects:
+        for path in index.cs_files:
+            if os.path.basename(path) in tested_subjects and _in_dir(path, project_dir) and not index.is_test_file(path):
+                targets.add(path)
+    return targets
+
+
+def mutate_patterns(files: set[str], project_path: str) -> list[str]:
+    """Builds Stryker '--mutate' globs for the given repo-relative files."""
+    project_dir = os.path.dirname(project_path)
+    return [f"**/{os.path.relpath(path, project_dir)}" for path in sorted(files)]
+
+
+def load_report(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_baseline(report_path: str, commit: str | None):
+    """
+    Keeps a copy of a complete Stryker report, and the commit it describes, so later runs
+    only re-mutate the files changed since. Without a commit the baseline is not kept.
+    """
+    if not commit:
+        print("WARNING: The commit under test is unknown; not saving the baseline report.")
+        return
+    try:
+        os.makedirs(os.path.dirname(BASELINE_REPORT_PATH), exist_ok=True)
+        shutil.copyfile(report_path, BASELINE_REPORT_PATH)
+        with open(BASELINE_COMMIT_PATH, "w") as f:
+            f.write(commit)
+    except OSError as e:
+        print(f"WARNING: Could not save the baseline report: {e}")
+
+
+def baseline_commit() -> str | None:
+    """The commit of the saved baseline report (None for baselines saved without one)."""
+    try:
+        with open(BASELINE_COMMIT_PATH, "r") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def compute_mutation_score(files: dict) -> float:
+    return mutation_score(Counter(
+        mutant["status"] for file_report in files.values() for mutant in file_report.get("mutants", [])
+    ))
+
+
+def merge_reports(baseline: dict, fresh: dict | None, mutated: set[str], deleted: set[str]) -> dict:
+    """
+    Overlays a partial Stryker report onto a full baseline report.
+    Files in `mutated` take their entry from `fresh` (or are dropped if Stryker found no
+    mutants in them), files in `deleted` are dropped, and every other file keeps its
+    baseline results. Mutant ids are renumbered so they stay unique across the merged report.
+    """
+    def _key(file_path: str) -> str:
+        return os.path.relpath(file_path, REPO_ROOT) if os.path.isabs(file_path) else file_path
+
+    dropped = mutated | deleted
+    merged_files = {
+        path: entry for path, entry in baseline.get("files", {}).items()
+        if _key(path) not in dropped
+    }
+    for path, entry in ((fresh or {}).get("files", {})).items():
+        if _key(path) in mutated or path not in merged_files:
+            merged_files[path] = entry
+
+    next_id = 0
+    for entry in merged_files.values():
+        for mutant in entry.get("mutants", []):
+            mutant["id"] = str(next_id)
+            next_id += 1
+
+    merged = {key: value for key, value in baseline.items() if key != "files"}
+    merged["files"] = merged_files
+    merged["mutationScore"] = compute_mutation_score(merged_files)
+    return merged
+
+
+def write_merged_report(report: dict) -> str:
+    """Writes the merged report outside StrykerOutput and returns its absolute path."""
+    os.makedirs(os.path.dirname(MERGED_REPORT_PATH), exist_ok=True)
+    with open(MERGED_REPORT_PATH, "w") as f:
+        json.dump(report, f)
+    return MERGED_REPORT_PATH
@@ -0,0 +1,210 @@
+import os
+import re
+import json
+import time
+import resource
+import threading
+import subprocess
+from contextlib import contextmanager
+from functools import wraps
+from config import REPO_ROOT
+
+TRACE_FORMATS = ("chrome", "jsonl")
+# 'user:password@' (or 'token@') in a URL
+_URL_CREDENTIALS = re.compile(r"(\b[a-zA-Z][a-zA-Z0-9+.-]*://)[^/\s@]+@")
+
+
+def redact_credentials(text: str) -> str:
+    """Masks credentials embedded in URLs, for text bound for traces, logs or state."""
+    return _URL_CREDENTIALS.sub(r"\1***@", text)
+
+
+def _peak_rss_mb() -> tuple[float, float]:
+    """High-water resident set size of this process and of its waited-for children, in MiB (Linux reports KiB)."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return round(own, 1), round(children, 1)
+
+
+class Tracer:
+    """
+    Collects timed spans for pipeline nodes, subprocesses and LLM calls.
+    Every span records wall and CPU time plus the peak RSS seen when it ends; the whole
+    trace can be written as a Chrome trace (chrome://tracing, Perfetto) or as JSON lines.
+    """
+
+    def __init__(self):
+        self.events: list[dict] = []
+        self.llm_calls = 0
+        self.llm_errors = 0
+        self.llm_latency_seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, category: str, start: float, end: float, args: dict):
+        with self._lock:
+            self.events.append({
+                "name": name,
+                "cat": category,
+                "ts": round((start - self._origin) * 1e6),
+                "dur": round((end - start) * 1e6),
+                "tid": threading.get_ident() % 100000,
+                "args": args,
+            })
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            own_rss, child_rss = _peak_rss_mb()
+            args.update({
+                "cpu_seconds": round(time.process_time() - cpu_start, 3),
+                "peak_rss_mb": own_rss,
+                "peak_child_rss_mb": child_rss,
+            })
+            self._record(name, category, start, end, args)
+
+    def record_llm_call(self, latency: float, prompt_tokens: int, completion_tokens: int, error: bool = False):
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_errors += int(error)
+            self.llm_latency_seconds += latency
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        end = time.perf_counter()
+        self._record("llm_call", "llm", end - latency, end, {
+            "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "error": error
+        })
+
+    def llm_counters(self) -> dict:
+        return {
+            "llm_calls": self.llm_calls,
+            "llm_errors": self.llm_errors,
+            "llm_latency_seconds": round(self.llm_latency_seconds, 3),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+    def write(self, path: str, trace_format: str = "chrome"):
+        if trace_format not in TRACE_FORMATS:
+            raise ValueError(f"Unknown trace format '{trace_format}'. Expected one of {TRACE_FORMATS}.")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            if trace_format == "chrome":
+                events = [dict(e, ph="X", pid=os.getpid()) for e in self.events]
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+            else:
+                for event in self.events:
+                    f.write(json.dumps(event) + "\n")
+
+
+tracer = Tracer()
+
+
+def _command_name(command: list[str]) -> str:
+    """'git -c a=b push ...' -> 'git push'."""
+    args = iter(command[1:])
+    for arg in args:
+        if arg == "-c":
+            next(args, None)
+        elif not arg.startswith("-"):
+            return f"{command[0]} {arg}"
+    return command[0]
+
+
+def run_subprocess(command: list[str], **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run with a trace span named after the command (e.g. 'git push')."""
+    name = _command_name(command)
+    with tracer.span(name, "subprocess", command=redact_credentials(" ".join(command))[:300]) as args:
+        result = subprocess.run(command, **kwargs)
+        args["returncode"] = result.returncode
+        return result
+
+
+def instrument_node(name: str, node):
+    """
+    Wraps a LangGraph node so each call is traced and a per-stage summary (wall/CPU time,
+    peak RSS, LLM calls, latency and tokens) is appended to state["stage_timings"].
+    """
+    @wraps(node)
+    def wrapper(state):
+        llm_before = tracer.llm_counters()
+        start, cpu_start = time.perf_counter(), time.process_time()
+        with tracer.span(name, "node"):
+            result = node(state)
+        llm_after = tracer.llm_counters()
+        own_rss, child_rss = _peak_rss_mb()
+        timing = {
+            "stage": name,
+            "wall_seconds": round(time.perf_counter() - start, 3),
+            "cpu_seconds": round(time.process_time() - cpu_start, 3),
+            "peak_rss_mb": own_rss,
+            "peak_child_rss_mb": child_rss,
+        }
+        timing.update({key: round(llm_after[key] - llm_before[key], 3) for key in llm_after})
+        if isinstance(result, dict):
+            result["stage_timings"] = list(result.get("stage_timings") or []) + [timing]
+        return result
+    return wrapper
+
+
+def llm_usage_callback():
+    """A LangChain callback handler that reports every chat model call to the tracer."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class LLMUsageCallback(BaseCallbackHandler):
+        def __init__(self):
+            self._started: dict = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._started[run_id] = time.perf_counter()
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._started[run_id] = time.perf_counter()
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            latency = time.perf_counter() - self._started.pop(run_id, time.perf_counter())
+            prompt_tokens, completion_tokens = _token_usage(response)
+            tracer.record_llm_call(latency, prompt_tokens, completion_tokens)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            latency = time.perf_counter() - self._started.pop(run_id, time.perf_counter())
+            tracer.record_llm_call(latency, 0, 0, error=True)
+
+    return LLMUsageCallback()
+
+
+def _token_usage(response) -> tuple[int, int]:
+    """Extracts (prompt, completion) token counts from an LLMResult, whichever way the provider reports them."""
+    usage = (response.llm_output or {}).get("token_usage") or (response.llm_output or {}).get("usage_metadata")
+    if not usage:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or \
+                    (getattr(message, "response_metadata", None) or {}).get("usage_metadata")
+                if usage:
+                    break
+            if usage:
+                break
+    usage = usage or {}
+    prompt = usage.get("input_tokens") or usage.get("prompt_tokens") or usage.get("prompt_token_count") or 0
+    completion = usage.get("output_tokens") or usage.get("completion_tokens") or usage.get("candidates_token_count") or 0
+    return int(prompt), int(completion)
+
+
+def write_trace():
+    """Writes the run's trace to AGENT_TRACE_PATH in AGENT_TRACE_FORMAT ('chrome' or 'jsonl')."""
+    trace_format = os.environ.get("AGENT_TRACE_FORMAT", "chrome").lower()
+    default_name = "agent-trace.json" if trace_format == "chrome" else "agent-trace.jsonl"
+    path = os.environ.get("AGENT_TRACE_PATH", os.path.join(REPO_ROOT, default_name))
+    try:
+        tracer.write(path, trace_format)
+        print(f"Trace written to {path} ({trace_format} format).")
+    except (OSError, ValueError) as e:
+        print(f"WARNING: Could not write the trace: {e}")
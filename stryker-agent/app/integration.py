@@ -0,0 +1,61 @@
+import os
+import textwrap
+from csharp import parse_members
+from repo_index import TEST_ATTRIBUTES
+
+INDENTATION = "    "
+
+
+def insertion_point(content: str, file_path: str) -> int:
+    """
+    Returns the offset of the closing brace of the class new tests belong in: the class named
+    after the file, else the last class declaring tests, else the last class. Braces in comments
+    and strings are ignored. Falls back to the last '}' of the file when no class is found.
+    """
+    types = [m for m in parse_members(content) if m.kind == "type"]
+    if types:
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        named = [t for t in types if t.name == stem]
+        with_tests = [t for t in types if TEST_ATTRIBUTES.search(content, t.body_start, t.body_end)]
+        target = (named or with_tests or types)[-1]
+        return target.body_end
+    last_brace_index = content.rfind("}")
+    if last_brace_index == -1:
+        raise ValueError(f"Could not find closing brace in {file_path}")
+    return last_brace_index
+
+
+def insert_tests(content: str, test_codes: list[str], file_path: str) -> tuple[str, list[tuple[int, int]]]:
+    """
+    Inserts generated test methods, in order, at the end of the test class in one pass.
+    Returns the new content and the 1-based first/last lines of each inserted method.
+    """
+    point = insertion_point(content, file_path)
+    line_start = content.rfind("\n", 0, point) + 1
+    brace_indent = content[line_start:point]
+    if brace_indent.strip():
+        # Closing brace shares its line with code (e.g. 'class T { }'): split right before it
+        line_start, brace_indent = point, ""
+    indent = brace_indent + INDENTATION
+
+    head = content[:line_start].rstrip()
+    line = head.count("\n") + 1
+    blocks, ranges = [], []
+    for test_code in test_codes:
+        block = textwrap.indent(test_code.strip("\n"), indent)
+        start_line = line + 2
+        end_line = start_line + block.count("\n")
+        blocks.append(block)
+        ranges.append((start_line, end_line))
+        line = end_line
+
+    new_content = head + "".join(f"\n\n{block}" for block in blocks) + "\n" + content[line_start:]
+    return new_content, ranges
+
+
+def group_by_file(tests: list[dict]) -> dict[str, list[int]]:
+    """Maps each target test file to the indexes of its tests, in their original order."""
+    groups: dict[str, list[int]] = {}
+    for index, test in enumerate(tests):
+        groups.setdefault(test["target_test_file"], []).append(index)
+    return groups
@@ -0,0 +1,72 @@
+import os
+import hashlib
+from cache_store import SqliteCache
+from config import AGENT_DATA_DIR, env_int
+from state import SurvivedMutation
+from csharp import normalize_code
+
+LLM_CACHE_PATH = os.path.join(AGENT_DATA_DIR, "llm-cache.sqlite")
+
+
+def open_llm_cache() -> SqliteCache:
+    max_bytes = env_int("LLM_CACHE_MAX_MB", 64) * 1024 * 1024
+    ttl_seconds = env_int("LLM_CACHE_TTL_DAYS", 14) * 24 * 3600
+    return SqliteCache(LLM_CACHE_PATH, max_bytes, ttl_seconds)
+
+
+def _digest(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def mutation_key(mutation: SurvivedMutation) -> str:
+    """
+    Identifies a mutation independently of its run-specific id and line number: re-pushing
+    a PR renumbers mutants and shifts lines, but the same change in the same file is the same prompt.
+    """
+    return _digest(
+        os.path.normpath(mutation["file_path"]).replace("\\", "/"),
+        normalize_code(mutation["original_code"]),
+        normalize_code(mutation["mutated_code"]),
+        mutation["mutator_name"],
+    )
+
+
+def prompt_key(prompt_template: str, mutations: list[SurvivedMutation], test_file_content: str,
+               code_under_test: str = "") -> str:
+    """
+    Cache key of one generation prompt: the prompt wording, the (sorted) mutations it covers,
+    the content of the test file it extends and, for batched prompts, the method source
+    shown to the model. Editing any of these invalidates the entry.
+    """
+    return _digest(
+        prompt_template,
+        normalize_code(test_file_content),
+        normalize_code(code_under_test),
+        *sorted(mutation_key(m) for m in mutations),
+    )
+
+
+def to_cached(response: dict, mutations: list[SurvivedMutation]) -> dict:
+    """Replaces the mutant ids in a batched response with mutation keys, which survive across runs."""
+    if "tests" not in response:
+        return response
+    key_by_id = {m["mutant_id"]: mutation_key(m) for m in mutations}
+    return dict(response, tests=[
+        dict(test, mutant_ids=[key_by_id[str(i)] for i in test.get("mutant_ids") or [] if str(i) in key_by_id])
+        for test in response["tests"]
+    ])
+
+
+def from_cached(response: dict, mutations: list[SurvivedMutation]) -> dict:
+    """Inverse of to_cached for the mutations of the current run."""
+    if "tests" not in response:
+        return response
+    id_by_key = {mutation_key(m): m["mutant_id"] for m in mutations}
+    return dict(response, tests=[
+        dict(test, mutant_ids=[id_by_key[k] for k in test.get("mutant_ids") or [] if k in id_by_key])
+        for test in response["tests"]
+    ])
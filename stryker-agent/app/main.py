@@ -1,42 +1,90 @@
 import os
 import sys
+import shutil
+import argparse
+from config import REPO_ROOT
 from graph import create_graph
 from state import AgentState
+from solution import discover_projects
+from instrumentation import write_trace, instrument_node
+from agents import mutation_runner_agent
+import incremental
+import sharding
+import checkpointing
 
-def find_main_project_file() -> str:
-    csproj_files = []
-    for root, _, files in os.walk("/repo"):
-        for file in files:
-            if file.endswith(".csproj"):
-                csproj_files.append(os.path.join(root, file))
-    non_test_projects = [p for p in csproj_files if "test" not in p.lower()]
-    if len(non_test_projects) == 1:
-        return os.path.relpath(non_test_projects[0], "/repo")
-    elif len(non_test_projects) == 0:
+def find_project_files() -> list[str]:
+    projects = discover_projects()
+    if not projects:
         raise FileNotFoundError("Auto-discovery failed: No non-test .csproj file found.")
-    else:
-        raise FileNotFoundError(
-            f"Auto-discovery failed: Found multiple non-test .csproj files. Found: {non_test_projects}"
-        )
+    return projects
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stryker mutation testing agent.")
+    parser.add_argument(
+        "--shard", metavar="i/N",
+        help="Only mutate shard i of N (file-based, balanced by size) and write its partial report."
+    )
+    parser.add_argument(
+        "--shard-output", metavar="PATH",
+        help="Where a shard run writes its report (default: /repo/stryker-shard-<i>-of-<N>.json)."
+    )
+    parser.add_argument(
+        "--from-reports", metavar="PATH", nargs="+",
+        help="Merge these shard reports and run the rest of the pipeline on them instead of running Stryker."
+    )
+    args = parser.parse_args(argv)
+    if args.shard and args.from_reports:
+        parser.error("--shard and --from-reports cannot be combined.")
+    if args.shard:
+        try:
+            sharding.parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+def run_shard(initial_state: AgentState, output_path: str):
+    """Runs only the mutation step for one shard and copies its report to output_path."""
+    state = instrument_node("run_mutation_test", mutation_runner_agent)(initial_state)
+    if state.get("error_message"):
+        print(f"❌ Error: {state['error_message']}", file=sys.stderr)
+        sys.exit(1)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    shutil.copyfile(os.path.join(REPO_ROOT, state["stryker_report_path"]), output_path)
+    print(f"✅ Shard {initial_state['shard']} report written to {output_path}")
 
 def main():
+    args = parse_args()
     try:
-        project_path = find_main_project_file()
-        print(f"✅ Automatically discovered project file: {project_path}")
+        project_paths = find_project_files()
+        print(f"✅ Automatically discovered project file(s): {', '.join(project_paths)}")
     except FileNotFoundError as e:
         print(f"❌ Error: {e}", file=sys.stderr)
         sys.exit(1)
+
+    stryker_report_path = None
+    if args.from_reports:
+        try:
+            merged = sharding.merge_shard_reports(args.from_reports)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error: Could not merge the shard reports: {e}", file=sys.stderr)
+            sys.exit(1)
+        stryker_report_path = incremental.write_merged_report(merged)
+        print(f"✅ Merged {len(args.from_reports)} shard report(s) into {stryker_report_path}")
         
     initial_state: AgentState = {
         # Inputs
-        "project_path": project_path,
+        "project_path": project_paths[0],
+        "project_paths": project_paths,
         "repo_slug": os.environ["GITHUB_REPOSITORY"],
         "source_branch": os.environ["SOURCE_BRANCH"],
         "pr_number": int(os.environ["PR_NUMBER"]),
+        "shard": args.shard,
+        "head_sha": checkpointing.head_sha(),
         # Core State
-        "stryker_report_path": None,
+        "stryker_report_path": stryker_report_path,
         "mutation_score": 0.0,
         "survived_mutations": [],
+        "source_files": [],
         "generated_tests": [],
         "new_branch_name": None,
         "new_pr_url": None,
@@ -48,9 +96,27 @@ def main():
         "projected_score": None,
         "run_stats": None,
         "unfixed_mutants": [],
+        "stage_timings": [],
     }
-    app = create_graph()
-    app.invoke(initial_state)
+    try:
+        if args.shard:
+            index, count = sharding.parse_shard(args.shard)
+            run_shard(initial_state, args.shard_output or os.path.join(REPO_ROOT, f"stryker-shard-{index}-of-{count}.json"))
+            return
+        if not checkpointing.checkpoints_enabled():
+            create_graph().invoke(initial_state)
+            return
+        app = create_graph(checkpointing.open_checkpointer())
+        config = {"configurable": {"thread_id": checkpointing.thread_id(initial_state["repo_slug"], initial_state["pr_number"])}}
+        resume_config = None if args.from_reports else checkpointing.find_resume_point(app, config, initial_state["head_sha"])
+        if resume_config is not None:
+            next_nodes = ", ".join(app.get_state(resume_config).next)
+            print(f"✅ Resuming the previous run for this commit at: {next_nodes}")
+            app.invoke(None, resume_config)
+        else:
+            app.invoke(initial_state, config)
+    finally:
+        write_trace()
 
 if __name__ == "__main__":
     main()
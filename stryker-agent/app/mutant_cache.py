@@ -0,0 +1,128 @@
+import os
+import hashlib
+from cache_store import SqliteCache
+from config import REPO_ROOT, AGENT_DATA_DIR, env_int
+from repo_index import get_repo_index
+from csharp import line_starts, location_span
+
+MUTANT_CACHE_PATH = os.path.join(AGENT_DATA_DIR, "mutant-cache.sqlite")
+
+# Verdicts that only depend on the source file and the tests, so they can be reused as-is.
+# Timeouts and runtime errors are environment dependent and always re-run.
+REUSABLE_STATUSES = ("Killed", "Survived", "NoCoverage", "CompileError")
+
+
+def open_mutant_cache() -> SqliteCache:
+    max_bytes = env_int("STRYKER_MUTANT_CACHE_MAX_MB", 256) * 1024 * 1024
+    return SqliteCache(MUTANT_CACHE_PATH, max_bytes)
+
+
+def _sha256(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _read_bytes(relative_path: str) -> bytes:
+    with open(os.path.join(REPO_ROOT, relative_path), "rb") as f:
+        return f.read()
+
+
+def production_files(project_path: str) -> set[str]:
+    """Lists the production C# files of the project under test, relative to the repo root."""
+    index = get_repo_index()
+    return {p for p in index.cs_files if index.project_of(p) == project_path and not index.is_test_file(p)}
+
+
+def tests_digest() -> str:
+    """
+    Content digest of the test code every source file's verdicts depend on: all test files.
+    Any test can reach any source file (through helpers, base classes or shared fixtures, not
+    only its conventionally named FooTests.cs), so no source file is keyed on a subset.
+    """
+    index = get_repo_index()
+    test_files = sorted(p for p in index.cs_files if index.is_test_file(p))
+    return _sha256(*(p.encode() + b"\0" + _read_bytes(p) for p in test_files))
+
+
+def plan_cached_run(cache: SqliteCache, candidates: set[str], project_path: str) -> dict:
+    """
+    Splits the candidate files into cached and to-be-mutated work.
+    Returns a plan with the Stryker '--mutate' patterns still needed (whole files, or
+    character spans for the invalidated mutants of a cached file) and the cached entries
+    to reassemble the report from.
+    """
+    project_dir = os.path.dirname(project_path)
+    tests = tests_digest().encode()
+    plan = { "fingerprints": {}, "cached": {}, "partial": {}, "patterns": [], "hits": 0 }
+
+    for path in sorted(candidates):
+        source_bytes = _read_bytes(path)
+        fingerprint = _sha256(source_bytes, tests)
+        plan["fingerprints"][path] = fingerprint
+        glob = f"**/{os.path.relpath(path, project_dir)}"
+
+        entry = cache.get(fingerprint)
+        if entry is None:
+            plan["patterns"].append(glob)
+            continue
+
+        reusable = [m for m in entry["mutants"] if m["status"] in REUSABLE_STATUSES]
+        stale = [m for m in entry["mutants"] if m["status"] not in REUSABLE_STATUSES]
+        plan["hits"] += len(reusable)
+        plan["cached"][path] = dict(entry, mutants=reusable)
+        if stale:
+            source = source_bytes.decode("utf-8-sig")
+            starts = line_starts(source)
+            spans = {location_span(source, starts, m["location"]) for m in stale}
+            plan["partial"][path] = spans
+            plan["patterns"].extend(f"{glob}{{{start}..{end}}}" for start, end in sorted(spans))
+    return plan
+
+
+def assemble_report(cache: SqliteCache, plan: dict, fresh: dict | None) -> tuple[dict, int]:
+    """
+    Combines cached verdicts with a fresh (possibly partial) Stryker report into one
+    report covering every planned file, and stores the new per-file results in the cache.
+    Returns the assembled report and the number of mutants that had to be re-run.
+    """
+    fresh_files = {}
+    for file_path, entry in (fresh or {}).get("files", {}).items():
+        key = os.path.relpath(file_path, REPO_ROOT) if os.path.isabs(file_path) else file_path
+        fresh_files[key] = entry
+
+    files, misses = {}, 0
+    for path, fingerprint in plan["fingerprints"].items():
+        fresh_entry = fresh_files.get(path)
+        if path in plan["cached"]:
+            entry = plan["cached"][path]
+            if path in plan["partial"] and fresh_entry is not None:
+                source = _read_bytes(path).decode("utf-8-sig")
+                starts = line_starts(source)
+                rerun = [
+                    m for m in fresh_entry.get("mutants", [])
+                    if m["status"] != "Ignored" and any(
+                        s <= location_span(source, starts, m["location"])[0] <= e for s, e in plan["partial"][path]
+                    )
+                ]
+                misses += len(rerun)
+                entry = dict(entry, mutants=entry["mutants"] + rerun)
+        elif fresh_entry is not None:
+            entry = fresh_entry
+            misses += len(entry.get("mutants", []))
+        else:
+            # Stryker produced no mutants for this file
+            entry = { "language": "cs", "mutants": [] }
+
+        cache.put(fingerprint, {key: value for key, value in entry.items() if key != "source"})
+        if "source" not in entry:
+            entry = dict(entry, source=_read_bytes(path).decode("utf-8-sig"))
+        files[os.path.join(REPO_ROOT, path)] = entry
+
+    cache.evict()
+    report = {key: value for key, value in (fresh or {}).items() if key != "files"}
+    report.setdefault("schemaVersion", "1")
+    report["files"] = files
+    return report, misses
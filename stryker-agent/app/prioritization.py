@@ -0,0 +1,62 @@
+from state import SurvivedMutation
+from csharp import normalize_code
+
+RISK_WEIGHTS = {"HIGH": 3.0, "MEDIUM": 2.0, "LOW": 1.0}
+# Bonus for survivors on lines the PR touched, and (smaller) anywhere in a file it touched
+CHANGED_LINE_BONUS = 1.0
+CHANGED_FILE_BONUS = 0.3
+
+
+def assess_risk(mutator_name: str) -> tuple[str, str]:
+    """Assigns a risk level based on the mutator type."""
+    high_risk = ["Block", "Statement", "Linq", "Equality", "Arithmetic"]
+    if any(term in mutator_name for term in high_risk):
+        return ('HIGH', '🔥')
+
+    medium_risk = ["Method", "Update", "Boolean"]
+    if any(term in mutator_name for term in medium_risk):
+        return ('MEDIUM', '⚠️')
+
+    return ('LOW', '⚪')
+
+
+def _dedupe_key(mutation: SurvivedMutation) -> tuple[str, int, str]:
+    # Different mutators often produce the same code on the same line; one test covers them all
+    replacement = normalize_code(mutation["mutated_code"]).replace(" ", "")
+    return (mutation["file_path"], mutation["location"]["start"]["line"], replacement)
+
+
+def priority(mutation: SurvivedMutation, survived_by_file: dict[str, int],
+             changed_lines: dict[str, set[int]] | None) -> float:
+    """
+    Scores a survivor: risk of its mutator, scaled up by how many survivors its file has
+    relative to the worst file (hotspot density) and by whether the PR changed its line or file.
+    """
+    risk_level, _ = assess_risk(mutation["mutator_name"])
+    busiest = max(survived_by_file.values(), default=0)
+    density = survived_by_file.get(mutation["file_path"], 0) / busiest if busiest else 0.0
+    churn = 0.0
+    if changed_lines is not None and mutation["file_path"] in changed_lines:
+        touched = changed_lines[mutation["file_path"]]
+        start, end = mutation["location"]["start"]["line"], mutation["location"]["end"]["line"]
+        churn = CHANGED_LINE_BONUS if any(line in touched for line in range(start, end + 1)) else CHANGED_FILE_BONUS
+    return RISK_WEIGHTS[risk_level] * (1 + density) * (1 + churn)
+
+
+def prioritize(mutations: list[SurvivedMutation], survived_by_file: dict[str, int],
+               changed_lines: dict[str, set[int]] | None = None) -> tuple[list[SurvivedMutation], int]:
+    """
+    Orders survivors from most to least valuable to test (ties keep report order) and drops
+    equivalent mutants, i.e. the same replacement on the same line of the same file.
+    Returns (ranked survivors, number of duplicates dropped).
+    """
+    ranked = sorted(mutations, key=lambda m: -priority(m, survived_by_file, changed_lines))
+    seen = set()
+    unique = []
+    for mutation in ranked:
+        key = _dedupe_key(mutation)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(mutation)
+    return unique, len(ranked) - len(unique)
@@ -0,0 +1,157 @@
+from config import env_int
+from csharp import mask_source, parse_members, enclosing_member, member_source, line_starts, estimate_tokens
+from repo_index import TEST_ATTRIBUTES
+
+ELIDED_BODY = "{ /* body omitted */ }"
+# Share of the prompt budget the code under test may take; the test context gets the rest
+CODE_SHARE = 0.5
+# Roughly four characters per token (see csharp.estimate_tokens)
+CHARS_PER_TOKEN = 4
+
+
+def context_budget() -> int | None:
+    """Tokens of code and test context per prompt (TEST_GEN_CONTEXT_TOKEN_BUDGET, 0 for no limit)."""
+    return env_int("TEST_GEN_CONTEXT_TOKEN_BUDGET", 4000) or None
+
+
+def summarize_tests(source: str, examples: int = 1, members: list | None = None) -> str:
+    """
+    The test file with the bodies of its test methods elided, after the first `examples` tests.
+    Usings, fields, constructors and helper methods stay in full, so the model still sees how
+    the class under test is set up and every test name it must not reuse.
+    """
+    starts = line_starts(source)
+    pieces, position, kept = [], 0, 0
+    for member in members if members is not None else parse_members(source):
+        if member.kind != "method" or member.body_start < position:
+            continue
+        if not TEST_ATTRIBUTES.search(source[starts[member.start_line - 1]:member.body_start]):
+            continue
+        if kept < examples:
+            kept += 1
+            continue
+        pieces.append(source[position:member.body_start].rstrip() + " ")
+        pieces.append(ELIDED_BODY)
+        position = member.body_end + 1
+    pieces.append(source[position:])
+    return "".join(pieces)
+
+
+def declarations(source: str, members: list | None = None) -> str:
+    """One line per type and method declaration, attributes included (comments and literals blanked)."""
+    starts = line_starts(source)
+    masked = mask_source(source)
+    return "\n".join(" ".join(masked[starts[m.start_line - 1]:m.body_start].split()) for m in (members if members is not None else parse_members(source)))
+
+
+def _truncate(text: str, budget: int) -> str:
+    """The leading lines of `text` that fit in `budget` tokens, with a note on how many were dropped."""
+    lines = text.splitlines()
+    kept, used = [], 0
+    for line in lines:
+        # Leave room for the note about the omitted lines
+        if used + len(line) + 1 > (budget - 12) * CHARS_PER_TOKEN:
+            kept.append(f"// ... {len(lines) - len(kept)} more declaration(s) omitted")
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return "\n".join(kept)
+
+
+def _window(source_lines: list[str], first: int, last: int, bounds: tuple[int, int], limit: int) -> str:
+    """Lines first..last (1-based), widened one line at a time on both sides while within bounds and `limit` characters."""
+    lo, hi = max(bounds[0], first - 1), min(bounds[1], last)
+    used = sum(len(line) + 1 for line in source_lines[lo:hi])
+    while used > limit and hi - lo > 1:
+        hi -= 1
+        used -= len(source_lines[hi]) + 1
+    grew = True
+    while grew:
+        grew = False
+        for side in (-1, 1):
+            index = lo - 1 if side < 0 else hi
+            if bounds[0] <= index < bounds[1] and used + len(source_lines[index]) + 1 <= limit:
+                used += len(source_lines[index]) + 1
+                lo, hi = (lo - 1, hi) if side < 0 else (lo, hi + 1)
+                grew = True
+    window = source_lines[lo:hi]
+    if lo > bounds[0]:
+        window.insert(0, "// ...")
+    if hi < bounds[1]:
+        window.append("// ...")
+    return "\n".join(window)
+
+
+class ContextBuilder:
+    """
+    Builds the code and test context of each generation prompt under a hard token budget:
+    the method enclosing the mutants (or the lines around them when the method is too long),
+    then as much of the test file as still fits — in full, with test bodies elided, or as a
+    list of declarations. Records, per prompt, the tokens of the untrimmed and of the sent context.
+    """
+
+    def __init__(self, budget: int | None):
+        self.budget = budget
+        # (untrimmed tokens, sent tokens) of each prompt built, in order
+        self.usage: list[tuple[int, int]] = []
+        self._members: dict[str, list] = {}
+        self._renderings: dict[str, dict] = {}
+
+    def code(self, file_path: str, source: str, lines: list[int]) -> str:
+        """The enclosing method of the given lines, prefixed with its type, or a window around the lines."""
+        if file_path not in self._members:
+            self._members[file_path] = parse_members(source)
+        members = self._members[file_path]
+        method = enclosing_member(members, lines[0], "method")
+        if method is not None and not all(method.start_line <= line <= method.end_line for line in lines):
+            method = None
+        owner = enclosing_member(members, lines[0], "type")
+        prefix = f"// Member of {owner.name}\n" if owner is not None else ""
+        if method is not None:
+            text = prefix + member_source(source, method)
+            if self.budget is None or estimate_tokens(text) <= self.budget * CODE_SHARE:
+                return text
+        if self.budget is None and method is None:
+            return source
+        source_lines = source.splitlines()
+        bounds = (method.start_line - 1, method.end_line) if method is not None else (0, len(source_lines))
+        limit = int(self.budget * CODE_SHARE) * CHARS_PER_TOKEN - len(prefix)
+        return prefix + _window(source_lines, min(lines), max(lines), bounds, limit)
+
+    def tests(self, test_file: str, content: str, budget: int | None) -> str:
+        """The largest rendering of the test file that fits in `budget` tokens."""
+        if budget is None or estimate_tokens(content) <= budget:
+            return content
+        # Each test file is parsed once and each rendering built only when a smaller budget needs it
+        renderings = self._renderings.setdefault(test_file, {})
+        if "members" not in renderings:
+            renderings["members"] = parse_members(content)
+        members = renderings["members"]
+        builders = (
+            ("example", lambda: summarize_tests(content, 1, members)),
+            ("signatures", lambda: summarize_tests(content, 0, members)),
+            ("declarations", lambda: declarations(content, members)),
+        )
+        for name, build in builders:
+            if name not in renderings:
+                renderings[name] = build()
+            if estimate_tokens(renderings[name]) <= budget:
+                return renderings[name]
+        return _truncate(renderings["declarations"], budget)
+
+    def build(self, file_path: str, source: str, lines: list[int], test_file: str, test_content: str,
+              untrimmed_code: str = "") -> tuple[str, str]:
+        """
+        Returns (code under test, existing tests) for one prompt. `untrimmed_code` is the code the
+        prompt would otherwise carry; without it the code sent is its own untrimmed baseline, so
+        only the trimming of the test file counts towards the tokens saved.
+        """
+        code = self.code(file_path, source, lines)
+        code_tokens = estimate_tokens(code)
+        remaining = None if self.budget is None else max(0, self.budget - code_tokens)
+        tests = self.tests(test_file, test_content, remaining)
+        self.usage.append((
+            estimate_tokens(test_content) + max(code_tokens, estimate_tokens(untrimmed_code)),
+            estimate_tokens(tests) + code_tokens,
+        ))
+        return code, tests
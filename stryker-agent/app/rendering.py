@@ -0,0 +1,102 @@
+import os
+import json
+from collections import Counter
+from config import AGENT_DATA_DIR
+
+TEMPLATE_DIR = os.environ.get(
+    "STRYKER_AGENT_TEMPLATE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+)
+# The Docker image ships a pre-filled cache (see Dockerfile); otherwise it lives with the other agent caches
+TEMPLATE_CACHE_DIR = os.environ.get("JINJA_CACHE_DIR", os.path.join(AGENT_DATA_DIR, "jinja-cache"))
+
+_environment = None
+
+
+def get_template_environment():
+    """
+    Returns the shared Jinja2 environment, importing Jinja2 on first use. Compiled templates
+    are kept in a bytecode cache, so a run only parses a template when its source changed.
+    """
+    global _environment
+    if _environment is None:
+        from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+        bytecode_cache = None
+        try:
+            os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+        except OSError as e:
+            print(f"WARNING: Template cache disabled ({e}).")
+        _environment = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR), bytecode_cache=bytecode_cache, auto_reload=False
+        )
+    return _environment
+
+
+def render_to_file(template_name: str, path: str, **context) -> int:
+    """
+    Renders a template straight into `path` with Jinja's generate(), so the page is never held
+    in memory as one string. Returns the number of bytes written.
+    """
+    template = get_template_environment().get_template(template_name)
+    written = 0
+    with open(path, "w", encoding="utf-8", buffering=1024 * 1024) as f:
+        for chunk in template.generate(**context):
+            written += f.write(chunk)
+    return written
+
+
+def script_json(value) -> str:
+    """Compact JSON that is safe to embed inside a <script> element (as Jinja's tojson escapes it)."""
+    return (json.dumps(value, separators=(",", ":"))
+            .replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026").replace("'", "\\u0027"))
+
+
+def mutant_table(unfixed_mutants: list[dict]) -> dict:
+    """
+    The Mutation Workbench rows in columnar form: file paths, mutator names, statuses and risk
+    levels are listed once and each row holds indexes into them, which keeps 100k rows to a
+    few MB. Rows are [file, line, mutator, status, risk].
+    """
+    lookups = {"files": {}, "mutators": {}, "statuses": {}, "risks": {}}
+
+    def index(kind: str, value: str) -> int:
+        table = lookups[kind]
+        if value not in table:
+            table[value] = len(table)
+        return table[value]
+
+    rows = [
+        [index("files", m["file_path"]), m["line"], index("mutators", m["mutator_name"]),
+         index("statuses", m["status"]), index("risks", m["risk_level"])]
+        for m in unfixed_mutants
+    ]
+    icons = {m["risk_level"]: m["risk_icon"] for m in unfixed_mutants}
+    return {
+        "files": list(lookups["files"]),
+        "mutators": list(lookups["mutators"]),
+        "statuses": list(lookups["statuses"]),
+        "risks": [{"level": level, "icon": icons[level]} for level in lookups["risks"]],
+        "rows": rows,
+    }
+
+
+def chart_data(state: dict, top: int = 15) -> dict:
+    """The summary charts' inputs: status totals and the top mutators and files by survivors."""
+    return {
+        "mutation_stats": state.get("mutation_stats") or {},
+        "survived_by_mutator": dict(Counter(state.get("survived_by_mutator") or {}).most_common(top)),
+        "survived_by_file": dict(Counter(state.get("survived_by_file") or {}).most_common(top)),
+    }
+
+
+def precompile_templates() -> list[str]:
+    """Compiles every template into the bytecode cache (run at image build time)."""
+    environment = get_template_environment()
+    names = environment.list_templates()
+    for name in names:
+        environment.get_template(name)
+    return names
+
+
+if __name__ == "__main__":
+    print(f"Precompiled {len(precompile_templates())} template(s) into {TEMPLATE_CACHE_DIR}.")
@@ -0,0 +1,141 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+from config import REPO_ROOT
+
+# Build outputs and agent artefacts never contain source or test files we care about
+SKIPPED_DIRS = {"bin", "obj", "StrykerOutput", ".git", ".vs", ".idea", "node_modules", "TestResults"}
+TEST_ATTRIBUTES = re.compile(r"\[\s*(?:Fact|Theory|Test|TestMethod|TestCase)\b")
+TEST_FRAMEWORK_PACKAGES = ("xunit", "nunit", "mstest.testframework", "microsoft.net.test.sdk")
+_CLASS_DECLARATION = re.compile(r"\bclass\s+([A-Za-z_]\w*)")
+
+
+class RepoIndex:
+    """
+    One-time index of the C# repository: every .cs and .csproj file, which projects are
+    test projects, and which projects each test project references. Built with a single
+    directory walk and reused for every test-file and project lookup in a run.
+    """
+
+    def __init__(self, root: str = REPO_ROOT):
+        self.root = root
+        self.cs_files: list[str] = []
+        self.csproj_files: list[str] = []
+        self._cs_by_name: dict[str, list[str]] = {}
+        for current, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS)
+            for file in sorted(files):
+                if file.endswith(".cs"):
+                    path = os.path.relpath(os.path.join(current, file), root)
+                    self.cs_files.append(path)
+                    self._cs_by_name.setdefault(file, []).append(path)
+                elif file.endswith(".csproj"):
+                    self.csproj_files.append(os.path.relpath(os.path.join(current, file), root))
+
+        self._project_dirs = sorted(
+            ((os.path.dirname(p), p) for p in self.csproj_files), key=lambda item: len(item[0]), reverse=True
+        )
+        self.test_projects: set[str] = set()
+        self.references: dict[str, set[str]] = {}
+        for project in self.csproj_files:
+            is_test, references = self._read_project(project)
+            if is_test:
+                self.test_projects.add(project)
+            self.references[project] = references
+        self._test_classes: dict[str, list[str]] | None = None
+
+    def _read_project(self, project: str) -> tuple[bool, set[str]]:
+        """Returns (is a test project, referenced project paths) for a .csproj file."""
+        is_test = "test" in project.lower()
+        references = set()
+        try:
+            tree = ET.parse(os.path.join(self.root, project))
+        except (ET.ParseError, OSError) as e:
+            print(f"WARNING: Could not parse {project}: {e}")
+            return is_test, references
+        project_dir = os.path.dirname(project)
+        for element in tree.iter():
+            tag = element.tag.split("}")[-1]
+            if tag == "IsTestProject" and (element.text or "").strip().lower() == "true":
+                is_test = True
+            elif tag == "PackageReference" and (element.get("Include") or "").lower() in TEST_FRAMEWORK_PACKAGES:
+                is_test = True
+            elif tag == "ProjectReference" and element.get("Include"):
+                include = element.get("Include").replace("\\", "/")
+                references.add(os.path.normpath(os.path.join(project_dir, include)))
+        return is_test, references
+
+    def project_of(self, path: str) -> str | None:
+        """Returns the .csproj owning a repo-relative file (the closest enclosing project)."""
+        for project_dir, project in self._project_dirs:
+            if project_dir == "" or path.startswith(project_dir + "/"):
+                return project
+        return None
+
+    def production_projects(self) -> list[str]:
+        return [p for p in self.csproj_files if p not in self.test_projects]
+
+    def test_projects_for(self, project: str) -> list[str]:
+        return sorted(p for p in self.test_projects if project in self.references.get(p, ()))
+
+    def is_test_file(self, path: str) -> bool:
+        """Whether a repo-relative file belongs to a test project (decided by project, not by file name)."""
+        return self.project_of(path) in self.test_projects
+
+    def _rank(self, candidates: list[str], source_project: str | None) -> str | None:
+        """Prefers test files in projects that reference the source's project."""
+        if not candidates:
+            return None
+        referencing = set(self.test_projects_for(source_project)) if source_project else set()
+        return sorted(candidates, key=lambda p: (self.project_of(p) not in referencing, p))[0]
+
+    def test_classes(self) -> dict[str, list[str]]:
+        """Maps test class names to the files declaring them (only files with test attributes). Built lazily."""
+        if self._test_classes is None:
+            self._test_classes = {}
+            for path in self.cs_files:
+                if not self.is_test_file(path):
+                    continue
+                with open(os.path.join(self.root, path), "r", encoding="utf-8-sig", errors="replace") as f:
+                    content = f.read()
+                if not TEST_ATTRIBUTES.search(content):
+                    continue
+                for name in _CLASS_DECLARATION.findall(content):
+                    self._test_classes.setdefault(name, []).append(path)
+        return self._test_classes
+
+    def find_test_file(self, source_file_path: str) -> str | None:
+        """
+        Finds the test file for a source file: first by file name ([FileName]Tests.cs /
+        [FileName]Test.cs), then by a test class of that name declared in any test file.
+        """
+        filename = os.path.basename(source_file_path).replace(".cs", "")
+        source_project = self.project_of(source_file_path)
+        names = [f"{filename}Tests", f"{filename}Test"]
+
+        for name in names:
+            match = self._rank(self._cs_by_name.get(f"{name}.cs", []), source_project)
+            if match:
+                return match
+        for name in names:
+            match = self._rank(self.test_classes().get(name, []), source_project)
+            if match:
+                return match
+        return None
+
+
+_index: RepoIndex | None = None
+
+
+def get_repo_index() -> RepoIndex:
+    """Returns the run-wide repository index, building it on first use."""
+    global _index
+    if _index is None:
+        _index = RepoIndex()
+    return _index
+
+
+def invalidate_repo_index():
+    """Forces the next get_repo_index() to rescan (e.g. after files were added)."""
+    global _index
+    _index = None
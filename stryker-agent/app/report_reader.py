@@ -0,0 +1,110 @@
+import json
+from typing import Iterator
+
+CHUNK_SIZE = 1 << 20
+_WHITESPACE = " \t\r\n"
+
+
+_DECODER = json.JSONDecoder()
+
+
+class StreamingReportReader:
+    """
+    Event-driven reader for Stryker's JSON report.
+    Iterating yields `(file_path, file_report)` pairs one at a time, so peak memory is
+    bounded by the largest single file entry rather than by the whole report. Top-level
+    values other than "files" (schemaVersion, thresholds, mutationScore, ...) are collected
+    into `header` as they are encountered; all of them are available once iteration ends.
+    """
+
+    def __init__(self, path: str, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.header: dict = {}
+        self._file = None
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # Grow the read size with the pending value so huge entries are not re-decoded per chunk
+        chunk = self._file.read(max(self.chunk_size, len(self._buf) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _skip_ws(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._fill():
+                return
+
+    def _expect(self, chars: str) -> str:
+        self._skip_ws()
+        if self._pos >= len(self._buf) or self._buf[self._pos] not in chars:
+            found = self._buf[self._pos:self._pos + 20] if self._pos < len(self._buf) else "end of file"
+            raise ValueError(f"Malformed Stryker report {self.path}: expected one of '{chars}', found '{found}'")
+        char = self._buf[self._pos]
+        self._pos += 1
+        return char
+
+    def _read_value(self):
+        """
+        Decodes the next JSON value with the C decoder. An incomplete value at the end of the
+        buffer fails to decode (or, for a bare scalar, runs into the buffer end), in which
+        case more input is read and decoding is retried.
+        """
+        self._skip_ws()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+                # Containers and strings are self-delimiting; a number is only complete once a delimiter follows
+                if self._eof or (end < len(self._buf) and (
+                        isinstance(value, (dict, list, str)) or self._buf[end] in _WHITESPACE + ",}]")):
+                    break
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            if not self._fill():
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+                break
+        self._pos = end
+        return value
+
+    def _members(self) -> Iterator[str]:
+        """Yields the keys of the object whose '{' was just consumed, leaving each value unread."""
+        self._skip_ws()
+        if self._pos < len(self._buf) and self._buf[self._pos] == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._read_value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def __iter__(self) -> Iterator[tuple[str, dict]]:
+        with open(self.path, "r", encoding="utf-8") as self._file:
+            self._fill()
+            self._expect("{")
+            for key in self._members():
+                if key != "files":
+                    self.header[key] = self._read_value()
+                    continue
+                self._expect("{")
+                for file_path in self._members():
+                    yield file_path, self._read_value()
+
+
+def mutation_score(status_counts: dict) -> float:
+    """Stryker's mutation score: detected (Killed, Timeout) over valid (detected + Survived, NoCoverage)."""
+    detected = status_counts.get("Killed", 0) + status_counts.get("Timeout", 0)
+    valid = detected + status_counts.get("Survived", 0) + status_counts.get("NoCoverage", 0)
+    return (detected / valid) * 100 if valid else 0.0
@@ -0,0 +1,69 @@
+import os
+import re
+import incremental
+from config import REPO_ROOT
+
+_SHARD = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """Parses a 'i/N' shard spec (1-based, as in CI matrices) into (i, N)."""
+    match = _SHARD.match(text or "")
+    if not match:
+        raise ValueError(f"Invalid shard '{text}'. Expected 'i/N', e.g. '2/4'.")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{text}'. The index must be between 1 and {max(count, 1)}.")
+    return index, count
+
+
+def file_size(root: str, path: str) -> int:
+    try:
+        return os.path.getsize(os.path.join(root, path))
+    except OSError:
+        return 0
+
+
+def shard_files(files: set[str], index: int, count: int, root: str = REPO_ROOT) -> set[str]:
+    """
+    Returns shard `index` of `count` of the given repo-relative files.
+    Files are dealt largest-first to the currently lightest shard, using source size as a
+    proxy for the number of mutants; the result only depends on the file set and sizes,
+    so every CI job computes the same partition independently.
+    """
+    sizes = {path: max(file_size(root, path), 1) for path in files}
+    loads = [0] * count
+    shards: list[set[str]] = [set() for _ in range(count)]
+    for path in sorted(files, key=lambda p: (-sizes[p], p)):
+        lightest = min(range(count), key=lambda i: (loads[i], i))
+        shards[lightest].add(path)
+        loads[lightest] += sizes[path]
+    return shards[index - 1]
+
+
+def _tested(entry: dict) -> bool:
+    """Whether a report file entry has results; files outside '--mutate' only carry Ignored mutants."""
+    return any(mutant.get("status") != "Ignored" for mutant in entry.get("mutants", []))
+
+
+def merge_shard_reports(paths: list[str]) -> dict:
+    """
+    Combines the partial reports written by each shard (or batch) into one Stryker report.
+    Stryker lists every file of the project, with the mutants outside '--mutate' as Ignored,
+    so each file keeps the entry of the report that tested it. Shards mutate disjoint files:
+    a file tested by two reports means they were run with different inputs and the merge is refused.
+    """
+    header: dict | None = None
+    files: dict = {}
+    for path in paths:
+        report = incremental.load_report(path)
+        if report is None:
+            raise FileNotFoundError(f"Shard report '{path}' does not exist.")
+        if header is None:
+            header = {key: value for key, value in report.items() if key != "files"}
+        for file_path, entry in report.get("files", {}).items():
+            if file_path not in files or not _tested(files[file_path]):
+                files[file_path] = entry
+            elif _tested(entry):
+                raise ValueError(f"'{file_path}' was tested in more than one shard report ({path}).")
+    return incremental.merge_reports(header or {}, {"files": files}, set(), set())
@@ -0,0 +1,60 @@
+import os
+import re
+import json
+from config import REPO_ROOT
+from repo_index import get_repo_index
+from stryker_profile import BASE_CONFIG_PATH
+
+# Project("{type guid}") = "Name", "Dir\Name.csproj", "{project guid}"
+_PROJECT_LINE = re.compile(r'^Project\("\{[^}]*\}"\)\s*=\s*"[^"]*",\s*"([^"]+\.csproj)"', re.MULTILINE)
+
+
+def find_solution() -> str | None:
+    """
+    The repo-relative .sln the run covers: STRYKER_SOLUTION, else the 'solution' of
+    stryker-config.json, else the only .sln at the repository root.
+    """
+    configured = os.environ.get("STRYKER_SOLUTION")
+    if not configured:
+        try:
+            with open(BASE_CONFIG_PATH, "r") as f:
+                configured = json.load(f).get("stryker-config", {}).get("solution")
+        except (OSError, ValueError):
+            configured = None
+    if configured:
+        return configured if os.path.exists(os.path.join(REPO_ROOT, configured)) else None
+    solutions = sorted(name for name in os.listdir(REPO_ROOT) if name.endswith(".sln"))
+    return solutions[0] if len(solutions) == 1 else None
+
+
+def solution_projects(solution_path: str) -> list[str]:
+    """The .csproj files listed in a solution, relative to the repository root."""
+    with open(os.path.join(REPO_ROOT, solution_path), "r", encoding="utf-8-sig") as f:
+        content = f.read()
+    solution_dir = os.path.dirname(solution_path)
+    return [
+        os.path.normpath(os.path.join(solution_dir, path.replace("\\", "/")))
+        for path in _PROJECT_LINE.findall(content)
+    ]
+
+
+def discover_projects() -> list[str]:
+    """
+    The production projects to mutate: those of the solution when there is one (test
+    projects and projects outside the solution are left out), else every production project.
+    """
+    index = get_repo_index()
+    production = index.production_projects()
+    solution = find_solution()
+    if solution is not None:
+        listed = set(solution_projects(solution))
+        in_solution = [project for project in production if project in listed]
+        if in_solution:
+            print(f"INFO: {len(in_solution)} production project(s) in {solution}.")
+            production = in_solution
+        else:
+            print(f"WARNING: No production project of {solution} was found. Using every production project instead.")
+    for project in production:
+        tests = index.test_projects_for(project)
+        print(f"INFO: {project} is tested by {', '.join(tests) if tests else 'no test project'}.")
+    return production
@@ -0,0 +1,51 @@
+import os
+from functools import lru_cache
+from config import REPO_ROOT
+
+
+@lru_cache(maxsize=256)
+def _read_lines(relative_path: str) -> tuple[str, ...]:
+    with open(os.path.join(REPO_ROOT, relative_path), "r", encoding="utf-8-sig") as f:
+        return tuple(f.read().splitlines())
+
+
+class SourceStore:
+    """
+    Shared table of the source files referenced by survived mutations.
+    Mutation records hold a small integer file id instead of the file text; the text is
+    read lazily (and cached, bounded) only when a prompt or view actually needs a slice.
+    The id -> path table lives in AgentState["source_files"] so it survives checkpointing.
+    """
+
+    def __init__(self, paths: list[str] | None = None):
+        self._paths: list[str] = list(paths or [])
+        self._ids = {path: index for index, path in enumerate(self._paths)}
+
+    @property
+    def paths(self) -> list[str]:
+        return self._paths
+
+    def file_id(self, relative_path: str) -> int:
+        if relative_path not in self._ids:
+            self._ids[relative_path] = len(self._paths)
+            self._paths.append(relative_path)
+        return self._ids[relative_path]
+
+    def path(self, file_id: int) -> str:
+        return self._paths[file_id]
+
+    def lines(self, file_id: int) -> tuple[str, ...]:
+        return _read_lines(self._paths[file_id])
+
+    def text(self, file_id: int) -> str:
+        return "\n".join(self.lines(file_id))
+
+    def window(self, file_id: int, start_line: int, end_line: int, padding: int = 0) -> str:
+        """Slices 1-based lines start_line..end_line, widened by `padding` lines on each side."""
+        lines = self.lines(file_id)
+        return "\n".join(lines[max(0, start_line - 1 - padding):end_line + padding])
+
+
+def store_for(state) -> SourceStore:
+    """Returns a SourceStore over the file table recorded in the agent state."""
+    return SourceStore(state.get("source_files") or [])
@@ -2,12 +2,14 @@ from typing import TypedDict, List, Optional, Dict
 
 # NEW: Added the missing SurvivedMutation definition
 class SurvivedMutation(TypedDict):
+    mutant_id: str
     file_path: str
+    # Index into AgentState["source_files"]; the file text is loaded lazily via SourceStore
+    file_id: int
     mutator_name: str
     original_code: str
     mutated_code: str
     location: Dict
-    source_code_context: str
 
 class UnfixedMutation(TypedDict):
     file_path: str
@@ -25,6 +27,16 @@ class GeneratedTest(TypedDict):
     generated_test_code: str
     # For the "Test Case Story"
     explanation: str
+    # Ids of the survived mutations this test targets
+    mutant_ids: List[str]
+
+class ProjectMutationStats(TypedDict):
+    total_mutants: int
+    killed: int
+    survived: int
+    no_coverage: int
+    compile_error: int
+    mutation_score: float
 
 class MutationStats(TypedDict):
     total_mutants: int
@@ -32,6 +44,21 @@ class MutationStats(TypedDict):
     survived: int
     no_coverage: int
     compile_error: int
+    # Per production project, for solutions with several (project path -> its counts)
+    by_project: Dict[str, ProjectMutationStats]
+
+# Stryker settings chosen for a run (see stryker_profile.py)
+class StrykerProfile(TypedDict):
+    name: str
+    concurrency: int
+    coverage_analysis: str # e.g., "perTest"
+    reporters: List[str]
+    mutate: List[str]
+    ignore_methods: List[str]
+    ignore_mutations: List[str]
+    # What the concurrency was derived from
+    cores: int
+    memory_mb: Optional[int]
 
 # For the performance stats widget
 class RunStats(TypedDict):
@@ -39,19 +66,71 @@ class RunStats(TypedDict):
     mutants_generated: int
     survivors_found: int
     tests_generated: int
+    # Persistent mutant result cache (mutants reused vs. re-run by Stryker)
+    mutant_cache_hits: int
+    mutant_cache_misses: int
+    # LLM calls made by the test generator (including retries)
+    llm_calls: int
+    llm_retries: int
+    # Survivors dropped as duplicates of another on the same line, and prompts cut by the generation budget
+    duplicate_survivors: int
+    budget_skipped_prompts: int
+    # Prompts answered from the persistent LLM response cache vs. sent to the model
+    llm_cache_hits: int
+    llm_cache_misses: int
+    # Generated tests proven to pass on the original code and fail on their mutant
+    verified_tests: int
+    # Why verification could not run; the generated tests are then dropped rather than pushed unverified
+    verification_error: str
+    # Stryker profile of the run and its throughput, for comparing profiles across runs
+    stryker_profile: StrykerProfile
+    stryker_seconds: float
+    mutants_per_minute: float
+    # Batched runs: whether STRYKER_TIMEOUT_MINUTES cut Stryker short, and the files it did not get to
+    stryker_timed_out: bool
+    unfinished_files: int
+    # Prompts answered from finished batch reports while Stryker was still running
+    prefetched_prompts: int
+    # Code and test context tokens sent to the model, and saved against sending whole test files
+    prompt_context_tokens: int
+    prompt_tokens_saved: int
+    # Stryker wall time of each project when a solution's projects are mutated in parallel
+    project_stryker_seconds: Dict[str, float]
+
+# Per-node resource usage, appended by the instrumentation wrapper
+class StageTiming(TypedDict):
+    stage: str
+    wall_seconds: float
+    cpu_seconds: float
+    # High-water marks of the agent process and of its finished subprocesses
+    peak_rss_mb: float
+    peak_child_rss_mb: float
+    llm_calls: int
+    llm_errors: int
+    llm_latency_seconds: float
+    prompt_tokens: int
+    completion_tokens: int
 
 class AgentState(TypedDict):
     # Inputs
     project_path: str
+    # Every production project mutated by the run (project_path is the first)
+    project_paths: List[str]
     repo_slug: str
     source_branch: str
     pr_number: int
+    # 'i/N' when this run mutates only one slice of the files (see sharding.py)
+    shard: Optional[str]
+    # Commit under test; a checkpointed run is only resumed for the same commit
+    head_sha: Optional[str]
 
     # Core State
     stryker_report_path: Optional[str]
     mutation_score: float
     # UPDATED: Changed from List[Dict] to the new, specific type
     survived_mutations: List[SurvivedMutation] 
+    # File table shared by all survived mutations (file_id -> path relative to /repo)
+    source_files: List[str]
     generated_tests: List[GeneratedTest]
     new_branch_name: Optional[str]
     new_pr_url: Optional[str]
@@ -72,3 +151,6 @@ class AgentState(TypedDict):
     
     # For the "Mutation Workbench"
     unfixed_mutants: List[UnfixedMutation]
+
+    # For the "Pipeline Breakdown" panel
+    stage_timings: List[StageTiming]
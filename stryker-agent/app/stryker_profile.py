@@ -0,0 +1,128 @@
+import os
+import json
+from config import REPO_ROOT, env_int
+from state import StrykerProfile
+
+BASE_CONFIG_PATH = os.path.join(REPO_ROOT, "stryker-config.json")
+# Written next to Stryker's own output, so it never ends up in the repository
+EFFECTIVE_CONFIG_PATH = os.path.join(REPO_ROOT, "StrykerOutput", "stryker-agent-config.json")
+DEFAULT_POLICY_FILE = "stryker-policy.json"
+# The agent only reads the JSON report; progress keeps the log readable
+REPORTERS = ["json", "progress"]
+
+
+def available_cores() -> int:
+    """CPUs this process may use, honouring the affinity mask and a cgroup v2 CPU quota."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cores = min(cores, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cores)
+
+
+def available_memory_mb() -> int | None:
+    """Memory left for test runners: MemAvailable, capped by the container's cgroup limit."""
+    limits = []
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    limits.append(int(line.split()[1]) // 1024)
+    except (OSError, ValueError):
+        pass
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value != "max":
+                limits.append(int(value) // (1024 * 1024))
+            break
+        except (OSError, ValueError):
+            continue
+    return min(limits) if limits else None
+
+
+def load_policy(path: str | None = None) -> dict:
+    """
+    The project's mutation policy (STRYKER_POLICY_FILE, default stryker-policy.json at the repo root):
+    "mutate" globs ('!'-prefixed ones exclude files), "ignore-methods" and "ignore-mutations"
+    lists, and optional "concurrency" and "coverage-analysis" overrides.
+    """
+    path = os.path.join(REPO_ROOT, path or os.environ.get("STRYKER_POLICY_FILE", DEFAULT_POLICY_FILE))
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            policy = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"WARNING: Ignoring the Stryker policy file {path}: {e}")
+        return {}
+    print(f"INFO: Applying the Stryker policy from {os.path.relpath(path, REPO_ROOT)}.")
+    return policy
+
+
+def build_profile(policy: dict) -> StrykerProfile:
+    """
+    Chooses the execution settings for this run. Concurrency is the number of cores, reduced so
+    each test runner keeps STRYKER_WORKER_MEMORY_MB of memory; STRYKER_CONCURRENCY or the policy
+    can pin it instead.
+    """
+    cores = available_cores()
+    memory_mb = available_memory_mb()
+    concurrency = cores
+    if memory_mb is not None:
+        concurrency = min(concurrency, max(1, memory_mb // env_int("STRYKER_WORKER_MEMORY_MB", 1024)))
+    concurrency = env_int("STRYKER_CONCURRENCY", 0) or policy.get("concurrency") or concurrency
+    coverage_analysis = os.environ.get("STRYKER_COVERAGE_ANALYSIS") or policy.get("coverage-analysis") or "perTest"
+    mutate = list(policy.get("mutate") or [])
+    ignore_methods = list(policy.get("ignore-methods") or [])
+    ignore_mutations = list(policy.get("ignore-mutations") or [])
+    return {
+        "name": f"c{concurrency}-{coverage_analysis}" + ("-policy" if mutate or ignore_methods or ignore_mutations else ""),
+        "concurrency": concurrency,
+        "coverage_analysis": coverage_analysis,
+        "reporters": REPORTERS,
+        "mutate": mutate,
+        "ignore_methods": ignore_methods,
+        "ignore_mutations": ignore_mutations,
+        "cores": cores,
+        "memory_mb": memory_mb,
+    }
+
+
+def write_effective_config(profile: StrykerProfile, base_config_path: str = BASE_CONFIG_PATH,
+                           path: str = EFFECTIVE_CONFIG_PATH) -> str:
+    """Writes the repository's Stryker config with the profile applied and returns its path."""
+    base = {}
+    if os.path.exists(base_config_path):
+        with open(base_config_path, "r") as f:
+            base = json.load(f)
+    config = dict(base.get("stryker-config", {}))
+    config["concurrency"] = profile["concurrency"]
+    config["coverage-analysis"] = profile["coverage_analysis"]
+    config["reporters"] = profile["reporters"]
+    if profile["mutate"]:
+        config["mutate"] = profile["mutate"]
+    if profile["ignore_methods"]:
+        config["ignore-methods"] = profile["ignore_methods"]
+    if profile["ignore_mutations"]:
+        config["ignore-mutations"] = profile["ignore_mutations"]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"stryker-config": config}, f, indent=2)
+    return path
+
+
+def exclusion_patterns(profile: StrykerProfile) -> list[str]:
+    """
+    The policy's '!' mutate globs. '--mutate' on the command line replaces the config's list, so runs
+    restricted to some files pass these along to keep excluded files out.
+    """
+    return [pattern for pattern in profile["mutate"] if pattern.startswith("!")]
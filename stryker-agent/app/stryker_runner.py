@@ -0,0 +1,327 @@
+import os
+import re
+import json
+import time
+import queue
+import signal
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import sharding
+from config import REPO_ROOT
+from instrumentation import tracer, redact_credentials
+
+STRYKER_OUTPUT_DIR = os.path.join(REPO_ROOT, "StrykerOutput")
+PROGRESS_PATH = os.path.join(STRYKER_OUTPUT_DIR, "agent-progress.json")
+# Seconds between progress log lines (every other output line is printed as it arrives)
+PROGRESS_INTERVAL = 15
+# Seconds Stryker gets to stop its test runners after SIGTERM before it is killed
+KILL_GRACE_SECONDS = 10
+
+_TESTING = re.compile(r"Testing mutant\s+(\d+)\s*/\s*(\d+)", re.IGNORECASE)
+_COUNTS = re.compile(r"K\s+(\d+)\s*│\s*S\s+(\d+)\s*│\s*T\s+(\d+)")
+_CREATED = re.compile(r"(\d+)\s+mutants?\s+created", re.IGNORECASE)
+_SPAN_SUFFIX = re.compile(r"\{\d+\.\.\d+\}$")
+
+
+def find_latest_report(since: float | None = None, report_file_name: str = "stryker-report.json",
+                       search_dir: str = STRYKER_OUTPUT_DIR) -> str | None:
+    """
+    Returns the newest Stryker JSON report under /repo/StrykerOutput (or `search_dir`), relative
+    to /repo. With `since`, reports written before that time (by an earlier run) are ignored.
+    """
+    print(f"Searching for '{report_file_name}' in '{search_dir}'...")
+    candidates = []
+    if os.path.exists(search_dir):
+        for root, _, files in os.walk(search_dir):
+            if report_file_name in files:
+                path = os.path.join(root, report_file_name)
+                if since is None or os.path.getmtime(path) >= since:
+                    candidates.append(path)
+    if not candidates:
+        return None
+    return os.path.relpath(max(candidates, key=os.path.getmtime), REPO_ROOT)
+
+
+def _format_seconds(seconds: float | None) -> str:
+    if seconds is None:
+        return "unknown"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s"
+
+
+class StrykerProgress:
+    """
+    Live progress of a (possibly batched) Stryker run, parsed from its console output.
+    The ETA extrapolates the current batch's testing rate, and assumes batches still to
+    come take as long as the batches so far.
+    """
+
+    def __init__(self, batches: int = 1):
+        self.batches = batches
+        self.batch = 0
+        self.tested = 0
+        self.total = 0
+        self.killed = 0
+        self.survived = 0
+        self.timeouts = 0
+        self.done_mutants = 0
+        self.done_seconds = 0.0
+        self._batch_start = time.monotonic()
+        self._testing_start: float | None = None
+
+    def start_batch(self):
+        self.batch += 1
+        self.tested = self.total = 0
+        self._batch_start = time.monotonic()
+        self._testing_start = None
+
+    def finish_batch(self):
+        self.done_mutants += self.tested
+        self.done_seconds += time.monotonic() - self._batch_start
+
+    def update(self, line: str) -> bool:
+        """Takes one output line; returns True if it was a progress line."""
+        match = _TESTING.search(line)
+        if match:
+            if self._testing_start is None:
+                self._testing_start = time.monotonic()
+            self.tested, self.total = int(match.group(1)), int(match.group(2))
+            counts = _COUNTS.search(line)
+            if counts:
+                self.killed, self.survived, self.timeouts = (int(group) for group in counts.groups())
+            return True
+        match = _CREATED.search(line)
+        if match:
+            self.total = int(match.group(1))
+        return False
+
+    def eta_seconds(self) -> float | None:
+        if self._testing_start is None or not self.tested or not self.total:
+            return None
+        rate = (time.monotonic() - self._testing_start) / self.tested
+        remaining = rate * (self.total - self.tested)
+        batches_left = self.batches - self.batch
+        if batches_left:
+            per_batch = self.done_seconds / (self.batch - 1) if self.batch > 1 \
+                else time.monotonic() - self._batch_start + remaining
+            remaining += batches_left * per_batch
+        return remaining
+
+    def snapshot(self) -> dict:
+        return {
+            "batch": self.batch,
+            "batches": self.batches,
+            "tested": self.tested,
+            "total": self.total,
+            "tested_overall": self.done_mutants + self.tested,
+            "killed": self.killed,
+            "survived": self.survived,
+            "timeouts": self.timeouts,
+            "eta_seconds": self.eta_seconds(),
+        }
+
+    def describe(self) -> str:
+        percent = f" ({100 * self.tested // self.total}%)" if self.total else ""
+        batch = f"batch {self.batch}/{self.batches}, " if self.batches > 1 else ""
+        return (f"Stryker progress: {batch}{self.tested}/{self.total or '?'} mutants{percent}, "
+                f"K {self.killed} S {self.survived} T {self.timeouts}, ETA {_format_seconds(self.eta_seconds())}")
+
+
+def _write_progress(progress: StrykerProgress, path: str = PROGRESS_PATH):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(progress.snapshot(), f)
+    except OSError:
+        pass
+
+
+def _stop(process: subprocess.Popen):
+    """Stops Stryker and the test runners it spawned (they share its process group)."""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+def stream_stryker(command: list[str], deadline: float | None, progress: StrykerProgress,
+                   cwd: str | None = None, label: str | None = None,
+                   progress_path: str = PROGRESS_PATH) -> tuple[int | None, bool, list[str]]:
+    """
+    Runs Stryker, printing its output line by line and throttling progress lines to one
+    summary every PROGRESS_INTERVAL seconds. Stops the process at `deadline` (time.monotonic()).
+    With `label`, printed lines are prefixed with it, so concurrent runs can be told apart.
+    Returns (exit code or None if stopped, timed out, last lines of output).
+    """
+    prefix = f"[{label}] " if label else ""
+    lines: queue.Queue = queue.Queue()
+    tail: deque[str] = deque(maxlen=200)
+    timed_out = False
+    with tracer.span("dotnet stryker", "subprocess", command=redact_credentials(" ".join(command))[:300]) as span_args:
+        process = subprocess.Popen(command, cwd=cwd or REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, bufsize=1, start_new_session=True)
+
+        def read():
+            for line in process.stdout:
+                lines.put(line.rstrip("\n"))
+            lines.put(None)
+
+        threading.Thread(target=read, daemon=True).start()
+        last_report = 0.0
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                line = lines.get(timeout=timeout)
+            except queue.Empty:
+                timed_out = True
+                _stop(process)
+                break
+            if line is None:
+                break
+            if not line.strip():
+                # Progress bar redraws ('\r') arrive as empty lines
+                continue
+            tail.append(line)
+            if not progress.update(line):
+                print(prefix + line)
+            elif time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                print(prefix + progress.describe())
+                _write_progress(progress, progress_path)
+        returncode = None if timed_out else process.wait()
+        span_args["returncode"] = returncode
+        span_args["timed_out"] = timed_out
+    return returncode, timed_out, list(tail)
+
+
+def pattern_file(pattern: str, project_dir: str) -> str:
+    """The repo-relative file a '--mutate' glob built by the agent ('**/<path>[{a..b}]') refers to."""
+    glob = pattern[3:] if pattern.startswith("**/") else pattern
+    return os.path.normpath(os.path.join(project_dir, _SPAN_SUFFIX.sub("", glob)))
+
+
+def plan_batches(patterns: list[str], project_path: str, count: int) -> list[dict]:
+    """
+    Splits the '--mutate' globs into up to `count` batches of whole files, balanced by source
+    size like shards. Returns [{"files": repo-relative files, "patterns": their globs}].
+    """
+    project_dir = os.path.dirname(project_path)
+    by_file: dict[str, list[str]] = {}
+    for pattern in patterns:
+        by_file.setdefault(pattern_file(pattern, project_dir), []).append(pattern)
+    count = max(1, min(count, len(by_file)))
+    batches = []
+    for index in range(1, count + 1):
+        files = sharding.shard_files(set(by_file), index, count)
+        batches.append({"files": files, "patterns": [p for path in sorted(files) for p in by_file[path]]})
+    return batches
+
+
+def run_batches(batches: list[dict | None], build_command, deadline: float | None, on_report=None,
+                label: str | None = None, output_dir: str | None = None) -> dict:
+    """
+    Runs Stryker once per batch (None means one unrestricted run) until all are done or the
+    deadline passes, calling `on_report(report path)` as each batch's report appears so
+    later stages can start on it. Returns the completed reports, the files of unfinished
+    batches, and the exit code and output tail of the last run.
+    `build_command(patterns, output dir)` gets a directory of its own per batch when
+    `output_dir` is set (None otherwise), so runs sharing StrykerOutput do not pick up each
+    other's reports; `label` prefixes the output lines.
+    """
+    progress = StrykerProgress(len(batches))
+    progress_path = os.path.join(output_dir, "agent-progress.json") if output_dir else PROGRESS_PATH
+    outcome = {"reports": [], "unfinished_files": set(), "timed_out": False, "returncode": None, "tail": []}
+    for position, batch in enumerate(batches):
+        if deadline is not None and time.monotonic() >= deadline:
+            outcome["timed_out"] = True
+        if outcome["timed_out"]:
+            for pending in batches[position:]:
+                outcome["unfinished_files"] |= pending["files"] if pending else set()
+            break
+        progress.start_batch()
+        started = time.time()
+        batch_dir = os.path.join(output_dir, f"batch-{position + 1}") if output_dir else None
+        command = build_command(batch["patterns"] if batch else None, batch_dir)
+        print(f"{f'[{label}] ' if label else ''}Executing command: {' '.join(command)}")
+        returncode, timed_out, tail = stream_stryker(command, deadline, progress, label=label, progress_path=progress_path)
+        progress.finish_batch()
+        outcome.update(returncode=returncode, tail=tail, timed_out=timed_out)
+        report_path = None if timed_out else find_latest_report(since=started, search_dir=batch_dir or STRYKER_OUTPUT_DIR)
+        if report_path is None:
+            outcome["unfinished_files"] |= batch["files"] if batch else set()
+            continue
+        outcome["reports"].append(report_path)
+        if on_report is not None:
+            on_report(report_path)
+    _write_progress(progress, progress_path)
+    return outcome
+
+
+def allocate_concurrency(weights: list[int], total: int) -> list[int]:
+    """
+    Splits `total` Stryker test runners across projects mutated side by side, in proportion
+    to their weight (source size) and at least one each, so the projects finish close together.
+    """
+    if len(weights) >= total:
+        return [1] * len(weights)
+    spare = total - len(weights)
+    weights = [max(weight, 1) for weight in weights]
+    shares = [spare * weight / sum(weights) for weight in weights]
+    counts = [1 + int(share) for share in shares]
+    # Runners lost to rounding down go to the largest remainders
+    by_remainder = sorted(range(len(shares)), key=lambda i: (int(shares[i]) - shares[i], i))
+    for index in by_remainder[:total - sum(counts)]:
+        counts[index] += 1
+    return counts
+
+
+def run_projects(projects: list[dict], total_concurrency: int, deadline: float | None, on_report=None,
+                 max_parallel: int = 0) -> dict:
+    """
+    Runs the batches of several projects at the same time, one Stryker process per project
+    and at most `total_concurrency` test runners between them, largest project first.
+    Each entry of `projects` is {"project", "batches", "weight", "build_command"}, where
+    `build_command(patterns, concurrency, output dir)` builds one batch's command line.
+    Returns run_batches' outcome combined over the projects, plus each project's seconds.
+    """
+    parallel = min(len(projects), total_concurrency, max_parallel or len(projects))
+    ordered = sorted(projects, key=lambda p: (-p["weight"], p["project"]))
+    if parallel == len(projects):
+        concurrency = dict(zip((p["project"] for p in ordered),
+                               allocate_concurrency([p["weight"] for p in ordered], total_concurrency)))
+    else:
+        concurrency = {p["project"]: max(1, total_concurrency // parallel) for p in ordered}
+
+    def run(entry: dict) -> tuple[dict, float]:
+        project = entry["project"]
+        name = os.path.splitext(os.path.basename(project))[0]
+        started = time.monotonic()
+        outcome = run_batches(
+            entry["batches"],
+            lambda patterns, output: entry["build_command"](patterns, concurrency[project], output),
+            deadline, on_report, label=name,
+            output_dir=os.path.join(STRYKER_OUTPUT_DIR, "projects", project.replace("/", "_")),
+        )
+        return outcome, round(time.monotonic() - started, 1)
+
+    for entry in ordered:
+        print(f"Project {entry['project']}: {len(entry['batches'])} batch(es), concurrency {concurrency[entry['project']]}.")
+    combined = {"reports": [], "unfinished_files": set(), "timed_out": False, "returncode": None, "tail": [],
+                "project_seconds": {}}
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="stryker") as pool:
+        results = list(pool.map(run, ordered))
+    for entry, (outcome, seconds) in zip(ordered, results):
+        combined["reports"].extend(outcome["reports"])
+        combined["unfinished_files"] |= outcome["unfinished_files"]
+        combined["timed_out"] |= outcome["timed_out"]
+        combined["project_seconds"][entry["project"]] = seconds
+        # The exit code and output of a failed project explain a missing report best
+        if combined["returncode"] in (None, 0):
+            combined.update(returncode=outcome["returncode"], tail=outcome["tail"])
+    return combined
@@ -0,0 +1,272 @@
+import os
+import re
+import shutil
+import tempfile
+import subprocess
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from config import REPO_ROOT, env_int
+from csharp import line_starts, location_span, parse_members, namespace_at
+from integration import insert_tests, group_by_file
+from repo_index import SKIPPED_DIRS
+from instrumentation import run_subprocess
+
+_TEST_METHOD = re.compile(r"\b(?:public|internal)\s+(?:async\s+)?(?:void|Task|ValueTask)\s+([A-Za-z_]\w*)\s*\(")
+_BUILD_ERROR = re.compile(r"^\s*(?P<path>[^\s(][^(\n]*\.cs)\((?P<line>\d+),\d+\): error ", re.M)
+# Keep '--filter' expressions short enough for the command line
+FILTER_CHUNK = 40
+MAX_BUILD_ATTEMPTS = 3
+
+_worker_dir: str | None = None
+
+
+def test_method_names(test_code: str) -> list[str]:
+    """Names of the test methods declared in a generated code snippet."""
+    return _TEST_METHOD.findall(test_code)
+
+
+def _ignore_outputs(directory: str, names: list[str]) -> set[str]:
+    return {name for name in names if name in SKIPPED_DIRS}
+
+
+def _timeout() -> int:
+    return env_int("VERIFY_TIMEOUT_SECONDS", 900)
+
+
+def _parse_trx(path: str) -> dict[str, bool]:
+    """
+    Maps fully qualified test method names ('Namespace.Class.Method') to whether every result
+    for them passed (theories produce several).
+    """
+    outcomes: dict[str, bool] = {}
+    if not os.path.exists(path):
+        return outcomes
+    names: dict[str, str] = {}
+    results: list[tuple[str, bool]] = []
+    for element in ET.parse(path).iter():
+        tag = element.tag.split("}")[-1]
+        if tag == "UnitTest":
+            for child in element:
+                if child.tag.split("}")[-1] == "TestMethod":
+                    # MSTest appends the assembly to the class name
+                    class_name = child.get("className", "").split(",")[0].strip()
+                    names[element.get("id", "")] = f"{class_name}.{child.get('name', '').split('(')[0]}"
+        elif tag == "UnitTestResult":
+            results.append((element.get("testId", ""), element.get("outcome") == "Passed"))
+    for test_id, passed in results:
+        name = names.get(test_id)
+        if name is not None:
+            outcomes[name] = outcomes.get(name, True) and passed
+    return outcomes
+
+
+def _filter(name: str) -> str:
+    """A test filter for exactly one test method; parameterised NUnit cases carry their arguments in the name."""
+    return f"FullyQualifiedName={name}|FullyQualifiedName~{name}\\("
+
+
+def run_tests(workdir: str, project: str, names: list[str], no_build: bool) -> tuple[bool, dict[str, bool], bool]:
+    """
+    Runs only the given test methods (fully qualified names) of a test project with 'dotnet test'.
+    Returns (built successfully, {name: passed}, timed out); after a timeout the outcomes are partial.
+    """
+    outcomes: dict[str, bool] = {}
+    results_dir = tempfile.mkdtemp(prefix="trx-", dir=workdir)
+    for start in range(0, len(names), FILTER_CHUNK):
+        chunk = names[start:start + FILTER_CHUNK]
+        trx_name = f"results-{start}.trx"
+        command = [
+            "dotnet", "test", project,
+            "--filter", "|".join(_filter(name) for name in chunk),
+            "--logger", f"trx;LogFileName={trx_name}",
+            "--results-directory", results_dir,
+        ]
+        if no_build or start > 0:
+            command.append("--no-build")
+        try:
+            result = run_subprocess(command, cwd=workdir, capture_output=True, text=True, timeout=_timeout())
+        except subprocess.TimeoutExpired:
+            print(f"WARNING: 'dotnet test' timed out after {_timeout()}s in {workdir}.")
+            outcomes.update(_parse_trx(os.path.join(results_dir, trx_name)))
+            return True, outcomes, True
+        if _BUILD_ERROR.search(result.stdout) or "Build FAILED" in result.stdout:
+            return False, outcomes, False
+        outcomes.update(_parse_trx(os.path.join(results_dir, trx_name)))
+    return True, outcomes, False
+
+
+def _init_worker(base_dir: str, parent_dir: str):
+    """Gives each pool process its own copy of the built workspace, so mutants can be applied in place."""
+    global _worker_dir
+    _worker_dir = tempfile.mkdtemp(prefix="worker-", dir=parent_dir)
+    shutil.copytree(base_dir, _worker_dir, dirs_exist_ok=True, symlinks=True)
+
+
+def _verify_mutant(job: dict) -> tuple[str, set[str]]:
+    """Applies one mutant to the worker's copy, runs its tests and returns the names of those that failed."""
+    source_path = os.path.join(_worker_dir, job["file_path"])
+    with open(source_path, "r", encoding="utf-8-sig", newline="") as f:
+        original = f.read()
+    start, end = location_span(original, line_starts(original), job["location"])
+    try:
+        with open(source_path, "w", encoding="utf-8", newline="") as f:
+            f.write(original[:start] + job["replacement"] + original[end:])
+        built, outcomes, timed_out = run_tests(_worker_dir, job["project"], job["test_names"], no_build=False)
+    finally:
+        with open(source_path, "w", encoding="utf-8", newline="") as f:
+            f.write(original)
+    if not built:
+        # A mutant that no longer compiles cannot be used to judge the tests
+        return job["mutant_id"], set()
+    if timed_out:
+        # The mutant hangs the tests, which Stryker counts as detected: every test that did not pass caught it
+        return job["mutant_id"], {name for name in job["test_names"] if outcomes.get(name) is not True}
+    return job["mutant_id"], {name for name in job["test_names"] if outcomes.get(name) is False}
+
+
+class VerificationWorkspace:
+    """
+    A scratch copy of the repository with every generated test inserted into its target
+    test file. Tests that break the build are pruned using the compiler's error lines.
+    """
+
+    def __init__(self, tests: list[dict], test_project_of):
+        self.parent_dir = tempfile.mkdtemp(prefix="stryker-verify-")
+        self.base_dir = os.path.join(self.parent_dir, "base")
+        shutil.copytree(REPO_ROOT, self.base_dir, ignore=_ignore_outputs, symlinks=True)
+        self.tests = list(tests)
+        self.test_project_of = test_project_of
+        self._pristine: dict[str, str] = {}
+        # test index -> (file, first line, last line) of the inserted method
+        self.ranges: dict[int, tuple[str, int, int]] = {}
+        self._written: dict[str, str] = {}
+
+    def _write_tests(self):
+        self.ranges.clear()
+        contents: dict[str, str] = {}
+        for file_path, indexes in group_by_file(self.tests).items():
+            if file_path not in self._pristine:
+                with open(os.path.join(self.base_dir, file_path), "r", encoding="utf-8-sig") as f:
+                    self._pristine[file_path] = f.read()
+            codes = [self.tests[i]["generated_test_code"] for i in indexes]
+            contents[file_path], ranges = insert_tests(self._pristine[file_path], codes, file_path)
+            for index, (first, last) in zip(indexes, ranges):
+                self.ranges[index] = (file_path, first, last)
+        for file_path in self._pristine:
+            self._written[file_path] = contents.get(file_path, self._pristine[file_path])
+            with open(os.path.join(self.base_dir, file_path), "w", encoding="utf-8") as f:
+                f.write(self._written[file_path])
+
+    def qualified_names(self, index: int) -> list[str]:
+        """'Namespace.Class.Method' of each test method in a generated test, as inserted (nested classes joined with '+')."""
+        file_path, first, last = self.ranges[index]
+        content = self._written[file_path]
+        types = [m.name for m in parse_members(content) if m.kind == "type" and m.start_line <= first and last <= m.end_line]
+        namespace = namespace_at(content, line_starts(content)[first - 1])
+        prefix = ".".join(part for part in (namespace, "+".join(types)) if part)
+        return [f"{prefix}.{name}" for name in test_method_names(self.tests[index]["generated_test_code"])]
+
+    def build(self) -> bool:
+        """Builds every affected test project, dropping generated tests that fail to compile."""
+        for _ in range(MAX_BUILD_ATTEMPTS):
+            self._write_tests()
+            projects = sorted({self.test_project_of(t["target_test_file"]) for t in self.tests})
+            errors = []
+            for project in projects:
+                result = run_subprocess(["dotnet", "build", project], cwd=self.base_dir,
+                                        capture_output=True, text=True, timeout=_timeout())
+                if result.returncode != 0:
+                    project_errors = list(_BUILD_ERROR.finditer(result.stdout))
+                    errors.extend(project_errors)
+                    if not project_errors:
+                        print(f"WARNING: Build of {project} failed without compiler errors:\n{result.stdout[-2000:]}")
+                        return False
+            if not errors:
+                return True
+
+            broken = set()
+            for error in errors:
+                error_path = os.path.relpath(os.path.join(self.base_dir, error.group("path").strip()), self.base_dir)
+                line = int(error.group("line"))
+                for index, (file_path, first, last) in self.ranges.items():
+                    if os.path.normpath(file_path) == os.path.normpath(error_path) and first <= line <= last:
+                        broken.add(index)
+            if not broken:
+                print("WARNING: The build fails outside the generated tests; cannot verify.")
+                return False
+            print(f"INFO: Dropping {len(broken)} generated test(s) that do not compile.")
+            self.tests = [t for i, t in enumerate(self.tests) if i not in broken]
+            if not self.tests:
+                return True
+        return False
+
+    def cleanup(self):
+        shutil.rmtree(self.parent_dir, ignore_errors=True)
+
+
+def verify_tests(tests: list[dict], mutations_by_id: dict[str, dict], test_project_of) -> list[dict] | None:
+    """
+    Keeps the generated tests that pass on the original code and fail on at least one of the
+    mutants they target; each kept test's mutant_ids is narrowed to the mutants it kills.
+    Returns None when the workspace cannot be built, i.e. the tests could not be verified.
+    """
+    workspace = VerificationWorkspace(tests, test_project_of)
+    try:
+        if not workspace.build():
+            return None
+        tests = workspace.tests
+        if not tests:
+            return []
+
+        names_by_test = {i: workspace.qualified_names(i) for i in range(len(tests))}
+        by_project: dict[str, list[str]] = {}
+        for i, test in enumerate(tests):
+            by_project.setdefault(test_project_of(test["target_test_file"]), []).extend(names_by_test[i])
+
+        # 1. New tests must pass against the original code
+        passing: set[str] = set()
+        for project, names in by_project.items():
+            _, outcomes, _ = run_tests(workspace.base_dir, project, names, no_build=True)
+            passing.update(name for name, passed in outcomes.items() if passed)
+        candidates = {
+            i for i, names in names_by_test.items() if names and all(name in passing for name in names)
+        }
+        print(f"Verification: {len(candidates)}/{len(tests)} generated test(s) pass on the original code.")
+
+        # 2. ...and must fail against the mutant they target
+        jobs: dict[str, dict] = {}
+        for i in sorted(candidates):
+            for mutant_id in tests[i]["mutant_ids"]:
+                mutation = mutations_by_id.get(mutant_id)
+                if mutation is None:
+                    continue
+                job = jobs.setdefault(mutant_id, {
+                    "mutant_id": mutant_id,
+                    "file_path": mutation["file_path"],
+                    "location": mutation["location"],
+                    "replacement": mutation["mutated_code"],
+                    "project": test_project_of(tests[i]["target_test_file"]),
+                    "test_names": [],
+                })
+                job["test_names"].extend(names_by_test[i])
+
+        failed_by_mutant: dict[str, set[str]] = {}
+        if jobs:
+            workers = max(1, min(env_int("VERIFY_WORKERS", min(4, os.cpu_count() or 1)), len(jobs)))
+            print(f"Verification: running {len(jobs)} mutant(s) across {workers} worker(s).")
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(workspace.base_dir, workspace.parent_dir)) as pool:
+                for mutant_id, failed in pool.map(_verify_mutant, jobs.values()):
+                    failed_by_mutant[mutant_id] = failed
+
+        verified = []
+        for i in sorted(candidates):
+            kills = [
+                mutant_id for mutant_id in tests[i]["mutant_ids"]
+                if failed_by_mutant.get(mutant_id, set()) & set(names_by_test[i])
+            ]
+            if kills:
+                verified.append(dict(tests[i], mutant_ids=kills))
+        return verified
+    finally:
+        workspace.cleanup()
@@ -0,0 +1,85 @@
+"""
+Renders the dashboard for a synthetic run with many unfixed mutants and reports render time,
+peak Python heap (tracemalloc) and the size of the HTML written.
+
+    python benchmarks/bench_dashboard.py --mutants 100000 --files 2000
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+
+import synthetic
+import rendering
+from prioritization import assess_risk
+
+
+def fake_state(mutants: int, files: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    paths = [f"App/Services/Service{i}.cs" for i in range(files)]
+    unfixed, survived = [], []
+    for i in range(mutants):
+        mutator = rng.choice(synthetic.MUTATORS)
+        status = rng.choice(["Survived", "NoCoverage"])
+        risk_level, risk_icon = assess_risk(mutator)
+        mutant = {
+            "file_path": rng.choice(paths), "mutator_name": mutator, "status": status,
+            "line": rng.randint(1, 400), "original_code": "var sum = a + b;", "mutated_code": "var sum = a - b;",
+            "risk_level": risk_level, "risk_icon": risk_icon,
+        }
+        unfixed.append(mutant)
+        if status == "Survived":
+            survived.append(mutant)
+    killed = mutants * 3
+    return {
+        "pr_number": 1, "source_branch": "feature", "repo_slug": "octo/app",
+        "mutation_score": 100 * killed / (killed + len(survived)), "projected_score": 100.0,
+        "mutation_stats": {"total_mutants": killed + mutants, "killed": killed, "survived": len(survived),
+                           "no_coverage": mutants - len(survived), "compile_error": 0},
+        "run_stats": {"analysis_time_seconds": 600, "mutants_generated": killed + mutants,
+                      "survivors_found": len(survived), "tests_generated": 0},
+        "survived_by_mutator": dict(Counter(m["mutator_name"] for m in survived)),
+        "survived_by_file": dict(Counter(m["file_path"] for m in survived)),
+        "unfixed_mutants": unfixed, "generated_tests": [], "survived_mutations": [], "stage_timings": [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mutants", type=int, default=100000)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    state = fake_state(args.mutants, args.files)
+    with tempfile.TemporaryDirectory() as root:
+        # Render from the templates in this checkout, with the bytecode cache in the scratch directory
+        rendering.TEMPLATE_DIR = os.path.join(synthetic.APP_DIR, "templates")
+        rendering.TEMPLATE_CACHE_DIR = os.path.join(root, "jinja-cache")
+        output = os.path.join(root, "mutation-dashboard.html")
+        rendering.get_template_environment().get_template("report_template.html")
+
+        samples = []
+        for _ in range(args.runs):
+            tracemalloc.start()
+            start = time.perf_counter()
+            rendering.render_to_file(
+                "report_template.html", output, state=state, mutations_by_id={}, trends=None,
+                chart_data=rendering.chart_data(state),
+                mutant_json=rendering.script_json(rendering.mutant_table(state["unfixed_mutants"])),
+            )
+            samples.append(time.perf_counter() - start)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        print(f"{args.mutants} unfixed mutants across {args.files} files")
+        print(f"Render time: best {min(samples):.2f}s over {args.runs} run(s)")
+        print(f"Peak heap:   {peak / 1e6:.1f} MB")
+        print(f"HTML size:   {os.path.getsize(output) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Fills a history store with synthetic runs and times recording and the dashboard's trend queries.
+
+    python benchmarks/bench_history.py --runs 5000 --files 2000 --files-per-run 150
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+
+import synthetic
+from history import HistoryStore, trend_summary
+
+
+def fake_state(rng: random.Random, run: int, files: list[str], files_per_run: int) -> dict:
+    survived_by_file = {path: rng.randint(1, 8) for path in rng.sample(files, files_per_run)}
+    survived = sum(survived_by_file.values())
+    total = survived * 5
+    return {
+        "repo_slug": "octo/app", "pr_number": run // 3, "head_sha": f"{run:040x}", "source_branch": "master",
+        "mutation_score": 100 * (total - survived) / total, "projected_score": 100.0,
+        "mutation_stats": {"total_mutants": total, "killed": total - survived, "survived": survived,
+                           "no_coverage": 0, "compile_error": 0},
+        "run_stats": {"analysis_time_seconds": rng.randint(60, 600), "tests_generated": rng.randint(0, 20)},
+        "survived_by_file": survived_by_file,
+        "survived_by_mutator": {m: rng.randint(0, 50) for m in synthetic.MUTATORS},
+    }
+
+
+def timed(label: str, repeat: int, fn):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    print(f"{label:<40} {(time.perf_counter() - start) / repeat * 1000:9.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--files-per-run", type=int, default=150)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    files = [f"App/Services/Service{i}.cs" for i in range(args.files)]
+    with tempfile.TemporaryDirectory() as root:
+        store = HistoryStore(os.path.join(root, "history.sqlite"))
+        start = time.perf_counter()
+        now = time.time()
+        for run in range(args.runs):
+            # Spread the runs over the last year
+            store.record_run(fake_state(rng, run, files, args.files_per_run),
+                             recorded_at=now - (args.runs - run) * 365 * 24 * 3600 / args.runs)
+        seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(store.path) / 1e6
+        print(f"Recorded {args.runs} runs in {seconds:.1f}s ({seconds / args.runs * 1000:.2f} ms/run), "
+              f"database {size_mb:.1f} MB\n")
+
+        month_ago = now - 30 * 24 * 3600
+        timed("record one more run", 20, lambda: store.record_run(fake_state(rng, args.runs, files, args.files_per_run)))
+        timed("last 50 runs", 50, lambda: store.runs("octo/app", limit=50))
+        timed("one file, all runs", 50, lambda: store.file_trend("octo/app", files[0], limit=args.runs))
+        timed("leaking files, last 30 days", 20, lambda: store.leaking_files("octo/app", since=month_ago))
+        timed("leaking files, all time", 5, lambda: store.leaking_files("octo/app"))
+        timed("mutator totals, last 30 days", 20, lambda: store.mutator_totals("octo/app", since=month_ago))
+        timed("dashboard trend summary", 20, lambda: trend_summary(store, "octo/app"))
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Compares the per-test read/insert/write loop with grouped single-pass insertion.
+
+    python benchmarks/bench_integration.py --files 20 --tests 600 --existing-methods 300
+
+Each synthetic test file already holds `--existing-methods` tests; the generated tests are
+spread across the files. Also checks both paths produce test files with every method in place.
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import textwrap
+
+import synthetic  # noqa: F401  (puts the app modules on sys.path)
+from integration import insert_tests, group_by_file, INDENTATION
+
+
+def test_file(name: str, methods: int) -> str:
+    body = "\n\n".join(
+        f"        [Fact]\n        public void Existing{i}()\n        {{\n            Assert.Equal({i}, {i});\n        }}"
+        for i in range(methods)
+    )
+    return f"using Xunit;\n\nnamespace Synthetic.Tests\n{{\n    public class {name}\n    {{\n{body}\n    }}\n}}\n"
+
+
+def generated_test(i: int) -> str:
+    return f"[Fact]\npublic void Generated{i}()\n{{\n    var value = {i};\n    Assert.True(value >= 0);\n}}"
+
+
+def rfind_insert(content: str, test_code: str) -> str:
+    """The previous insertion: before the last '}' of the file, rebuilt once per test."""
+    last_brace_index = content.rfind("}")
+    indented_test_code = textwrap.indent(test_code, INDENTATION)
+    return content[:last_brace_index].rstrip() + f"\n\n{indented_test_code}\n" + content[last_brace_index:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--tests", type=int, default=600)
+    parser.add_argument("--existing-methods", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    names = [f"Service{i}Tests" for i in range(args.files)]
+    tests = [
+        {"target_test_file": f"{rng.choice(names)}.cs", "generated_test_code": generated_test(i)}
+        for i in range(args.tests)
+    ]
+
+    with tempfile.TemporaryDirectory() as root:
+        def reset():
+            for name in names:
+                with open(os.path.join(root, f"{name}.cs"), "w") as f:
+                    f.write(test_file(name, args.existing_methods))
+
+        reset()
+        start = time.perf_counter()
+        for test in tests:
+            path = os.path.join(root, test["target_test_file"])
+            with open(path) as f:
+                content = f.read()
+            with open(path, "w") as f:
+                f.write(rfind_insert(content, test["generated_test_code"]))
+        per_test = time.perf_counter() - start
+        print(f"per-test read/insert/write  {per_test:7.3f}s  ({len(tests)} reads and writes)")
+
+        reset()
+        start = time.perf_counter()
+        groups = group_by_file(tests)
+        for file_path, indexes in groups.items():
+            path = os.path.join(root, file_path)
+            with open(path) as f:
+                content = f.read()
+            new_content, _ = insert_tests(content, [tests[i]["generated_test_code"] for i in indexes], file_path)
+            with open(path, "w") as f:
+                f.write(new_content)
+        grouped = time.perf_counter() - start
+        print(f"grouped single pass         {grouped:7.3f}s  ({len(groups)} reads and writes)"
+              f"   speedup {per_test / grouped:.1f}x")
+
+        for file_path, indexes in groups.items():
+            with open(os.path.join(root, file_path)) as f:
+                content = f.read()
+            missing = [i for i in indexes if f"public void Generated{i}()" not in content]
+            assert not missing, f"{file_path} is missing tests {missing}"
+            assert content.rstrip().endswith("    }\n}"), f"{file_path} lost its closing braces"
+        print("All generated tests are inside their test classes.")
+
+
+if __name__ == "__main__":
+    main()
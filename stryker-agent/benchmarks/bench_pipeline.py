@@ -0,0 +1,303 @@
+"""
+Runs the whole agent (main.py, every graph node) against a synthetic C# repository and reports
+per-node wall and CPU time, LLM calls and peak memory.
+
+Nothing leaves the machine: 'dotnet stryker' is fake_stryker.py replaying a synthetic report,
+the chat model is fake_llm.FakeChatModel with simulated latency, the branch and the shared
+history are pushed to a local bare repository and the pull request and PR comment go to
+github_stub.py. Generated tests are not compiled (VERIFY_GENERATED_TESTS=false), since that
+needs the .NET SDK.
+
+    python benchmarks/bench_pipeline.py --files 200 --mutants-per-file 20 --runs 3
+    python benchmarks/bench_pipeline.py --runs 3 --save pipeline.json      # record a baseline
+    python benchmarks/bench_pipeline.py --runs 3 --compare pipeline.json   # fail if >20% slower
+    python benchmarks/bench_pipeline.py --projects 4 --stryker-startup 2   # a solution of four projects
+
+Each run starts from a fresh repository and data directory, so caches start cold.
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+import synthetic
+from github_stub import start_stub
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+GIT = ["git", "-c", "user.name=Bench", "-c", "user.email=bench@example.com", "-c", "init.defaultBranch=master"]
+PROJECT = """<Project Sdk="Microsoft.NET.Sdk">
+  <PropertyGroup><TargetFramework>net8.0</TargetFramework></PropertyGroup>
+</Project>
+"""
+TEST_PROJECT = """<Project Sdk="Microsoft.NET.Sdk">
+  <PropertyGroup><TargetFramework>net8.0</TargetFramework><IsTestProject>true</IsTestProject></PropertyGroup>
+  <ItemGroup><PackageReference Include="xunit" Version="2.9.0" /></ItemGroup>
+  <ItemGroup>{references}</ItemGroup>
+</Project>
+"""
+SOLUTION_PROJECT = 'Project("{{FAE04EC0-301F-11D3-BF4B-00C04F79EFBC}}") = "{name}", "{name}\\{name}.csproj", "{{{guid}}}"\nEndProject\n'
+# Slower nodes than this are not reported as regressions, however large the relative change
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def test_file(class_name: str, tests: int) -> str:
+    body = "\n".join(
+        f"        [Fact]\n        public void Existing{i}()\n        {{\n"
+        f"            var service = new {class_name[:-5]}();\n"
+        f"            var result = service.Method0({i}, {i + 1});\n"
+        f"            Assert.Equal({2 * i + 1} * 2, result);\n        }}\n"
+        for i in range(tests)
+    )
+    return f"using Xunit;\n\nnamespace Synthetic.Tests\n{{\n    public class {class_name}\n    {{\n{body}    }}\n}}\n"
+
+
+def git(cwd: str, *args: str):
+    subprocess.run([*GIT, *args], cwd=cwd, check=True, capture_output=True)
+
+
+def build_repository(workspace: str, args) -> dict:
+    """
+    Writes the synthetic repository (App, App2... + App.Tests and their solution), commits it on
+    master, adds a PR branch that edits --changed-files files, and pushes both to a bare 'origin'.
+    Returns the paths.
+    """
+    root = os.path.join(workspace, "repo")
+    paths = synthetic.write_source_tree(root, args.files, args.methods, args.projects)
+    names = [synthetic.project_dir(index) for index in range(args.projects)]
+    for name in names:
+        with open(os.path.join(root, name, f"{name}.csproj"), "w") as f:
+            f.write(PROJECT)
+    os.makedirs(os.path.join(root, "App.Tests", "Services"))
+    with open(os.path.join(root, "App.Tests", "App.Tests.csproj"), "w") as f:
+        f.write(TEST_PROJECT.format(references="".join(
+            f'<ProjectReference Include="../{name}/{name}.csproj" />' for name in names
+        )))
+    with open(os.path.join(root, "App.sln"), "w") as f:
+        f.write("".join(
+            SOLUTION_PROJECT.format(name=name, guid=f"00000000-0000-0000-0000-{index:012d}")
+            for index, name in enumerate(names + ["App.Tests"])
+        ))
+    for i in range(args.files):
+        with open(os.path.join(root, "App.Tests", "Services", f"Service{i}Tests.cs"), "w") as f:
+            f.write(test_file(f"Service{i}Tests", args.existing_tests))
+    with open(os.path.join(root, ".gitignore"), "w") as f:
+        f.write("StrykerOutput/\nmutation-dashboard.html\nagent-trace.json\n")
+
+    remote = os.path.join(workspace, "origin.git")
+    git(workspace, "init", "--bare", remote)
+    git(root, "init")
+    git(root, "add", "-A")
+    git(root, "commit", "-m", "Synthetic repository")
+    git(root, "checkout", "-b", "pr-change")
+    for path in paths[:args.changed_files]:
+        with open(os.path.join(root, path)) as f:
+            content = f.read()
+        with open(os.path.join(root, path), "w") as f:
+            f.write(content.replace("if (sum > 0)", "if (sum >= 0)"))
+    git(root, "commit", "-am", "PR change")
+    git(root, "remote", "add", "origin", remote)
+    git(root, "push", "origin", "master", "pr-change")
+    git(root, "fetch", "origin")
+
+    report = synthetic.write_report(os.path.join(workspace, "full-report.json"), root, paths,
+                                    args.mutants_per_file, args.methods)
+    bin_dir = os.path.join(workspace, "bin")
+    os.makedirs(bin_dir)
+    with open(os.path.join(bin_dir, "dotnet"), "w") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.join(BENCH_DIR, "fake_stryker.py")}" "$@"\n')
+    os.chmod(os.path.join(bin_dir, "dotnet"), 0o755)
+    return {"root": root, "remote": remote, "report": report, "bin": bin_dir}
+
+
+def run_once(args, workspace: str, api_url: str) -> dict:
+    """Runs the agent in a child process and returns its trace events."""
+    repo = build_repository(workspace, args)
+    trace_path = os.path.join(workspace, "agent-trace.json")
+    env = dict(
+        os.environ,
+        PATH=repo["bin"] + os.pathsep + os.environ.get("PATH", ""),
+        STRYKER_AGENT_REPO_ROOT=repo["root"],
+        STRYKER_AGENT_DATA_DIR=os.path.join(workspace, "data"),
+        JINJA_CACHE_DIR=os.path.join(workspace, "data", "jinja-cache"),
+        AGENT_TRACE_PATH=trace_path,
+        AGENT_TRACE_FORMAT="chrome",
+        FAKE_STRYKER_REPORT=repo["report"],
+        FAKE_STRYKER_MUTANT_SECONDS=str(args.mutant_seconds),
+        FAKE_STRYKER_STARTUP_SECONDS=str(args.stryker_startup),
+        GITHUB_REPOSITORY="octo/app",
+        GITHUB_TOKEN="bench-token",
+        GITHUB_API_URL=api_url,
+        GIT_PUSH_URL=repo["remote"],
+        MUTATION_HISTORY_BRANCH="stryker-agent-history",
+        SOURCE_BRANCH="pr-change",
+        BASE_BRANCH="master",
+        PR_NUMBER="1",
+        STRYKER_BATCHES=str(args.batches),
+        STRYKER_CONCURRENCY=str(args.concurrency),
+        STRYKER_PARALLEL_PROJECTS=str(args.parallel_projects),
+        VERIFY_GENERATED_TESTS="false",
+        TEST_GEN_GROUPING=args.grouping,
+        TEST_GEN_MAX_IN_FLIGHT=str(args.max_in_flight),
+        TEST_GEN_REQUESTS_PER_MINUTE=str(args.requests_per_minute),
+    )
+    command = [sys.executable, os.path.abspath(__file__), "--worker",
+               "--llm-latency", str(args.llm_latency), "--llm-jitter", str(args.llm_jitter),
+               "--llm-seconds-per-1k-tokens", str(args.llm_seconds_per_1k_tokens),
+               "--llm-error-rate", str(args.llm_error_rate)]
+    result = subprocess.run(command, cwd=repo["root"], env=env, capture_output=True, text=True)
+    with open(os.path.join(workspace, "agent.log"), "w") as f:
+        f.write(result.stdout + result.stderr)
+    if result.returncode != 0 or not os.path.exists(trace_path):
+        sys.exit(f"The agent run failed (exit code {result.returncode}):\n{result.stdout[-4000:]}\n{result.stderr[-4000:]}")
+    branches = subprocess.run(["git", "branch", "--list"], cwd=repo["remote"], capture_output=True, text=True).stdout
+    pushed = "feature/stryker-fixes-pr-1" in branches and "stryker-agent-history" in branches
+    with open(trace_path) as f:
+        events = json.load(f)["traceEvents"]
+    return {"events": events, "pushed": bool(pushed), "log": result.stdout}
+
+
+def summarize(events: list[dict]) -> dict:
+    nodes = {}
+    for event in events:
+        if event["cat"] == "node":
+            node = nodes.setdefault(event["name"], {"wall_seconds": 0.0, "cpu_seconds": 0.0})
+            node["wall_seconds"] += event["dur"] / 1e6
+            node["cpu_seconds"] += event["args"]["cpu_seconds"]
+    return {
+        "nodes": nodes,
+        "total_seconds": sum(node["wall_seconds"] for node in nodes.values()),
+        "peak_rss_mb": max((e["args"].get("peak_rss_mb", 0) for e in events), default=0),
+        "peak_child_rss_mb": max((e["args"].get("peak_child_rss_mb", 0) for e in events), default=0),
+        "llm_calls": sum(1 for e in events if e["name"] == "llm_call"),
+        "prefetch_batches": sum(1 for e in events if e["name"] == "prefetch_tests"),
+        "prompt_tokens": sum(e["args"].get("prompt_tokens", 0) for e in events if e["name"] == "llm_call"),
+    }
+
+
+def median_summary(samples: list[dict]) -> dict:
+    names = list(samples[0]["nodes"])
+    return {
+        "nodes": {name: statistics.median(s["nodes"].get(name, {}).get("wall_seconds", 0.0) for s in samples)
+                  for name in names},
+        "cpu": {name: statistics.median(s["nodes"].get(name, {}).get("cpu_seconds", 0.0) for s in samples)
+                for name in names},
+        "total_seconds": statistics.median(s["total_seconds"] for s in samples),
+        "peak_rss_mb": max(s["peak_rss_mb"] for s in samples),
+        "peak_child_rss_mb": max(s["peak_child_rss_mb"] for s in samples),
+        "llm_calls": samples[-1]["llm_calls"],
+        "prefetch_batches": samples[-1]["prefetch_batches"],
+        "prompt_tokens": samples[-1]["prompt_tokens"],
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Returns a line per metric that got worse than the baseline by more than the tolerance."""
+    regressions = []
+    for name, seconds in results["nodes"].items():
+        before = baseline["nodes"].get(name)
+        if before and seconds - before > MIN_REGRESSION_SECONDS and seconds / before - 1 > tolerance:
+            regressions.append(f"{name}: {before:.2f}s -> {seconds:.2f}s ({seconds / before - 1:+.0%})")
+    for key, unit in (("total_seconds", "s"), ("peak_rss_mb", " MB")):
+        before, after = baseline.get(key), results[key]
+        if before and after / before - 1 > tolerance:
+            regressions.append(f"{key}: {before:.1f}{unit} -> {after:.1f}{unit} ({after / before - 1:+.0%})")
+    return regressions
+
+
+def worker(args):
+    """Child process: the agent's own entry point, with the fake chat model plugged in."""
+    from fake_llm import FakeChatModel
+    import agents
+    import main
+    agents._llm = FakeChatModel(latency=args.llm_latency, jitter=args.llm_jitter, error_rate=args.llm_error_rate,
+                                seconds_per_1k_prompt_tokens=args.llm_seconds_per_1k_tokens)
+    sys.argv = ["main.py"]
+    main.main()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--projects", type=int, default=1, help="Production projects the files are spread over.")
+    parser.add_argument("--methods", type=int, default=8, help="Methods per source file.")
+    parser.add_argument("--mutants-per-file", type=int, default=20)
+    parser.add_argument("--changed-files", type=int, default=10, help="Files the synthetic PR edits.")
+    parser.add_argument("--existing-tests", type=int, default=40, help="Tests already in each test file.")
+    parser.add_argument("--mutant-seconds", type=float, default=0.001, help="Simulated Stryker time per mutant.")
+    parser.add_argument("--stryker-startup", type=float, default=0.0,
+                        help="Simulated build and initial test run per Stryker invocation, in seconds.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Test runners shared by all Stryker runs.")
+    parser.add_argument("--parallel-projects", type=int, default=0,
+                        help="STRYKER_PARALLEL_PROJECTS (0: every project at once, 1: one after another).")
+    parser.add_argument("--batches", type=int, default=4, help="STRYKER_BATCHES for the run.")
+    parser.add_argument("--grouping", choices=["mutant", "method"], default="mutant")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-jitter", type=float, default=0.05)
+    parser.add_argument("--llm-seconds-per-1k-tokens", type=float, default=0.02,
+                        help="Extra latency per 1000 prompt tokens, so larger prompts answer slower.")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--requests-per-minute", type=int, default=6000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="Keep the last run's workspace and print its path.")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a JSON baseline.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+
+    server, github, api_url = start_stub()
+    samples = []
+    try:
+        for run in range(args.runs):
+            workspace = tempfile.mkdtemp(prefix="bench-pipeline-")
+            outcome = run_once(args, workspace, api_url)
+            if not outcome["pushed"]:
+                sys.exit(f"The run did not push the generated tests branch and the shared history. Agent output:\n{outcome['log'][-4000:]}")
+            samples.append(summarize(outcome["events"]))
+            if args.keep and run == args.runs - 1:
+                print(f"Workspace kept at {workspace}")
+            else:
+                shutil.rmtree(workspace)
+    finally:
+        server.shutdown()
+    if not github.pulls or not any(github.comments.values()):
+        sys.exit("The run did not open a pull request and post the score comment on the GitHub stand-in.")
+
+    results = median_summary(samples)
+    results["scale"] = {key: getattr(args, key) for key in ("files", "projects", "methods", "mutants_per_file", "existing_tests",
+                                                             "concurrency", "parallel_projects", "batches", "grouping",
+                                                             "llm_latency", "max_in_flight")}
+    print(f"{args.files} files x {args.mutants_per_file} mutants in {args.projects} project(s), {args.batches} Stryker batch(es), "
+          f"'{args.grouping}' grouping, {args.llm_latency:.2f}s LLM latency; median of {args.runs} run(s)\n")
+    print(f"{'node':<32} {'wall s':>8} {'cpu s':>8}")
+    for name, seconds in results["nodes"].items():
+        print(f"{name:<32} {seconds:8.2f} {results['cpu'][name]:8.2f}")
+    print(f"{'total':<32} {results['total_seconds']:8.2f}")
+    print(f"\nLLM calls: {results['llm_calls']} ({results['prefetch_batches']} batch(es) prefetched during Stryker), "
+          f"{results['prompt_tokens']} prompt tokens")
+    print(f"Peak RSS: {results['peak_rss_mb']:.0f} MB agent, {results['peak_child_rss_mb']:.0f} MB subprocesses")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != results["scale"]:
+            print(f"\nWARNING: The baseline was recorded at a different scale: {baseline.get('scale')}")
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"\nBaseline total {baseline['total_seconds']:.2f}s -> {results['total_seconds']:.2f}s")
+        if regressions:
+            sys.exit(f"Regressed by more than {args.tolerance:.0%}:\n  " + "\n  ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compares per-survivor os.walk test-file lookup with the one-time repository index.
+
+    python benchmarks/bench_repo_index.py --projects 40 --files-per-project 500 --survivors 2000
+
+The synthetic tree has production and test projects plus bin/ and obj/ output folders,
+which the old lookup walked on every call.
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+
+import synthetic  # noqa: F401  (puts the app modules on sys.path)
+from repo_index import RepoIndex
+
+
+def build_tree(root: str, projects: int, files_per_project: int) -> list[str]:
+    sources = []
+    for p in range(projects):
+        app, tests = f"Product{p}", f"Product{p}.Tests"
+        for project, is_test in ((app, False), (tests, True)):
+            os.makedirs(os.path.join(root, project, "bin", "Debug"), exist_ok=True)
+            os.makedirs(os.path.join(root, project, "obj"), exist_ok=True)
+            with open(os.path.join(root, project, f"{project}.csproj"), "w") as f:
+                reference = f'<ProjectReference Include="..\\{app}\\{app}.csproj" />' if is_test else ""
+                f.write(f"<Project><ItemGroup>{reference}</ItemGroup></Project>")
+        for i in range(files_per_project):
+            folder = os.path.join(root, app, f"Area{i % 20}")
+            os.makedirs(folder, exist_ok=True)
+            name = f"Service{p}_{i}"
+            open(os.path.join(folder, f"{name}.cs"), "w").close()
+            open(os.path.join(root, app, "obj", f"{name}.g.cs"), "w").close()
+            open(os.path.join(root, app, "bin", "Debug", f"{name}.dll"), "w").close()
+            if i % 2 == 0:
+                open(os.path.join(root, tests, f"{name}Tests.cs"), "w").close()
+            sources.append(os.path.relpath(os.path.join(folder, f"{name}.cs"), root))
+    return sources
+
+
+def walk_lookup(root: str, source_file_path: str) -> str | None:
+    """The previous find_test_file: a full os.walk per lookup."""
+    filename = os.path.basename(source_file_path).replace(".cs", "")
+    possible_test_filenames = [f"{filename}Tests.cs", f"{filename}Test.cs"]
+    for current, _, files in os.walk(root):
+        for test_filename in possible_test_filenames:
+            if test_filename in files:
+                return os.path.relpath(os.path.join(current, test_filename), root)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=40)
+    parser.add_argument("--files-per-project", type=int, default=500)
+    parser.add_argument("--survivors", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        sources = build_tree(root, args.projects, args.files_per_project)
+        survivors = random.Random(3).choices(sources, k=args.survivors)
+        print(f"Synthetic tree: {len(sources)} source files, {args.survivors} survivor lookups")
+
+        start = time.perf_counter()
+        walked = [walk_lookup(root, s) for s in survivors]
+        walk_time = time.perf_counter() - start
+        print(f"os.walk per lookup   {walk_time:8.2f}s")
+
+        start = time.perf_counter()
+        index = RepoIndex(root)
+        build_time = time.perf_counter() - start
+        indexed = [index.find_test_file(s) for s in survivors]
+        index_time = time.perf_counter() - start
+        print(f"index (build {build_time:.2f}s) {index_time:8.2f}s   speedup {walk_time / index_time:.0f}x")
+
+        mismatches = sum(1 for a, b in zip(walked, indexed) if a != b)
+        print(f"Lookups that differ: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Measures how the report analyst's per-file pass (source read, line slicing, risk tagging,
+counters) scales with REPORT_ANALYSIS_WORKERS, and checks every worker count gives the
+same result as the serial pass.
+
+    python benchmarks/bench_report_analysis.py --files 3000 --mutants-per-file 60 --workers 1 2 4 8
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import synthetic
+import analysis
+from report_reader import StreamingReportReader
+
+
+def run(report_path: str, workers: int):
+    start = time.perf_counter()
+    totals = analysis.analyze_report(StreamingReportReader(report_path), workers)
+    return time.perf_counter() - start, totals
+
+
+def snapshot(totals: analysis.ReportTotals) -> tuple:
+    return (totals.status_counts, totals.survived_mutations, totals.unfixed_mutants,
+            totals.survived_by_mutator, totals.survived_by_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=3000)
+    parser.add_argument("--mutants-per-file", type=int, default=60)
+    parser.add_argument("--methods-per-file", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = synthetic.write_source_tree(root, args.files, args.methods_per_file)
+        report_path = synthetic.write_report(os.path.join(root, "stryker-report.json"), root, paths,
+                                             args.mutants_per_file, args.methods_per_file)
+        # Workers are forked, so they see the synthetic tree as the repository root too
+        analysis.REPO_ROOT = root
+        print(f"{args.files} files, {args.files * args.mutants_per_file} mutants, "
+              f"report {os.path.getsize(report_path) / 1e6:.1f} MB, {os.cpu_count()} CPU(s)\n")
+
+        print(f"{'workers':>8} {'seconds':>9} {'speed-up':>9}")
+        serial_seconds, reference = None, None
+        for workers in args.workers:
+            seconds, totals = run(report_path, workers)
+            if reference is None:
+                serial_seconds, reference = seconds, snapshot(totals)
+            elif snapshot(totals) != reference:
+                raise SystemExit(f"Results with {workers} worker(s) differ from the first run.")
+            print(f"{workers:>8} {seconds:9.2f} {serial_seconds / seconds:8.2f}x")
+        print("\nAll worker counts produced identical results.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compares the streaming Stryker report reader with loading the whole report via json.loads.
+
+    python benchmarks/bench_report_reader.py --files 5000 --mutants-per-file 100
+
+Reports wall time and peak Python heap (tracemalloc) for computing the status counts,
+survived-by-mutator and survived-by-file aggregates the report analyst needs.
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+
+import synthetic
+from report_reader import StreamingReportReader
+
+
+def load_whole(path: str):
+    with open(path, "r") as f:
+        report = json.loads(f.read())
+    all_mutants = []
+    for file_report in report.get("files", {}).values():
+        all_mutants.extend(file_report.get("mutants", []))
+    status_counts = Counter(m["status"] for m in all_mutants)
+    by_mutator, by_file = Counter(), Counter()
+    for file_path, file_report in report.get("files", {}).items():
+        for m in file_report.get("mutants", []):
+            if m["status"] == "Survived":
+                by_mutator[m["mutatorName"]] += 1
+                by_file[file_path] += 1
+    return status_counts, by_mutator, by_file
+
+
+def load_streaming(path: str):
+    status_counts, by_mutator, by_file = Counter(), Counter(), Counter()
+    for file_path, file_report in StreamingReportReader(path):
+        for m in file_report.get("mutants", []):
+            status_counts[m["status"]] += 1
+            if m["status"] == "Survived":
+                by_mutator[m["mutatorName"]] += 1
+                by_file[file_path] += 1
+    return status_counts, by_mutator, by_file
+
+
+def measure(name: str, fn, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<12} {elapsed:8.2f}s   peak heap {peak / 1024 / 1024:8.1f} MiB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--mutants-per-file", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stryker-report.json")
+        report = synthetic.report("/repo", [f"App/Service{i}.cs" for i in range(args.files)], args.mutants_per_file, 20)
+        with open(path, "w") as f:
+            json.dump(report, f)
+        del report
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"Synthetic report: {args.files * args.mutants_per_file} mutants, {size_mb:.1f} MiB on disk")
+
+        whole = measure("json.loads", load_whole, path)
+        streamed = measure("streaming", load_streaming, path)
+        assert whole == streamed, "Streaming reader disagrees with json.loads"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measures the agent's cold start: time from interpreter launch until the LangGraph app is
+compiled and the first node can run, plus the slowest imports from `python -X importtime`.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --runs 5 --save startup.json     # record a baseline
+    python benchmarks/bench_startup.py --runs 5 --compare startup.json  # fail if >20% slower
+
+Run it in the agent image (or with its requirements installed); no repository or API key is needed.
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+import synthetic
+
+# Child process: import the graph the way main.py does and report when it is ready to run
+CHILD = (
+    "import time\n"
+    "from graph import create_graph\n"
+    "create_graph()\n"
+    "print(time.time())\n"
+)
+
+
+def time_to_first_node() -> float:
+    start = time.time()
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=synthetic.APP_DIR,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1]) - start
+
+
+def slowest_imports(limit: int) -> list[tuple[str, float, float]]:
+    """Top-level-ish imports by cumulative time: (module, self ms, cumulative ms)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], cwd=synthetic.APP_DIR,
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 2:
+            rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return sorted(rows, key=lambda row: row[2], reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a JSON baseline.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    time_to_first_node()  # warm the filesystem and .pyc caches
+    samples = [time_to_first_node() for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(f"Time to first node: median {median * 1000:.0f} ms over {args.runs} run(s) "
+          f"(min {min(samples) * 1000:.0f}, max {max(samples) * 1000:.0f})")
+
+    print(f"\n{'module':<50} {'self ms':>9} {'cumulative ms':>14}")
+    for name, self_ms, cumulative_ms in slowest_imports(args.top):
+        print(f"{name:<50} {self_ms:9.1f} {cumulative_ms:14.1f}")
+
+    results = {"time_to_first_node_seconds": median}
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["time_to_first_node_seconds"]
+        change = median / baseline - 1
+        print(f"\nBaseline {baseline * 1000:.0f} ms -> {median * 1000:.0f} ms ({change:+.0%})")
+        if change > args.tolerance:
+            sys.exit(f"Cold start regressed by more than {args.tolerance:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+A stand-in chat model for the benchmarks: answers the test generation prompts with valid JSON
+after a simulated network latency, without an API key.
+
+Cluster prompts ('TEST_GEN_GROUPING=method') get one test per listed mutant id; single-mutant
+prompts get one test named after a hash of the prompt, so every generated method name is unique.
+"""
+import re
+import time
+import json
+import random
+import asyncio
+import hashlib
+import threading
+
+import synthetic  # noqa: F401  (puts the app modules on sys.path)
+from csharp import estimate_tokens
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.language_models.chat_models import BaseChatModel
+
+_MUTANT_ID = re.compile(r"\*\*Id (\S+)\*\*")
+# Latency and failure draws, one seeded generator per model shared by its concurrent calls
+_lock = threading.Lock()
+_rngs: dict[int, random.Random] = {}
+
+
+class FakeChatModel(BaseChatModel):
+    # Seconds per call: uniform in latency ± jitter, plus the time to read the prompt
+    latency: float = 0.5
+    jitter: float = 0.2
+    seconds_per_1k_prompt_tokens: float = 0.0
+    # Share of calls that fail with a retryable rate-limit error
+    error_rate: float = 0.0
+    seed: int = 7
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def _draw(self, messages) -> tuple[float, bool]:
+        prompt_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+        with _lock:
+            rng = _rngs.setdefault(id(self), random.Random(self.seed))
+            self.calls += 1
+            delay = max(0.0, rng.uniform(self.latency - self.jitter, self.latency + self.jitter))
+            return delay + prompt_tokens / 1000 * self.seconds_per_1k_prompt_tokens, rng.random() < self.error_rate
+
+    def _answer(self, messages) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        mutant_ids = _MUTANT_ID.findall(prompt)
+        if mutant_ids:
+            content = {"tests": [
+                {"mutant_ids": [mutant_id], "explanation": f"Pins down the behaviour mutant {mutant_id} changes.",
+                 "code": _test_method(f"Kills_Mutant_{mutant_id}")}
+                for mutant_id in mutant_ids
+            ]}
+        else:
+            digest = hashlib.sha1(prompt.encode()).hexdigest()[:12]
+            content = {"explanation": "Pins down the behaviour the mutation changes.",
+                       "code": _test_method(f"Kills_Mutation_{digest}")}
+        text = json.dumps(content)
+        usage = {"input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(text)}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay, fail = self._draw(messages)
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("429 rate limit exceeded (simulated)")
+        return self._answer(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay, fail = self._draw(messages)
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("429 rate limit exceeded (simulated)")
+        return self._answer(messages)
+
+
+def _test_method(name: str) -> str:
+    return f"[Fact]\npublic void {name}()\n{{\n    var service = new object();\n    Assert.NotNull(service);\n}}"
@@ -0,0 +1,113 @@
+"""
+A stand-in for 'dotnet stryker' that replays a prepared report: it tests the files (and line
+spans) selected by the '--mutate' globs and marks the other mutants Ignored, prints Stryker-style
+progress while simulating the test time, and writes the result under StrykerOutput/ in the working directory (or '--output').
+The simulated time is a fixed start-up (build and initial test run, FAKE_STRYKER_STARTUP_SECONDS)
+plus FAKE_STRYKER_MUTANT_SECONDS per mutant divided over the test runners ('--concurrency',
+else the config file's).
+
+    FAKE_STRYKER_REPORT=full-report.json FAKE_STRYKER_MUTANT_SECONDS=0.001 \\
+        python benchmarks/fake_stryker.py stryker --project App/App.csproj --mutate '**/Services/Service1.cs'
+
+bench_pipeline.py installs it as the 'dotnet' on PATH.
+"""
+import os
+import re
+import sys
+import json
+import time
+
+_SPAN = re.compile(r"\{(\d+)\.\.(\d+)\}$")
+
+
+def parse_mutate(argv: list[str]) -> list[tuple[str, tuple[int, int] | None]]:
+    """The include globs as (path suffix, line span or None); '!' exclusions are not replayed."""
+    globs = []
+    for flag, value in zip(argv, argv[1:]):
+        if flag != "--mutate" or value.startswith("!"):
+            continue
+        span = _SPAN.search(value)
+        path = _SPAN.sub("", value)
+        path = path[3:] if path.startswith("**/") else path
+        globs.append((path, (int(span.group(1)), int(span.group(2))) if span else None))
+    return globs
+
+
+def option(argv: list[str], flag: str) -> str | None:
+    values = [value for name, value in zip(argv, argv[1:]) if name == flag]
+    return values[-1] if values else None
+
+
+def concurrency(argv: list[str]) -> int:
+    value = option(argv, "--concurrency")
+    if value is None and option(argv, "--config-file"):
+        with open(option(argv, "--config-file")) as f:
+            value = json.load(f).get("stryker-config", {}).get("concurrency")
+    return max(1, int(value or 1))
+
+
+def _ignored(entry: dict, keep=lambda mutant: False) -> dict:
+    return dict(entry, mutants=[
+        mutant if keep(mutant) else dict(mutant, status="Ignored", statusReason="Removed by mutate filter")
+        for mutant in entry["mutants"]
+    ])
+
+
+def select(report: dict, root: str, project: str | None, globs: list) -> dict:
+    """
+    The project's files, with the mutants outside the globs marked Ignored as Stryker.NET does
+    (it lists every file of the project, whatever '--mutate' selects).
+    """
+    project_dir = os.path.dirname(project) if project else ""
+    files = {}
+    for file_path, entry in report["files"].items():
+        relative = os.path.relpath(file_path, root)
+        if project_dir and not relative.startswith(project_dir + "/"):
+            continue
+        if not globs:
+            files[file_path] = entry
+            continue
+        spans = [span for path, span in globs if relative == path or relative.endswith("/" + path)]
+        if not spans:
+            files[file_path] = _ignored(entry)
+        elif None not in spans:
+            files[file_path] = _ignored(entry, lambda m: any(start <= m["location"]["start"]["line"] <= end
+                                                             for start, end in spans))
+        else:
+            files[file_path] = entry
+    return dict(report, files=files)
+
+
+def main():
+    argv = sys.argv[1:]
+    if not argv or argv[0] != "stryker":
+        sys.exit(f"fake dotnet: only 'dotnet stryker' is supported, got {argv}")
+    root = os.getcwd()
+    with open(os.environ["FAKE_STRYKER_REPORT"]) as f:
+        report = select(json.load(f), root, option(argv, "--project"), parse_mutate(argv))
+    mutant_seconds = float(os.environ.get("FAKE_STRYKER_MUTANT_SECONDS", "0.001")) / concurrency(argv)
+    time.sleep(float(os.environ.get("FAKE_STRYKER_STARTUP_SECONDS", "0")))
+
+    statuses = [m["status"] for entry in report["files"].values() for m in entry["mutants"] if m["status"] != "Ignored"]
+    total = len(statuses)
+    print(f"{total} mutants created", flush=True)
+    killed = survived = timeouts = 0
+    step = max(1, total // 50)
+    for tested, status in enumerate(statuses, 1):
+        killed += status == "Killed"
+        survived += status == "Survived"
+        timeouts += status == "Timeout"
+        if tested % step == 0 or tested == total:
+            time.sleep(step * mutant_seconds)
+            print(f"Testing mutant {tested} / {total} │ K {killed} │ S {survived} │ T {timeouts} │", flush=True)
+
+    stamp = time.strftime("%Y-%m-%d.%H-%M-%S") + f".{time.time_ns() % 10**9}"
+    output = os.path.join(option(argv, "--output") or os.path.join(root, "StrykerOutput", stamp), "reports")
+    os.makedirs(output, exist_ok=True)
+    with open(os.path.join(output, "stryker-report.json"), "w") as f:
+        json.dump(report, f)
+    print(f"Your json report has been generated at: {output}/stryker-report.json", flush=True)
+
+
+if __name__ == "__main__":
+    main()
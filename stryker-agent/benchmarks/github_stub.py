@@ -0,0 +1,154 @@
+"""
+A local stand-in for the parts of the GitHub REST API the agent uses (pull requests and
+issue comments), for exercising github_client without network access.
+
+    python benchmarks/github_stub.py --port 8765     # then GITHUB_API_URL=http://127.0.0.1:8765
+
+`fail_next` lets callers inject rate-limit (429 + Retry-After) or 5xx responses, and `lose_next`
+errors that replace the answer to writes which were applied all the same.
+"""
+import json
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class GitHubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pulls: list[dict] = []
+        self.comments: dict[int, list[dict]] = {}
+        self.next_id = 1
+        self.requests: list[tuple[str, str]] = []
+        # Status codes to answer the next requests with, before serving them normally
+        self.fail_next: list[int] = []
+        # Status codes to answer the next successful writes with after applying them (a lost response)
+        self.lose_next: list[int] = []
+
+
+class Handler(BaseHTTPRequestHandler):
+    state: GitHubState
+    base_url: str
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload=None, headers: dict | None = None):
+        if status < 400 and self.command != "GET" and self.state.lose_next:
+            status, payload = self.state.lose_next.pop(0), {"message": "injected failure after applying the request"}
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _handle(self, method: str):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        query = parse_qs(url.query)
+        state = self.state
+        with state.lock:
+            state.requests.append((method, url.path))
+            if state.fail_next:
+                status = state.fail_next.pop(0)
+                return self._send(status, {"message": "injected failure"},
+                                  {"Retry-After": "0"} if status in (403, 429) else None)
+
+            # /repos/{owner}/{repo}/pulls[/{number}]
+            if len(parts) >= 4 and parts[0] == "repos" and parts[3] == "pulls":
+                if method == "GET" and len(parts) == 4:
+                    head = query.get("head", [None])[0]
+                    base = query.get("base", [None])[0]
+                    found = [
+                        p for p in state.pulls
+                        if p["state"] == "open"
+                        and (head is None or f"{parts[1]}:{p['head']['ref']}" == head)
+                        and (base is None or p["base"]["ref"] == base)
+                    ]
+                    return self._send(200, found)
+                if method == "POST" and len(parts) == 4:
+                    data = self._body()
+                    if any(p["head"]["ref"] == data["head"] and p["base"]["ref"] == data["base"] and p["state"] == "open"
+                           for p in state.pulls):
+                        return self._send(422, {"message": "A pull request already exists"})
+                    number = state.next_id
+                    state.next_id += 1
+                    pull = {
+                        "number": number, "state": "open", "title": data["title"], "body": data.get("body"),
+                        "head": {"ref": data["head"]}, "base": {"ref": data["base"]},
+                        "html_url": f"{self.base_url}/{parts[1]}/{parts[2]}/pull/{number}",
+                    }
+                    state.pulls.append(pull)
+                    return self._send(201, pull)
+                if method == "PATCH" and len(parts) == 5:
+                    for pull in state.pulls:
+                        if pull["number"] == int(parts[4]):
+                            pull.update(self._body())
+                            return self._send(200, pull)
+                    return self._send(404, {"message": "Not Found"})
+
+            # /repos/{owner}/{repo}/issues/{number}/comments and /repos/{owner}/{repo}/issues/comments/{id}
+            if len(parts) >= 5 and parts[0] == "repos" and parts[3] == "issues":
+                if parts[4] == "comments" and method == "PATCH":
+                    for comments in state.comments.values():
+                        for comment in comments:
+                            if comment["id"] == int(parts[5]):
+                                comment.update(self._body())
+                                return self._send(200, comment)
+                    return self._send(404, {"message": "Not Found"})
+                number = int(parts[4])
+                if method == "GET":
+                    return self._send(200, state.comments.get(number, []))
+                if method == "POST":
+                    comment_id = state.next_id
+                    state.next_id += 1
+                    comment = {
+                        "id": comment_id, "body": self._body()["body"],
+                        "html_url": f"{self.base_url}/{parts[1]}/{parts[2]}/pull/{number}#issuecomment-{comment_id}",
+                    }
+                    state.comments.setdefault(number, []).append(comment)
+                    return self._send(201, comment)
+        return self._send(404, {"message": "Not Found"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+
+def start_stub(port: int = 0) -> tuple[ThreadingHTTPServer, GitHubState, str]:
+    """Starts the stand-in on a background thread. Returns (server, state, base URL)."""
+    state = GitHubState()
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.RequestHandlerClass = type("BoundHandler", (Handler,), {"state": state, "base_url": base_url})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server, _, base_url = start_stub(args.port)
+    print(f"GitHub stand-in listening on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Simulates a sharded mutation run on one machine: N processes each take their slice of the
+files, produce a partial report, and the partial reports are merged into one.
+
+    python benchmarks/shard_harness.py --shards 4 --files 400              # synthetic Stryker
+    python benchmarks/shard_harness.py --shards 4 --real                   # app/main.py --shard i/N against /repo
+
+The synthetic mode stands in for 'dotnet stryker' with a sleep proportional to the number of
+mutants in the shard, so it measures partition balance and merge correctness, not Stryker.
+The real mode needs the same environment as the container (dotnet, /repo, GITHUB_* variables).
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import synthetic
+from sharding import shard_files, merge_shard_reports
+
+MAIN = os.path.join(synthetic.APP_DIR, "main.py")
+
+
+def build_tree(root: str, files: int, seed: int = 11) -> dict[str, int]:
+    """Writes source files of uneven size; returns {path: methods} (two mutants per method)."""
+    rng = random.Random(seed)
+    methods = {}
+    for path in synthetic.write_source_tree(root, files, 1):
+        count = rng.choice([1, 2, 4, 8, 32])
+        with open(os.path.join(root, path), "w") as f:
+            f.write(synthetic.source_file(os.path.basename(path)[:-3], count))
+        methods[path] = count
+    return methods
+
+
+def run_synthetic_shard(job: tuple) -> tuple[int, int, float]:
+    root, methods, index, count, seconds_per_mutant, output = job
+    files = sorted(shard_files(set(methods), index, count, root))
+    report = {"schemaVersion": "1", "thresholds": {"high": 80, "low": 60}, "projectRoot": root, "files": {}}
+    mutants = 0
+    for path in files:
+        file_report = synthetic.report(root, [path], 2 * methods[path], methods[path], seed=zlib.crc32(path.encode()))
+        report["files"].update(file_report["files"])
+        mutants += 2 * methods[path]
+    start = time.perf_counter()
+    time.sleep(mutants * seconds_per_mutant)
+    with open(output, "w") as f:
+        json.dump(report, f)
+    return index, mutants, time.perf_counter() - start
+
+
+def run_real_shards(count: int, out_dir: str) -> list[str]:
+    outputs = [os.path.join(out_dir, f"shard-{i}.json") for i in range(1, count + 1)]
+    processes = [
+        subprocess.Popen([sys.executable, MAIN, "--shard", f"{i}/{count}", "--shard-output", outputs[i - 1]])
+        for i in range(1, count + 1)
+    ]
+    codes = [p.wait() for p in processes]
+    if any(codes):
+        raise SystemExit(f"Shard exit codes: {codes}")
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--seconds-per-mutant", type=float, default=0.001)
+    parser.add_argument("--real", action="store_true", help="Run app/main.py --shard i/N instead of the simulation.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work:
+        if args.real:
+            start = time.perf_counter()
+            outputs = run_real_shards(args.shards, work)
+            print(f"{args.shards} shard(s) finished in {time.perf_counter() - start:.1f}s")
+            expected_files = None
+        else:
+            root = os.path.join(work, "repo")
+            methods = build_tree(root, args.files)
+            outputs = [os.path.join(work, f"shard-{i}.json") for i in range(1, args.shards + 1)]
+            jobs = [(root, methods, i, args.shards, args.seconds_per_mutant, outputs[i - 1])
+                    for i in range(1, args.shards + 1)]
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=args.shards) as pool:
+                results = list(pool.map(run_synthetic_shard, jobs))
+            wall = time.perf_counter() - start
+            total = sum(mutants for _, mutants, _ in results)
+            serial = total * args.seconds_per_mutant
+            for index, mutants, seconds in results:
+                print(f"shard {index}/{args.shards}: {mutants:6d} mutants  {seconds:6.2f}s")
+            print(f"Balance (largest shard / mean): {max(r[1] for r in results) / (total / args.shards):.2f}")
+            print(f"Serial estimate {serial:.2f}s, sharded wall time {wall:.2f}s")
+            expected_files = {os.path.join(root, path) for path in methods}
+
+        start = time.perf_counter()
+        merged = merge_shard_reports(outputs)
+        print(f"Merged {len(outputs)} report(s) in {time.perf_counter() - start:.2f}s: "
+              f"{len(merged['files'])} file(s), mutation score {merged['mutationScore']:.1f}%")
+
+        ids = [m["id"] for entry in merged["files"].values() for m in entry["mutants"]]
+        assert len(ids) == len(set(ids)), "mutant ids are not unique after the merge"
+        if expected_files is not None:
+            assert set(merged["files"]) == expected_files, "the shards do not cover every file exactly once"
+            print("Every file was mutated by exactly one shard.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Synthetic inputs for the benchmarks: Stryker reports and C# source trees of configurable size.
+"""
+import os
+import sys
+import json
+import random
+
+# Make the agent modules importable the same way they are inside the container (/app)
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+MUTATORS = ["Arithmetic", "Equality", "Boolean", "Logical", "Statement", "Block", "String", "Linq", "Update", "Method"]
+STATUSES = ["Killed"] * 6 + ["Survived", "NoCoverage", "Timeout", "CompileError"]
+LINES_PER_METHOD = 6
+
+
+def source_file(class_name: str, methods: int) -> str:
+    """A compilable-looking C# class with `methods` small arithmetic methods."""
+    body = []
+    for i in range(methods):
+        body.append(
+            f"    public int Method{i}(int a, int b)\n"
+            f"    {{\n"
+            f"        var sum = a + b;\n"
+            f"        if (sum > {i}) {{ return sum * 2; }}\n"
+            f"        return sum - {i};\n"
+            f"    }}\n"
+        )
+    return f"namespace Synthetic;\n\npublic class {class_name}\n{{\n" + "\n".join(body) + "}\n"
+
+
+def project_dir(index: int) -> str:
+    """Directory of the index-th synthetic production project: App, App2, App3..."""
+    return "App" if index == 0 else f"App{index + 1}"
+
+
+def write_source_tree(root: str, files: int, methods_per_file: int, projects: int = 1) -> list[str]:
+    """
+    Writes `files` production classes under root/App/ (dealt round-robin over App, App2...
+    with several `projects`) and returns their repo-relative paths.
+    """
+    paths = []
+    for project in range(projects):
+        os.makedirs(os.path.join(root, project_dir(project), "Services"), exist_ok=True)
+    for i in range(files):
+        path = os.path.join(project_dir(i % projects), "Services", f"Service{i}.cs")
+        with open(os.path.join(root, path), "w") as f:
+            f.write(source_file(f"Service{i}", methods_per_file))
+        paths.append(path)
+    return paths
+
+
+def mutant(mutant_id: int, method: int, rng: random.Random) -> dict:
+    # Lines of Method{n}: header at 5 + n * (LINES_PER_METHOD + 1), the sum on the third line
+    line = 5 + method * (LINES_PER_METHOD + 1) + 2
+    mutator = rng.choice(MUTATORS)
+    return {
+        "id": str(mutant_id),
+        "mutatorName": mutator,
+        # Distinct per mutator, so survivors on one line are not all equivalent
+        "replacement": f"a - b /* {mutator} */",
+        "location": {"start": {"line": line, "column": 19}, "end": {"line": line, "column": 24}},
+        "status": rng.choice(STATUSES),
+        "static": False,
+    }
+
+
+def report(root: str, paths: list[str], mutants_per_file: int, methods_per_file: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    files, next_id = {}, 0
+    for path in paths:
+        mutants = []
+        for _ in range(mutants_per_file):
+            mutants.append(mutant(next_id, rng.randrange(methods_per_file), rng))
+            next_id += 1
+        files[os.path.join(root, path)] = {"language": "cs", "mutants": mutants}
+    return {"schemaVersion": "1", "thresholds": {"high": 80, "low": 60}, "projectRoot": root, "files": files}
+
+
+def write_report(path: str, root: str, paths: list[str], mutants_per_file: int, methods_per_file: int) -> str:
+    with open(path, "w") as f:
+        json.dump(report(root, paths, mutants_per_file, methods_per_file), f)
+    return path
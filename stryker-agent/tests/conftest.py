@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The tests run against the benchmarks' local stand-ins (fake_llm, github_stub); importing
+# synthetic from there also puts the app modules on sys.path, as inside the container (/app)
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+if BENCHMARKS_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARKS_DIR)
+
+import synthetic  # noqa: E402,F401
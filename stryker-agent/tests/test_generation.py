@@ -0,0 +1,98 @@
+import json
+import asyncio
+
+import pytest
+
+from fake_llm import FakeChatModel
+from generation import GenerationEngine, BudgetExhausted, is_retryable
+
+
+def _prompt(mutant_id: int) -> str:
+    return f"Write a test for **Id {mutant_id}**"
+
+
+def _mutant_ids(result) -> list[str]:
+    return [test["mutant_ids"][0] for test in json.loads(result.content)["tests"]]
+
+
+class _Failing:
+    """A runnable that always raises `error`, counting its calls."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+        self.calls = 0
+
+    async def ainvoke(self, payload):
+        self.calls += 1
+        raise self.error
+
+
+class _Slow:
+    async def ainvoke(self, payload):
+        await asyncio.sleep(0.3)
+        return payload
+
+
+def test_results_come_back_in_input_order():
+    model = FakeChatModel(latency=0.02, jitter=0.02)
+    engine = GenerationEngine(model, max_in_flight=4, requests_per_minute=60000)
+
+    results = engine.run([_prompt(i) for i in range(12)])
+
+    assert [_mutant_ids(result) for result in results] == [[str(i)] for i in range(12)]
+    assert engine.calls == 12
+
+
+def test_rate_limited_calls_are_retried():
+    model = FakeChatModel(latency=0.0, jitter=0.0, error_rate=0.5, seed=3)
+    engine = GenerationEngine(model, max_in_flight=4, requests_per_minute=60000, max_retries=20, base_delay=0.001)
+
+    results = engine.run([_prompt(i) for i in range(8)])
+
+    assert not any(isinstance(result, Exception) for result in results)
+    assert engine.retries > 0
+    assert engine.calls == 8 + engine.retries
+
+
+def test_non_transient_errors_are_not_retried():
+    runnable = _Failing(ValueError("max_output_tokens must be <= 8500"))
+    engine = GenerationEngine(runnable, requests_per_minute=60000, base_delay=0.001)
+
+    [result] = engine.run(["prompt"])
+
+    assert isinstance(result, ValueError)
+    assert runnable.calls == 1 and engine.retries == 0
+
+
+@pytest.mark.parametrize("message, retryable", [
+    ("Error code: 429 - rate limited", True),
+    ("HTTP 503", True),
+    ("502 Bad Gateway", True),
+    ("429 rate limit exceeded (simulated)", True),
+    ("max_output_tokens must be <= 8500", False),
+    ("could not parse the answer at line 1500", False),
+])
+def test_retryable_messages(message, retryable):
+    assert is_retryable(RuntimeError(message)) is retryable
+
+
+def test_token_budget_spans_runs_and_counts_each_skipped_prompt_once():
+    model = FakeChatModel(latency=0.0, jitter=0.0)
+    engine = GenerationEngine(model, max_in_flight=1, requests_per_minute=60000, token_budget=12)
+
+    first = engine.run([_prompt(1), _prompt(2)])
+    second = engine.run([_prompt(2), _prompt(3)])
+
+    assert not isinstance(first[0], Exception)
+    assert isinstance(first[1], BudgetExhausted)
+    assert all(isinstance(result, BudgetExhausted) for result in second)
+    assert engine.skipped == 2
+
+
+def test_time_budget_deadline_is_set_once_per_engine():
+    engine = GenerationEngine(_Slow(), requests_per_minute=60000, time_budget_seconds=0.5)
+
+    assert engine.run(["a", "b"]) == ["a", "b"]
+    [late] = engine.run(["c"])
+
+    assert isinstance(late, BudgetExhausted)
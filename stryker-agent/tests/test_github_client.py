@@ -0,0 +1,102 @@
+import pytest
+
+from github_stub import start_stub
+from github_client import GitHubClient
+
+MARKER = "<!-- stryker-agent-score -->"
+
+
+@pytest.fixture
+def github():
+    server, state, base_url = start_stub()
+    client = GitHubClient("octo/app", "token", base_url=base_url, base_delay=0.001)
+    yield client, state
+    client.close()
+    server.shutdown()
+
+
+def test_pull_request_is_created_then_updated(github):
+    client, state = github
+
+    pull, created = client.upsert_pull_request("feature/fixes", "master", "First", "body")
+    updated, created_again = client.upsert_pull_request("feature/fixes", "master", "Second", "body")
+
+    assert created and not created_again
+    assert updated["number"] == pull["number"]
+    assert [p["title"] for p in state.pulls] == ["Second"]
+
+
+def test_pull_request_opened_meanwhile_is_updated_after_422(github, monkeypatch):
+    client, state = github
+    client.upsert_pull_request("feature/fixes", "master", "Opened elsewhere", "body")
+    find = client.find_open_pull_request
+    lookups = []
+
+    def find_after_the_first_miss(head_branch, base_branch=None):
+        lookups.append(head_branch)
+        return None if len(lookups) == 1 else find(head_branch, base_branch)
+    monkeypatch.setattr(client, "find_open_pull_request", find_after_the_first_miss)
+
+    pull, created = client.upsert_pull_request("feature/fixes", "master", "Ours", "body")
+
+    assert not created
+    assert len(state.pulls) == 1 and pull["title"] == "Ours"
+
+
+def test_lost_pull_request_response_does_not_open_a_second_one(github):
+    client, state = github
+    state.lose_next = [504]
+
+    pull, created = client.upsert_pull_request("feature/fixes", "master", "Title", "body")
+
+    assert created and pull["title"] == "Title"
+    assert len(state.pulls) == 1
+
+
+def test_comment_is_posted_then_edited(github):
+    client, state = github
+
+    comment, created = client.upsert_comment(7, "score 80%", MARKER)
+    edited, created_again = client.upsert_comment(7, "score 90%", MARKER)
+
+    assert created and not created_again
+    assert edited["id"] == comment["id"]
+    assert [c["body"] for c in state.comments[7]] == [f"{MARKER}\nscore 90%"]
+
+
+def test_lost_comment_response_does_not_post_a_duplicate(github):
+    client, state = github
+    state.lose_next = [502]
+
+    comment, created = client.upsert_comment(7, "score 80%", MARKER)
+
+    assert created and comment["body"] == f"{MARKER}\nscore 80%"
+    assert len(state.comments[7]) == 1
+    assert state.requests.count(("POST", "/repos/octo/app/issues/7/comments")) == 1
+
+
+def test_rejected_comment_is_posted_again(github, monkeypatch):
+    client, state = github
+    request = client.request
+
+    def reject_the_first_post(method, path, **kwargs):
+        if method == "POST" and not state.requests.count(("POST", path)):
+            state.fail_next = [503]
+        return request(method, path, **kwargs)
+    monkeypatch.setattr(client, "request", reject_the_first_post)
+
+    _, created = client.upsert_comment(7, "score 80%", MARKER)
+
+    assert created
+    assert state.requests.count(("POST", "/repos/octo/app/issues/7/comments")) == 2
+    assert [c["body"] for c in state.comments[7]] == [f"{MARKER}\nscore 80%"]
+
+
+def test_rate_limited_post_is_retried(github):
+    client, state = github
+    state.fail_next = [429]
+
+    response = client.request("POST", "/repos/octo/app/issues/7/comments", json={"body": "hi"})
+
+    assert response.status_code == 201
+    assert len(state.comments[7]) == 1
@@ -0,0 +1,58 @@
+import pytest
+
+import repo_index
+from repo_index import RepoIndex
+from mutant_cache import production_files
+from incremental import source_files_to_mutate
+
+TEST_PROJECT = """<Project Sdk="Microsoft.NET.Sdk">
+  <ItemGroup>
+    <PackageReference Include="xunit" Version="2.9.0" />
+    <ProjectReference Include="..\\Shop\\Shop.csproj" />
+  </ItemGroup>
+</Project>
+"""
+
+
+@pytest.fixture
+def shop(tmp_path, monkeypatch):
+    files = {
+        "Shop/Shop.csproj": '<Project Sdk="Microsoft.NET.Sdk" />\n',
+        "Shop/Services/Cart.cs": "class Cart {}\n",
+        "Shop/Services/ContestService.cs": "class ContestService {}\n",
+        "Shop/Latest.cs": "class Latest {}\n",
+        "Shop/Attestation/Signer.cs": "class Signer {}\n",
+        "Shop.Tests/Shop.Tests.csproj": TEST_PROJECT,
+        "Shop.Tests/CartTests.cs": "class CartTests {}\n",
+        "Shop.Tests/Helpers/Builders.cs": "class Builders {}\n",
+    }
+    for path, content in files.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(content)
+    index = RepoIndex(str(tmp_path))
+    monkeypatch.setattr(repo_index, "_index", index)
+    return index
+
+
+def test_test_files_are_those_of_test_projects(shop):
+    assert shop.is_test_file("Shop.Tests/Helpers/Builders.cs")
+    assert not shop.is_test_file("Shop/Services/ContestService.cs")
+
+
+def test_production_files_keep_names_containing_test(shop):
+    assert production_files("Shop/Shop.csproj") == {
+        "Shop/Services/Cart.cs",
+        "Shop/Services/ContestService.cs",
+        "Shop/Latest.cs",
+        "Shop/Attestation/Signer.cs",
+    }
+
+
+def test_changed_production_file_containing_test_is_remutated(shop):
+    assert source_files_to_mutate({"Shop/Services/ContestService.cs"}, "Shop/Shop.csproj") == {
+        "Shop/Services/ContestService.cs"
+    }
+
+
+def test_changed_test_file_remutates_its_subject(shop):
+    assert source_files_to_mutate({"Shop.Tests/CartTests.cs"}, "Shop/Shop.csproj") == {"Shop/Services/Cart.cs"}